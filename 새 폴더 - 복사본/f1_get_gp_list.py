@@ -1,14 +1,16 @@
 # f1_get_gp_list.py
-import requests
 import json
+import os
 import sys
 
+import http_client
+
 def get_schedule(year):
     """지정된 연도의 모든 'Race' 세션 정보를 가져옵니다."""
     try:
-        url = f"https://api.openf1.org/v1/sessions?year={year}&session_name=Race"
-        response = requests.get(url)
-        response.raise_for_status()
+        url = f"{os.environ.get('OPENF1_BASE_URL', 'https://api.openf1.org/v1')}/sessions"
+        # 일정이 바뀌지 않았으면 304 재검증으로 캐시된 응답을 사용
+        response = http_client.get(url, params={"year": year, "session_name": "Race"}, conditional=True)
         data = response.json()
         
         schedule = []
@@ -1,75 +1,395 @@
 # f1_get_replay_data.py
+import os
 import sys
 import json
-import requests
-import pandas as pd
-import time
+import heapq
+import numpy as np
+import http_client
+import replay_binary
+import standings_timeline
+import telemetry_cache
+import telemetry_ingest
+import track_calibration
+import track_centerline
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-API_BASE = "https://api.openf1.org/v1"
+API_BASE = os.environ.get("OPENF1_BASE_URL", "https://api.openf1.org/v1")
+
+def fetch_api(endpoint, params, cache_name=None):
+    """OpenF1 엔드포인트를 디스크 캐시를 거쳐 조회합니다. (date>/date< 가 있으면 그 구간만)
+
+    cache_name 은 캐시 인덱스 이름입니다. 드라이버별 조회처럼 같은 엔드포인트의 일부 행만 받는 경우
+    엔드포인트 이름 대신 따로 써서 세션 전체 캐시와 섞이지 않게 합니다.
+    """
+    import requests
+
+    failures = []
+
+    def upstream(lo, hi):
+        query = dict(params)
+        if lo is not None:
+            # 캐시에 없는 [lo, hi) 구간만 요청
+            query.pop("date>", None)
+            query.update({"date>=": lo, "date<": hi})
+        try:
+            url = f"{API_BASE}/{endpoint}"
+            # 세션 전체 조회는 응답이 크므로 읽기 타임아웃을 길게, 속도 제한(429)은 백오프로 대응
+            response = http_client.get(url, params=query, timeout=(http_client.DEFAULT_TIMEOUT[0], 600), retries=5)
+            return response.json()
+        except requests.RequestException as e:
+            failures.append(str(e))
+            return None
+
+    # 세션 단위 조회는 디스크 캐시를 거침 (종료된 세션은 한 번만 다운로드)
+    data = telemetry_cache.cached_fetch(cache_name or endpoint, params.get("session_key"),
+                                        params.get("date>"), params.get("date<"), upstream)
+    if data is None:
+        return {"error": f"API fetching failed for {endpoint}: {failures[0] if failures else 'unknown error'}"}
+    return data
+
+# 세션 전체 다운로드를 나눌 시간 구간 길이(초, 0 이면 나누지 않음)와 동시 요청 수
+SLICE_S = int(os.environ.get("F1_FETCH_SLICE_S", "600"))
+SLICE_WORKERS = int(os.environ.get("F1_FETCH_WORKERS", "4"))
+# 세션 메타데이터(date_start ~ date_end) 앞뒤로 더 받을 여유 (포메이션 랩, 세션 후 주행 등)
+SLICE_PAD_S = 30 * 60
+
+
+def session_bounds(session_key):
+    """sessions 메타데이터의 (date_start, date_end) 를 epoch us 로 돌려줍니다. 알 수 없으면 None."""
+    import requests
 
-def fetch_api(endpoint, params):
     try:
-        url = f"{API_BASE}/{endpoint}"
-        response = requests.get(url, params=params, timeout=600)
-        response.raise_for_status()
-        time.sleep(1)
-        return response.json()
-    except requests.RequestException as e:
-        return {"error": f"API fetching failed for {endpoint}: {str(e)}"}
+        response = http_client.get(f"{API_BASE}/sessions", params={"session_key": session_key}, conditional=True)
+        meta = response.json()[0]
+        start, end = telemetry_cache.to_us(meta["date_start"]), telemetry_cache.to_us(meta["date_end"])
+    except (requests.RequestException, ValueError, IndexError, KeyError, TypeError):
+        return None
+    if start is None or end is None or end <= start:
+        return None
+    return start, end
 
-def process_data(session_key, locations, laps, positions):
+
+def session_drivers(session_key):
+    """세션에 참가한 드라이버 번호 목록. 알 수 없으면 None."""
+    data = fetch_api("drivers", {"session_key": session_key})
+    if isinstance(data, dict):
+        return None
+    numbers = sorted({r["driver_number"] for r in data if r.get("driver_number") is not None})
+    return numbers or None
+
+
+def plan_slices(start_us, end_us, slice_s=SLICE_S, drivers=None):
+    """[start, end) 를 slice_s 초 구간으로 나눈 (driver_number 또는 None, lo_us, hi_us) 목록."""
+    step = int(slice_s * 1_000_000)
+    bounds = list(range(start_us, end_us, step)) + [end_us]
+    return [(dn, lo, hi) for dn in (drivers or [None]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def _slice_query(session_key, driver_number, lo_us, hi_us):
+    params = {"session_key": session_key, "date>": telemetry_cache.from_us(lo_us),
+              "date<": telemetry_cache.from_us(hi_us)}
+    if driver_number is not None:
+        params["driver_number"] = driver_number
+    return params
+
+
+def _cache_name(endpoint, driver_number):
+    return endpoint if driver_number is None else f"{endpoint}@{driver_number}"
+
+
+def _sorted_by_time(rows):
+    keys = [telemetry_cache.to_us(r.get("date")) or 0 for r in rows]
+    if all(a <= b for a, b in zip(keys, keys[1:])):
+        return rows, keys
+    order = sorted(range(len(rows)), key=keys.__getitem__)
+    return [rows[i] for i in order], [keys[i] for i in order]
+
+
+def fetch_sliced(endpoint, session_key, slice_s=SLICE_S, workers=SLICE_WORKERS, drivers=None):
+    """세션 전체 행을 시간 구간(필요하면 드라이버별로도)으로 나눠 동시에 받고 시각순으로 합칩니다.
+
+    받은 구간은 캐시 세그먼트로 바로 저장되므로, 중간에 끊겨도 다시 실행하면 남은 구간만 받습니다.
+    세션 시간을 알 수 없거나 slice_s 가 0 이면 fetch_api 로 한 번에 받습니다.
+    """
+    bounds = session_bounds(session_key) if slice_s > 0 else None
+    if bounds is None:
+        return fetch_api(endpoint, {"session_key": session_key})
+    lo_us = bounds[0] - SLICE_PAD_S * 1_000_000
+    hi_us = bounds[1] + SLICE_PAD_S * 1_000_000
+    slices = plan_slices(lo_us, hi_us, slice_s, drivers)
+    # 이전 실행에서 이미 받아 둔 구간은 건너뜀 (캐시 인덱스만 확인)
+    pending = [(dn, lo, hi) for dn, lo, hi in slices
+               if not telemetry_cache.is_covered(_cache_name(endpoint, dn), session_key,
+                                                 telemetry_cache.from_us(lo), telemetry_cache.from_us(hi))]
+    if len(pending) < len(slices):
+        print(f"[FETCH] {endpoint} {session_key}: {len(slices) - len(pending)}/{len(slices)} 구간은 이미 받음",
+              file=sys.stderr)
+
+    def run(piece):
+        dn, lo, hi = piece
+        return fetch_api(endpoint, _slice_query(session_key, dn, lo, hi), cache_name=_cache_name(endpoint, dn))
+
+    failed = []
+    received = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(run, piece): piece for piece in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            data = future.result()
+            if isinstance(data, dict):
+                failed.append((futures[future], data.get("error")))
+            else:
+                received += len(data)
+            print(f"[FETCH] {endpoint} {session_key}: {done}/{len(pending)} 구간, {received:,} 행"
+                  + (f", 실패 {len(failed)}" if failed else ""), file=sys.stderr)
+    if failed:
+        return {"error": f"API fetching failed for {endpoint}: {len(failed)}/{len(pending)} 구간 실패 "
+                         f"(받은 구간은 저장됨, 다시 실행하면 이어서 받음): {failed[0][1]}"}
+
+    # 병합: 드라이버(또는 전체)마다 세션 구간 전체를 캐시에서 한 번에 읽음
+    # (구간별 응답은 시작 시각이 경계와 같은 행을 잘라 내므로, 경계 안쪽 행까지 포함하려면 전체 구간으로 다시 읽어야 함)
+    parts = []
+    for dn in (drivers or [None]):
+        data = fetch_api(endpoint, _slice_query(session_key, dn, lo_us, hi_us), cache_name=_cache_name(endpoint, dn))
+        if isinstance(data, dict):
+            return data
+        parts.append(_sorted_by_time(data))
+    if len(parts) == 1:
+        return parts[0][0]
+    merged = heapq.merge(*(zip(keys, range(len(rows)), rows) for rows, keys in parts), key=lambda item: item[0])
+    return [row for _, _, row in merged]
+
+
+def to_epoch_us(dates):
+    """ISO 문자열 컬럼을 epoch 마이크로초(int64) 배열로 바꿉니다. (소수점 자릿수가 섞여 있어도 처리)"""
+    return telemetry_ingest.parse_iso(dates, unit="us")
+
+
+def make_standings_timeline(positions):
+    """positions 를 첫 순위 + 변경 이벤트 타임라인으로 만듭니다. (standings_timeline.py 형식, 없으면 None)"""
+    # 순위 변경 시각은 us 로 유지 (프레임 시각 기준 ms 올림은 standings_timeline.encode 에서)
+    df_pos = telemetry_ingest.to_frame("position", positions, time_unit="us")
+    if df_pos.empty:
+        return None
+    return standings_timeline.encode(df_pos['date_us'].to_numpy(), df_pos['driver_number'].to_numpy(),
+                                     df_pos['position'].to_numpy(dtype='float64'))
+
+
+# 프레임 생성 시 한 번에 파이썬 객체로 바꾸는 프레임 수 (스트리밍 시 메모리 상한)
+FRAME_BLOCK = 4096
+
+def build_replay(session_key, locations, laps, positions):
+    """리플레이 헤더(session_key/duration_ms/bbox/standings)와 프레임 이터레이터를 돌려줍니다.
+
+    프레임은 시간순으로 FRAME_BLOCK 개씩 만들어 내므로 전체를 메모리에 모을 필요가 없습니다.
+    실패 시 (오류 딕셔너리, None) 을 돌려줍니다.
+    """
     if "error" in locations or "error" in laps or "error" in positions:
-        return {"session_key": session_key, "error": "API에서 중요 데이터를 가져오는 데 실패했습니다."}
+        return {"session_key": session_key, "error": "API에서 중요 데이터를 가져오는 데 실패했습니다."}, None
+
+    df_loc = telemetry_ingest.to_frame("location", locations)
+    if df_loc.empty:
+        return {"session_key": session_key, "error": "처리할 유효한 프레임이 없습니다."}, None
+
+    # 위치 샘플을 시각(ms)별로 묶음: 안정 정렬 후 경계 인덱스로 잘라 프레임 구성 (같은 시각 안에서는 원래 순서 유지)
+    loc_ms = df_loc['date_ms'].to_numpy()
+    order = np.argsort(loc_ms, kind='stable')
+    times, starts = np.unique(loc_ms[order], return_index=True)
+    ends = np.append(starts[1:], len(order))
+
+    driver_numbers = df_loc['driver_number'].to_numpy()[order]
+    xs = df_loc['x'].to_numpy()[order]
+    ys = df_loc['y'].to_numpy()[order]
+    del df_loc, loc_ms, order
+
+    bbox = {"minX": np.nanmin(xs).item(), "maxX": np.nanmax(xs).item(),
+            "minY": np.nanmin(ys).item(), "maxY": np.nanmax(ys).item()}
+    header = {"session_key": session_key, "duration_ms": int(times[-1] - times[0]), "bbox": bbox}
+    # 순위는 프레임마다 넣지 않고 헤더에 타임라인으로 한 번만 (standings_timeline.StandingsTimeline 으로 복원)
+    header["standings"] = make_standings_timeline(positions)
+
+    # 서킷 보정이 있으면 위치마다 이미지 좌표를 미리 계산하고 헤더에 변환 행렬/이미지 bbox 를 넣음
+    # 중심선이 있으면 위치마다 랩 거리(d)도 한 번에 투영
+    extra_keys, extra_cols = [], []
+    circuit, matrix = track_calibration.transform_for_session(session_key)
+    if matrix is not None:
+        ixs, iys = track_calibration.apply(matrix, xs, ys)
+        header["calibration"] = track_calibration.calibration_info(circuit, matrix, ixs, iys)
+        extra_keys += ["ix", "iy"]
+        extra_cols += [np.round(ixs, 1), np.round(iys, 1)]
+    centerline = track_centerline.for_session(session_key)
+    if centerline is not None:
+        header["track_length"] = round(centerline.length, 1)
+        extra_keys.append("d")
+        extra_cols.append(np.round(centerline.project(xs, ys)[0], 1))
+    keys = ["driver_number", "x", "y"] + extra_keys
+
+    def frames():
+        for lo in range(0, len(times), FRAME_BLOCK):
+            hi = min(lo + FRAME_BLOCK, len(times))
+            row_lo, row_hi = starts[lo], ends[hi - 1]
+            dns = driver_numbers[row_lo:row_hi].tolist()
+            bx = xs[row_lo:row_hi].tolist()
+            by = ys[row_lo:row_hi].tolist()
+            bextra = [c[row_lo:row_hi].tolist() for c in extra_cols]
+            for i, ts_ms in enumerate(times[lo:hi].tolist()):
+                a, b = starts[lo + i] - row_lo, ends[lo + i] - row_lo
+                if not extra_cols:
+                    positions = [{"driver_number": d, "x": x, "y": y}
+                                 for d, x, y in zip(dns[a:b], bx[a:b], by[a:b])]
+                else:
+                    positions = [dict(zip(keys, values))
+                                 for values in zip(dns[a:b], bx[a:b], by[a:b], *(c[a:b] for c in bextra))]
+                yield {"t": ts_ms, "positions": positions}
+
+    return header, frames()
+
+
+# 공통 시계 간격: 4Hz
+RESAMPLE_HZ = 4
+# 실제 샘플 간격이 이보다 길면 (피트, 리타이어, 데이터 누락) 보간하지 않고 비워 둠
+MAX_GAP_MS = 2000
+
+def resample_replay(session_key, locations, positions, hz=RESAMPLE_HZ):
+    """모든 드라이버의 위치를 같은 시계(hz)로 선형 보간한 조밀 배열을 만듭니다.
 
-    df_loc = pd.DataFrame(locations)
-    df_laps = pd.DataFrame(laps)
-    df_pos = pd.DataFrame(positions)
-
-    for df in [df_loc, df_laps, df_pos]:
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
-
-    frames_map = {}
-    for _, row in df_loc.iterrows():
-        ts = row['date']
-        ts_ms = int(ts.timestamp() * 1000)
-        frame = frames_map.setdefault(ts_ms, {"t": ts_ms, "positions": [], "driver_standings": {}})
-        frame["positions"].append({
-            "driver_number": row['driver_number'],
-            "x": row['x'], "y": row['y']
-        })
-
-    df_pos_sorted = df_pos.sort_values('date')
-    for ts_ms, frame in sorted(frames_map.items()):
-        current_time = pd.to_datetime(ts_ms, unit='ms')
-        latest_pos = df_pos_sorted[df_pos_sorted['date'] <= current_time]
-        if not latest_pos.empty:
-            standings = latest_pos.groupby('driver_number')['position'].last().to_dict()
-            frame['driver_standings'] = standings
-
-    frames = sorted(frames_map.values(), key=lambda f: f['t'])
-    if not frames:
+    결과: {session_key, t0, step_ms, n, duration_ms, bbox,
+           drivers: {"<번호>": {"x": [...], "y": [...], "position": [...]}}}
+    재생 시각 t(ms) 의 인덱스는 round((t - t0) / step_ms) 로 바로 구할 수 있습니다.
+    서킷 중심선이 있으면 드라이버마다 랩 거리 배열 "d" 와 결과의 "track_length" 가 추가됩니다.
+    샘플이 없는 구간(첫 샘플 이전/마지막 이후/MAX_GAP_MS 보다 긴 공백)은 null 입니다.
+    """
+    if "error" in locations or "error" in positions:
+        return {"session_key": session_key, "error": "API에서 중요 데이터를 가져오는 데 실패했습니다."}
+    columns = replay_binary.columns_from_locations(locations)
+    if not columns:
         return {"session_key": session_key, "error": "처리할 유효한 프레임이 없습니다."}
 
-    all_x = [p["x"] for f in frames for p in f["positions"]]
-    all_y = [p["y"] for f in frames for p in f["positions"]]
-    bbox = {"minX": min(all_x), "maxX": max(all_x), "minY": min(all_y), "maxY": max(all_y)} if all_x else None
-    
-    duration_ms = frames[-1]['t'] - frames[0]['t']
+    step = int(round(1000 / hz))
+    t_min = min(int(c[0][0]) for c in columns.values())
+    t_max = max(int(c[0][-1]) for c in columns.values())
+    t0 = t_min - t_min % step
+    n = (t_max - t0) // step + 1
+    grid = t0 + np.arange(n, dtype=np.int64) * step
+
+    df_pos = telemetry_ingest.to_frame("position", positions)
+    pos_by_driver = {}
+    if not df_pos.empty:
+        pos_ms = df_pos['date_ms'].to_numpy()
+        for dn, idx in df_pos.groupby('driver_number').indices.items():
+            order = np.argsort(pos_ms[idx], kind='stable')
+            pos_by_driver[int(dn)] = (pos_ms[idx][order], df_pos['position'].to_numpy()[idx][order])
+
+    def with_gaps(values, missing):
+        out = values.tolist()
+        for i in np.flatnonzero(missing).tolist():
+            out[i] = None
+        return out
+
+    centerline = track_centerline.for_session(session_key)
+    drivers = {}
+    for dn, (t, x, y) in columns.items():
+        # 격자 시각 앞뒤의 실제 샘플 사이 간격이 너무 길면 보간하지 않음
+        nxt = np.searchsorted(t, grid, side='left').clip(0, len(t) - 1)
+        prv = (np.searchsorted(t, grid, side='right') - 1).clip(0, len(t) - 1)
+        missing = (grid < t[0]) | (grid > t[-1]) | ((t[nxt] - t[prv]) > MAX_GAP_MS)
+        entry = {
+            "x": with_gaps(np.rint(np.interp(grid, t, x)).astype(np.int64), missing),
+            "y": with_gaps(np.rint(np.interp(grid, t, y)).astype(np.int64), missing),
+        }
+        if dn in pos_by_driver:
+            pt, pv = pos_by_driver[dn]
+            row = np.searchsorted(pt, grid, side='right') - 1
+            entry["position"] = with_gaps(pv[row.clip(0)].astype(np.int64), row < 0)
+        if centerline is not None:
+            d = centerline.project(np.interp(grid, t, x), np.interp(grid, t, y))[0]
+            entry["d"] = with_gaps(np.round(d, 1), missing)
+        drivers[str(dn)] = entry
+
+    all_x = np.concatenate([c[1] for c in columns.values()])
+    all_y = np.concatenate([c[2] for c in columns.values()])
+    bbox = {"minX": int(all_x.min()), "maxX": int(all_x.max()), "minY": int(all_y.min()), "maxY": int(all_y.max())}
+    result = {"session_key": session_key, "t0": int(t0), "step_ms": step, "n": int(n),
+              "duration_ms": t_max - t_min, "bbox": bbox, "drivers": drivers}
+    if centerline is not None:
+        result["track_length"] = round(centerline.length, 1)
+    # 조밀 배열에는 이미지 좌표를 따로 싣지 않고 변환 행렬/이미지 bbox 만 넣음 (클라이언트에서 점마다 곱 1회)
+    circuit, matrix = track_calibration.transform_for_session(session_key)
+    if matrix is not None:
+        result["calibration"] = track_calibration.calibration_info(
+            circuit, matrix, *track_calibration.apply(matrix, all_x, all_y))
+    return result
+
+
+def process_data(session_key, locations, laps, positions):
+    header, frames = build_replay(session_key, locations, laps, positions)
+    if frames is None:
+        return header
+    return {**header, "frames": list(frames)}
+
+
+def write_ndjson(header, frames, out, flush_every=256):
+    """헤더 한 줄 뒤에 프레임을 한 줄씩 씁니다. 소비자는 헤더를 받는 즉시 재생을 시작할 수 있습니다."""
+    out.write(json.dumps({"type": "header", **header}, ensure_ascii=False) + "\n")
+    out.flush()
+    if frames is None:
+        return
+    for n, frame in enumerate(frames, 1):
+        out.write(json.dumps(frame, ensure_ascii=False) + "\n")
+        if n % flush_every == 0:
+            out.flush()
+    out.flush()
 
-    return {"session_key": session_key, "duration_ms": duration_ms, "bbox": bbox, "frames": frames}
 
 def main():
-    if len(sys.argv) < 2:
+    # 사용법: python f1_get_track_data.py <session_key> [--ndjson | --binary=<파일> | --resampled[=hz]]
+    #   --ndjson        : 첫 줄에 헤더(bbox/duration_ms), 이후 프레임을 한 줄씩 스트리밍 출력
+    #   --binary=<파일> : 드라이버별 델타 인코딩 바이너리(replay_binary.py 형식)로 저장
+    #   --resampled     : 모든 드라이버를 공통 시계(기본 4Hz)로 보간한 조밀 배열 출력 (resample_replay)
+    #   --slice-s=<초>  : location 을 이 길이의 시간 구간으로 나눠 동시에 받음 (기본 F1_FETCH_SLICE_S, 0 이면 한 번에)
+    #   --by-driver     : 시간 구간을 드라이버별로도 나눔 (응답 하나가 너무 클 때)
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    flags = {a for a in sys.argv[1:] if a.startswith("--")}
+    if not args:
         print(json.dumps({"error": "session_key 인자가 필요합니다."}))
         sys.exit(1)
-    session_key = sys.argv[1]
+    session_key = args[0]
     
     params = {"session_key": session_key}
-    locations = fetch_api("location", params)
+    slice_s = next((int(f.split("=", 1)[1]) for f in flags if f.startswith("--slice-s=")), SLICE_S)
+    drivers = session_drivers(session_key) if "--by-driver" in flags else None
+    locations = fetch_sliced("location", session_key, slice_s=slice_s, drivers=drivers)
     laps = fetch_api("laps", params)
     positions = fetch_api("position", params)
     
+    binary_path = next((f.split("=", 1)[1] for f in flags if f.startswith("--binary=")), None)
+    if binary_path:
+        if "error" in locations:
+            print(json.dumps({"session_key": session_key, "error": "API에서 중요 데이터를 가져오는 데 실패했습니다."}, ensure_ascii=False))
+            sys.exit(1)
+        columns = replay_binary.columns_from_locations(locations)
+        if not columns:
+            print(json.dumps({"session_key": session_key, "error": "처리할 유효한 프레임이 없습니다."}, ensure_ascii=False))
+            sys.exit(1)
+        t_first = min(int(c[0][0]) for c in columns.values())
+        t_last = max(int(c[0][-1]) for c in columns.values())
+        size = replay_binary.write_replay(binary_path, columns, session_key=session_key,
+                                          duration_ms=t_last - t_first)
+        print(json.dumps({"session_key": session_key, "path": binary_path, "bytes": size}, ensure_ascii=False))
+        return
+
+    resampled = next((f for f in flags if f == "--resampled" or f.startswith("--resampled=")), None)
+    if resampled:
+        hz = float(resampled.split("=", 1)[1]) if "=" in resampled else RESAMPLE_HZ
+        print(json.dumps(resample_replay(session_key, locations, positions, hz=hz), ensure_ascii=False,
+                         separators=(",", ":")))
+        return
+
+    if "--ndjson" in flags:
+        header, frames = build_replay(session_key, locations, laps, positions)
+        del locations, positions
+        write_ndjson(header, frames, sys.stdout)
+        return
+
     replay_data = process_data(session_key, locations, laps, positions)
     
     print(json.dumps(replay_data, ensure_ascii=False))
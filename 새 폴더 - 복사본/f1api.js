@@ -1,8 +1,10 @@
 // f1api.js
 const fs = require('fs');
+const http = require('http');
 const path = require('path');
 const express = require('express');
 const { spawn } = require('child_process');
+const telemetryWorker = require('./telemetry-worker');
 const driversData = require('./public/data/drivers.json');
 const driverDescriptions = require('./public/data/driver_descriptions.json');
 const teamsData = require('./public/data/teams.json'); // 팀 데이터 로드 확인
@@ -185,13 +187,10 @@ router.get('/replays/:session_key', (req, res) => { // async 제거
     }
 });
 
-router.get('/api/locations/:session_key/:startTime/:endTime', (req, res) => {
-    const { session_key, startTime, endTime } = req.params;
-    const scriptPath = path.join(ROOT_DIR, 'get_driver_locations.py');
-    if (!fs.existsSync(scriptPath)) {
-        return res.status(500).json({ error: 'get_driver_locations.py 스크립트를 찾을 수 없습니다.' });
-    }
-    const pythonProcess = spawn('python', ['-X', 'utf8', scriptPath, session_key, startTime, endTime]);
+// 요청마다 파이썬을 새로 띄우는 기존 방식 (TELEMETRY_WORKER=0 일 때 사용)
+function spawnLocations(scriptPath, session_key, startTime, endTime, options, res) {
+    const flags = Object.entries(options).map(([name, value]) => `--${name.replace('_', '-')}=${value}`);
+    const pythonProcess = spawn('python', ['-X', 'utf8', scriptPath, session_key, startTime, endTime, ...flags]);
     let output = '';
     pythonProcess.stdout.setEncoding('utf8');
     pythonProcess.stdout.on('data', (data) => { output += data.toString(); });
@@ -200,6 +199,62 @@ router.get('/api/locations/:session_key/:startTime/:endTime', (req, res) => {
         if (code !== 0) return res.status(500).json({ error: '데이터 조회 중 서버 오류 발생' });
         try { res.json(JSON.parse(output)); } catch (e) { res.status(500).json({ error: '스크립트 결과 파싱 실패' }); }
     });
+}
+
+router.get('/api/locations/:session_key/:startTime/:endTime', (req, res) => {
+    const { session_key, startTime, endTime } = req.params;
+    const scriptPath = telemetryWorker.SCRIPT_PATH;
+    if (!fs.existsSync(scriptPath)) {
+        return res.status(500).json({ error: 'get_driver_locations.py 스크립트를 찾을 수 없습니다.' });
+    }
+    // ?lod=0~3 또는 ?resolution_ms=&epsilon= : 스크러빙/빨리 감기/트랙 분석용 저해상도 궤적
+    const options = {};
+    for (const name of ['lod', 'resolution_ms', 'epsilon']) {
+        if (req.query[name] !== undefined && !Number.isNaN(Number(req.query[name]))) options[name] = Number(req.query[name]);
+    }
+    // ?format=columnar : locations/positions/car_data 를 드라이버별 평행 배열({t, x, y, ...})로 받음
+    if (req.query.format === 'columnar') options.format = 'columnar';
+    // ?include=locations,timing&drivers=1,44&fields=locations.x,locations.y : 필요한 결과 키/드라이버/필드만
+    for (const name of ['include', 'drivers', 'fields']) {
+        if (typeof req.query[name] === 'string' && /^[\w.,]+$/.test(req.query[name])) options[name] = req.query[name];
+    }
+    if (process.env.TELEMETRY_WORKER === '0') {
+        return spawnLocations(scriptPath, session_key, startTime, endTime, options, res);
+    }
+    telemetryWorker.getLocations(session_key, startTime, endTime, options)
+        .then((result) => res.json(result))
+        .catch((e) => {
+            console.error('[Telemetry Worker]', e.message);
+            res.status(500).json({ error: '데이터 조회 중 서버 오류 발생' });
+        });
+});
+
+router.get('/api/telemetry/stats', (req, res) => {
+    telemetryWorker.getStats()
+        .then((result) => res.json(result))
+        .catch((e) => res.status(500).json({ error: e.message }));
+});
+
+// 라이브 세션 SSE 피드: live_feed.py 의 스트림을 그대로 중계 (업스트림 폴링은 세션당 한 번)
+const LIVE_FEED_URL = process.env.LIVE_FEED_URL || 'http://127.0.0.1:8790';
+
+router.get('/api/live/:session_key', (req, res) => {
+    const { session_key } = req.params;
+    if (!/^\d+$/.test(session_key)) return res.status(400).json({ error: '잘못된 session_key 입니다.' });
+    const upstream = http.get(`${LIVE_FEED_URL}/live/${session_key}`, (feed) => {
+        res.writeHead(feed.statusCode, {
+            'Content-Type': feed.headers['content-type'] || 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'Connection': 'keep-alive',
+        });
+        feed.pipe(res);
+    });
+    upstream.on('error', (e) => {
+        console.error('[Live Feed]', e.message);
+        if (!res.headersSent) res.status(502).json({ error: '라이브 피드 서버에 연결할 수 없습니다.' });
+        else res.end();
+    });
+    req.on('close', () => upstream.destroy());
 });
 
 // --- 서버 실행 ---
@@ -1,49 +1,221 @@
 # get_driver_locations.py (통합 버전)
+# 사용법:
+#   python get_driver_locations.py <session_key> <start_time> <end_time>   # 1회 조회 후 종료
+#   python get_driver_locations.py --serve                                  # 상주 워커 (stdin/stdout JSON-lines)
+#   --sequential 또는 F1_SEQUENTIAL_FETCH=1 : 엔드포인트를 하나씩 순차 조회 (디버깅용)
+#   --lod=<0-3> / --resolution-ms=<ms> / --epsilon=<거리> : location 궤적 다운샘플링 (trajectory_lod.py)
+#   --format=columnar : locations/positions/car_data 를 드라이버별 평행 배열로 출력 (telemetry_columns.py)
+#   --include=locations,timing / --drivers=1,44 / --fields=locations.x,locations.y,car_data.speed
+#       : 받을 결과 키, 드라이버, 필드만 고름 (드라이버는 가능하면 업스트림 쿼리에 driver_number 로 전달)
+#       locations.ix / locations.iy / locations.lap_dist 는 fields 에 적었을 때만 계산해 붙임
+# 요청마다 새 프로세스로 뜨는 경우가 많아 시작 시간을 아낌: requests/numpy 와 track_calibration,
+# track_centerline, trajectory_lod 는 실제로 쓸 때 import 합니다. (scripts/bench_startup.py 로 확인)
+import math
+import os
 import sys
-import requests
+import threading
 import json
-import pandas as pd
+import http_client
+import live_timing
+import telemetry_cache
+import telemetry_columns
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-# OpenF1 API 기본 URL
-BASE_URL = "https://api.openf1.org/v1"
+# OpenF1 API 기본 URL (로컬 대체 서버로 바꿔 끼울 수 있도록 환경 변수 허용)
+BASE_URL = os.environ.get("OPENF1_BASE_URL", "https://api.openf1.org/v1")
+
+# 순차 조회 기본값 (디버깅 시 F1_SEQUENTIAL_FETCH=1)
+SEQUENTIAL_DEFAULT = os.environ.get("F1_SEQUENTIAL_FETCH") == "1"
+
+# 한 구간을 채우는 데 필요한 조회 목록: (결과 키, 엔드포인트, 최신값 조회 여부)
+WINDOW_QUERIES = [
+    ("locations", "location", False),
+    ("positions", "position", False),
+    ("car_data", "car_data", False),
+    ("race_control", "race_control", False),
+    ("latest_position", "position", True),
+    ("latest_laps", "laps", True),
+    ("latest_intervals", "intervals", True),
+]
+
+# include 로 고를 수 있는 결과 키 ("timing" 을 빼면 latest_* 조회도 하지 않음)
+RESULT_KEYS = ("locations", "positions", "car_data", "race_control", "timing")
+# 필드를 골라도 항상 남기는 필드 (드라이버 구분, 시각순 처리, 다운샘플링/열 형식 변환에 필요)
+REQUIRED_FIELDS = ("date", "driver_number")
+# locations 에서 x, y 로 계산해 붙이는 필드
+DERIVED_LOCATION_FIELDS = ("ix", "iy", "lap_dist")
+# 고른 드라이버가 이 수 이하이고 캐시에 전체 행이 없으면, 구간 조회를 드라이버별 driver_number 쿼리로 나눠 요청
+PUSHDOWN_MAX_DRIVERS = 3
+
+# 상주 워커가 동시에 처리하는 요청 수 (같은 구간/최신값 요청은 telemetry_cache.coalesce 로 합쳐짐)
+SERVE_WORKERS = 4
+
+_pool = ThreadPoolExecutor(max_workers=len(WINDOW_QUERIES) * SERVE_WORKERS)
+
+# 세션별 라이브 타이밍 집계기 (최근에 쓴 세션 몇 개만 유지)
+MAX_TIMING_SESSIONS = 4
+_timing = {}
+_timing_lock = threading.Lock()
+
+def get_data(endpoint, params, timeout=None, errors=None, error_key=None):
+    """지정된 엔드포인트에서 데이터를 가져옵니다.
+
+    errors 딕셔너리를 넘기면 실패 사유를 errors[error_key or endpoint] 에 기록합니다.
+    """
+    def record(message):
+        print(message, file=sys.stderr)
+        if errors is not None:
+            errors[error_key or endpoint] = message
+
+    import requests
 
-def get_data(endpoint, params, timeout=30):
-    """지정된 엔드포인트에서 데이터를 가져옵니다."""
     try:
         url = f"{BASE_URL}/{endpoint}"
-        response = requests.get(url, params=params, timeout=timeout)
-        response.raise_for_status() # HTTP 오류 발생 시 예외 발생
+        # 공용 세션(keep-alive) 사용, 응답 지연을 줄이기 위해 재시도는 1회만
+        response = http_client.get(url, params=params, timeout=timeout, retries=2, backoff=0.5)
         data = response.json()
         # 데이터가 단일 객체로 올 경우 리스트로 감싸기
         return data if isinstance(data, list) else [data] if data else []
     except requests.exceptions.Timeout:
         # 타임아웃 발생 시 빈 리스트와 함께 오류 메시지 반환 고려
-        print(f"Error: Timeout occurred while fetching {endpoint}", file=sys.stderr)
+        record(f"Error: Timeout occurred while fetching {endpoint}")
         return []
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching {endpoint}: {e}", file=sys.stderr)
+        record(f"Error fetching {endpoint}: {e}")
         return []
     except json.JSONDecodeError as e:
         # 응답 내용을 함께 출력하여 디버깅 용이하게 함
-        print(f"Error decoding JSON from {endpoint}: {e}. Response text: '{response.text[:200]}...' ", file=sys.stderr)
+        record(f"Error decoding JSON from {endpoint}: {e}. Response text: '{response.text[:200]}...' ")
         return []
     except Exception as e:
-        print(f"An unexpected error occurred while fetching {endpoint}: {e}", file=sys.stderr)
+        record(f"An unexpected error occurred while fetching {endpoint}: {e}")
         return []
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        print(json.dumps({"error": "세션 키, 시작 시간, 종료 시간을 인자로 전달해야 합니다."}))
-        sys.exit(1)
+def fetch_all(session_key, start_time_str, end_time_str, sequential=SEQUENTIAL_DEFAULT, errors=None, skip=(),
+              drivers=None):
+    """WINDOW_QUERIES 의 일곱 조회를 한꺼번에(또는 순차로) 실행해 {결과 키: 행 목록} 으로 돌려줍니다.
+
+    skip 에 든 결과 키는 조회하지 않고 빈 목록으로 둡니다.
+    drivers(드라이버 번호 집합)를 주면 구간 조회 결과를 그 드라이버로 줄입니다. 드라이버가 적으면
+    driver_number 를 업스트림 쿼리에 붙여 드라이버별로 받고 (캐시도 드라이버별), 아니면 받은 직후 거릅니다.
+    race_control 은 드라이버가 없는 메시지를 남기고, latest_* (타이밍) 는 순위 계산에 전체가 필요해 거르지 않습니다.
+    """
+    time_range_params = {
+        "session_key": session_key,
+        "date>": start_time_str,
+        "date<": end_time_str
+    }
+    latest_params = {"session_key": session_key, "date>=": "latest"}
+
+    def run(query):
+        key, endpoint, latest = query
+        if latest:
+            # 동시에 들어온 같은 세션의 최신값 조회는 요청 하나로 합침 (실패 사유도 함께 받아 호출마다 기록)
+            def latest_query():
+                failures = {}
+                return get_data(endpoint, latest_params, errors=failures, error_key=key), failures.get(key)
+            (rows, error), _ = telemetry_cache.coalesce(("latest", endpoint, str(session_key)), latest_query)
+            if error and errors is not None:
+                errors[key] = error
+            return rows
+
+        # 시간 범위 조회는 디스크 캐시를 거침: 캐시에 없는 [lo, hi) 구간만 업스트림에서 받음
+        def cached(driver_number=None):
+            def upstream(lo, hi):
+                failures = {}
+                params = {"session_key": session_key, "date>=": lo, "date<": hi}
+                if driver_number is not None:
+                    params["driver_number"] = driver_number
+                rows = get_data(endpoint, params, errors=failures, error_key=key)
+                if failures:
+                    # 같은 gap 을 기다리던 다른 요청에도 실패 사유가 전달되도록 예외로 올림
+                    raise telemetry_cache.UpstreamError(failures[key])
+                return rows
+            name = endpoint if driver_number is None else f"{endpoint}@{driver_number}"
+            try:
+                rows = telemetry_cache.cached_fetch(name, session_key, start_time_str, end_time_str, upstream)
+            except telemetry_cache.UpstreamError as e:
+                if errors is not None:
+                    errors[key] = str(e)
+                return []
+            return rows if rows is not None else []
+
+        if not drivers:
+            return cached()
+        if endpoint != "race_control" and len(drivers) <= PUSHDOWN_MAX_DRIVERS \
+                and not telemetry_cache.is_covered(endpoint, session_key, start_time_str, end_time_str):
+            rows = [row for dn in sorted(drivers) for row in cached(dn)]
+            rows.sort(key=lambda r: telemetry_cache.to_us(r.get("date")) or 0)
+            return rows
+        return [row for row in cached() if row.get("driver_number") in drivers
+                or (endpoint == "race_control" and row.get("driver_number") is None)]
+
+    queries = [q for q in WINDOW_QUERIES if q[0] not in skip]
+    if sequential:
+        # 순차 요청 (오류 발생 시 원인 파악 용이)
+        results = [run(q) for q in queries]
+    else:
+        results = list(_pool.map(run, queries))
+    data = {key: [] for key in skip}
+    data.update({q[0]: rows for q, rows in zip(queries, results)})
+    return data
+
+
+def project_fields(rows, keep):
+    """행마다 keep 에 든 필드만 남긴 새 행 목록을 돌려줍니다."""
+    return [{name: value for name, value in row.items() if name in keep} for row in rows]
+
+
+def parse_list(value, cast=str):
+    """"a,b" 문자열 또는 리스트를 값 목록으로 바꿉니다. (None/빈 값은 None)"""
+    if value is None or value == "":
+        return None
+    items = value.split(",") if isinstance(value, str) else value
+    return [cast(item) for item in items if str(item).strip() != ""] or None
+
+
+def parse_fields(value):
+    """"locations.x,locations.y,car_data.speed" 문자열 또는 {결과 키: [필드]} 를 {결과 키: [필드]} 로 바꿉니다."""
+    if not value:
+        return None
+    if isinstance(value, dict):
+        return {key: list(names) for key, names in value.items()}
+    fields = {}
+    for item in parse_list(value) or []:
+        key, _, name = item.strip().partition(".")
+        if not name:
+            raise ValueError(f"필드는 <결과 키>.<필드> 형식이어야 합니다: {item}")
+        fields.setdefault(key, []).append(name)
+    return fields
+
+
+def timing_aggregator(session_key):
+    """세션별 라이브 타이밍 집계기. 상주 워커에서는 요청 사이에 상태를 유지해 바뀐 드라이버만 갱신합니다.
+
+    _timing_lock 을 잡은 상태에서 호출해야 합니다.
+    """
+    aggregator = _timing.pop(session_key, None) or live_timing.LiveTimingAggregator()
+    _timing[session_key] = aggregator  # 최근 사용 순서 유지
+    while len(_timing) > MAX_TIMING_SESSIONS:
+        _timing.pop(next(iter(_timing)))
+    return aggregator
+
 
-    session_key = sys.argv[1]
-    start_time_str = sys.argv[2]
-    end_time_str = sys.argv[3]
+def fetch_window(session_key, start_time_str, end_time_str, sequential=SEQUENTIAL_DEFAULT,
+                 lod=0, resolution_ms=None, epsilon=0, include=None, drivers=None, fields=None):
+    """세션의 [시작, 종료] 구간 데이터와 최신 라이브 타이밍을 하나의 결과로 모읍니다.
 
+    lod(0~3) 또는 resolution_ms/epsilon 을 주면 locations 를 드라이버별로 다운샘플링합니다.
+    lod 만 준 경우 미리 만든 피라미드가 있으면 location 을 업스트림에 묻지 않고 피라미드에서 읽습니다.
+    include(RESULT_KEYS 중 일부)를 주면 나머지 결과 키는 조회하지 않고 빈 목록으로 둡니다.
+    drivers 를 주면 그 드라이버의 행만 (fetch_all 참고), fields({결과 키: [필드]})를 주면 그 필드와
+    REQUIRED_FIELDS 만 남깁니다. locations 의 ix/iy/lap_dist 는 기본으로는 붙이지 않고 fields 에 있을 때만 계산합니다.
+    """
     combined_result = {
         "error": None, # 오류 메시지 필드 추가
+        "errors": {}, # 엔드포인트별 오류 메시지 (결과 키 -> 메시지)
         "locations": [],
         "positions": [],
         "car_data": [],
@@ -51,84 +223,76 @@ if __name__ == "__main__":
         "timing": [] # 라이브 타이밍 결과 추가
     }
 
-    # --- 1. 시간 범위 데이터 가져오기 (기존 로직) ---
     try:
-        time_range_params = {
-            "session_key": session_key,
-            "date>": start_time_str,
-            "date<": end_time_str
-        }
-        # 각 데이터 병렬 요청 대신 순차 요청 (오류 발생 시 원인 파악 용이)
-        combined_result["locations"] = get_data("location", time_range_params)
-        combined_result["positions"] = get_data("position", time_range_params)
-        combined_result["car_data"] = get_data("car_data", time_range_params)
-        combined_result["race_control"] = get_data("race_control", time_range_params)
-
-        # --- 2. 최신 라이브 타이밍 데이터 가져오기 (추가된 로직) ---
-        latest_params = {"session_key": session_key, "date>=": "latest"}
-
-        # 최신 포지션 데이터
-        latest_position_data = get_data("position", latest_params)
-        if latest_position_data:
-            pos_df = pd.DataFrame(latest_position_data)
-            pos_df['date'] = pd.to_datetime(pos_df['date'])
-            # driver_number가 없는 경우 제외 (오류 방지)
-            pos_df = pos_df.dropna(subset=['driver_number'])
-            pos_df['driver_number'] = pos_df['driver_number'].astype(int) # 정수형으로 변환
-            # 각 드라이버의 가장 최신 데이터 선택
-            latest_pos_df = pos_df.loc[pos_df.groupby('driver_number')['date'].idxmax()]
-            latest_pos_df = latest_pos_df.sort_values(by='position') # 포지션 순 정렬
-
-            # 최신 랩 데이터
-            latest_lap_data = get_data("laps", latest_params)
-            laps_df = pd.DataFrame(latest_lap_data) if latest_lap_data else pd.DataFrame()
-            latest_laps_map = {}
-            if not laps_df.empty and 'driver_number' in laps_df.columns:
-                laps_df = laps_df.dropna(subset=['driver_number'])
-                laps_df['driver_number'] = laps_df['driver_number'].astype(int)
-                laps_df['date_start'] = pd.to_datetime(laps_df['date_start'])
-                latest_laps = laps_df.loc[laps_df.groupby('driver_number')['date_start'].idxmax()]
-                latest_laps_map = latest_laps.set_index('driver_number').to_dict('index')
-
-            # 최신 인터벌 데이터
-            latest_interval_data = get_data("intervals", latest_params)
-            intervals_df = pd.DataFrame(latest_interval_data) if latest_interval_data else pd.DataFrame()
-            latest_intervals_map = {}
-            if not intervals_df.empty and 'driver_number' in intervals_df.columns:
-                intervals_df = intervals_df.dropna(subset=['driver_number'])
-                intervals_df['driver_number'] = intervals_df['driver_number'].astype(int)
-                intervals_df['date'] = pd.to_datetime(intervals_df['date'])
-                latest_intervals = intervals_df.loc[intervals_df.groupby('driver_number')['date'].idxmax()]
-                latest_intervals_map = latest_intervals.set_index('driver_number').to_dict('index')
-
-            # 라이브 타이밍 데이터 취합
-            live_timing_result = []
-            for index, row in latest_pos_df.iterrows():
-                driver_number = int(row['driver_number']) # 정수형 확인
-                latest_lap = latest_laps_map.get(driver_number, {})
-                latest_interval = latest_intervals_map.get(driver_number, {})
-
-                status = "On Track" # 단순화된 상태
-
-                # interval 또는 gap_to_leader 값이 NaN/None 이 아닌지 확인 후 처리
-                interval_val = latest_interval.get('interval')
-                gap_val = latest_interval.get('gap_to_leader')
-                lap_duration_val = latest_lap.get('lap_duration')
-
-                entry = {
-                    "position": int(row['position']) if pd.notna(row['position']) else None,
-                    "driver_number": driver_number,
-                    "status": status,
-                    "interval": float(interval_val) if pd.notna(interval_val) else None,
-                    "gap_to_leader": float(gap_val) if pd.notna(gap_val) else None,
-                    "lap_time": float(lap_duration_val) if pd.notna(lap_duration_val) else None,
-                    "lap_number": int(latest_lap['lap_number']) if pd.notna(latest_lap.get('lap_number')) else None
-                }
-                live_timing_result.append(entry)
-            combined_result["timing"] = live_timing_result
-
-        else:
-             combined_result["timing"] = [] # 포지션 데이터 없으면 타이밍 비움
+        # --- 1. 시간 범위 + 최신 라이브 타이밍 데이터 가져오기 ---
+        lod = int(lod or 0)
+        if lod or resolution_ms or epsilon:
+            import trajectory_lod
+
+            lod = max(0, min(lod, len(trajectory_lod.LOD_RESOLUTION_MS) - 1))
+        include = set(include or RESULT_KEYS)
+        drivers = {int(dn) for dn in drivers} if drivers else None
+        fields = {key: set(names) for key, names in (fields or {}).items()}
+        skip = {key for key in RESULT_KEYS if key not in include and key != "timing"}
+        if "timing" not in include:
+            skip |= {q[0] for q in WINDOW_QUERIES if q[2]}
+
+        pyramid = None
+        if "locations" in include and lod and resolution_ms is None and not epsilon:
+            pyramid = trajectory_lod.read_pyramid(
+                session_key, lod, telemetry_cache.to_us(start_time_str) // 1000,
+                telemetry_cache.to_us(end_time_str) // 1000)
+        if pyramid is not None:
+            skip.add("locations")
+        data = fetch_all(session_key, start_time_str, end_time_str, sequential=sequential,
+                         errors=combined_result["errors"], skip=skip, drivers=drivers)
+        if pyramid is not None:
+            data["locations"] = [r for r in pyramid if r["driver_number"] in drivers] if drivers else pyramid
+        # 필드 고르기: 받은 직후 필요한 필드만 남김 (locations 는 보정/랩 거리 계산용 x, y 를 잠시 유지)
+        location_fields = fields.get("locations")
+        # ix/iy/lap_dist 는 fields 로 고른 경우에만 계산 (기본 응답은 그대로, 보정/중심선 로드 비용 없음)
+        derived = set()
+        if location_fields is not None and "locations" in include:
+            derived = location_fields & set(DERIVED_LOCATION_FIELDS)
+        for key, names in fields.items():
+            if key in RESULT_KEYS and key in data:
+                keep = names | set(REQUIRED_FIELDS)
+                if key == "locations" and derived:
+                    keep |= {"x", "y"}
+                data[key] = project_fields(data[key], keep)
+        for key in ("locations", "positions", "car_data", "race_control"):
+            combined_result[key] = data[key]
+        if pyramid is None and (lod or resolution_ms or epsilon):
+            if resolution_ms is None:
+                resolution_ms = trajectory_lod.LOD_RESOLUTION_MS[lod]
+            combined_result["locations"] = trajectory_lod.simplify_rows(
+                data["locations"], resolution_ms=int(resolution_ms), epsilon=float(epsilon or 0))
+
+        # 서킷 보정이 있으면 이미지 좌표(ix, iy)와 변환 행렬/이미지 bbox 를 함께 보냄 (클라이언트 워밍업 랩 불필요)
+        if derived & {"ix", "iy"}:
+            import track_calibration
+
+            combined_result["locations"], calibration = track_calibration.project_rows(
+                session_key, combined_result["locations"])
+            if calibration:
+                combined_result["calibration"] = calibration
+        # 서킷 중심선이 있으면 샘플마다 랩 거리(lap_dist)를 붙임 (순위 간격/구간 표시를 클라이언트에서 바로 계산)
+        if "lap_dist" in derived and combined_result["locations"]:
+            import track_centerline  # 이 서킷의 중심선이 있을 때만 numpy 를 불러옴
+
+            combined_result["locations"] = track_centerline.annotate_rows(session_key, combined_result["locations"])
+        if location_fields is not None and derived and not {"x", "y"} <= location_fields:
+            combined_result["locations"] = project_fields(
+                combined_result["locations"], location_fields | set(REQUIRED_FIELDS))
+
+        # --- 2. 라이브 타이밍 취합 ---
+        if "timing" in include:
+            with _timing_lock:
+                aggregator = timing_aggregator(str(session_key))
+                aggregator.apply(data["latest_position"], data["latest_laps"], data["latest_intervals"])
+                combined_result["timing"] = aggregator.table()
+            if drivers:
+                combined_result["timing"] = [e for e in combined_result["timing"] if e["driver_number"] in drivers]
 
     except Exception as e:
         # 전체 로직에서 발생한 예외 처리
@@ -136,12 +300,87 @@ if __name__ == "__main__":
         # 오류 발생 시 기존 데이터는 유지될 수 있으나, 부분 데이터일 수 있음
         print(f"Unhandled error in main block: {e}", file=sys.stderr)
 
+    return combined_result
 
-    # --- 최종 결과 출력 ---
-    # NaN 값을 JSON null로 변환하여 출력
-    def handle_nan(obj):
-        if isinstance(obj, float) and pd.isna(obj):
-            return None
-        return obj
 
-    print(json.dumps(combined_result, default=handle_nan, indent=None))
\ No newline at end of file
+# NaN 값을 JSON null로 변환하여 출력
+def handle_nan(obj):
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    return obj
+
+
+def handle_request(line):
+    """워커 요청 한 줄을 처리해 응답 dict 를 돌려줍니다."""
+    req_id = None
+    try:
+        req = json.loads(line)
+        req_id = req.get("id")
+        if req.get("op") == "stats":
+            return {"id": req_id, "result": {"cache": telemetry_cache.metrics()}}
+        result = fetch_window(str(req["session_key"]), req["start"], req["end"],
+                              sequential=req.get("sequential", SEQUENTIAL_DEFAULT), lod=req.get("lod", 0),
+                              resolution_ms=req.get("resolution_ms"), epsilon=req.get("epsilon", 0),
+                              include=parse_list(req.get("include")), drivers=parse_list(req.get("drivers"), int),
+                              fields=parse_fields(req.get("fields")))
+        if req.get("format") == "columnar":
+            result = telemetry_columns.to_columnar(result)
+        return {"id": req_id, "result": result}
+    except Exception as e:
+        return {"id": req_id, "error": f"잘못된 요청: {e}"}
+
+
+def serve(stdin=sys.stdin, stdout=sys.stdout):
+    """상주 워커 모드: 한 줄에 하나씩 JSON 요청을 받아 한 줄짜리 JSON 응답을 돌려줍니다.
+
+    요청: {"id": 1, "session_key": "9693", "start": "...", "end": "...", "sequential": false,
+           "lod": 0, "resolution_ms": null, "epsilon": 0, "format": "columnar"(선택),
+           "include": ["locations", "timing"], "drivers": [1, 44], "fields": {"locations": ["x", "y"]}}  (선택)
+          {"id": 2, "op": "stats"}  -> 캐시 적중률, coalesce 지표(flights/coalesced/in_flight) 등
+    응답: {"id": 1, "result": {...}} 또는 {"id": 1, "error": "..."}
+    요청은 SERVE_WORKERS 개까지 동시에 처리하므로 응답 순서는 요청 순서와 다를 수 있습니다. (id 로 매칭)
+    """
+    write_lock = threading.Lock()
+
+    def run(line):
+        payload = telemetry_columns.dumps(handle_request(line), default=handle_nan) + "\n"
+        with write_lock:
+            stdout.write(payload)
+            stdout.flush()
+
+    with ThreadPoolExecutor(max_workers=SERVE_WORKERS) as workers:
+        for line in stdin:
+            line = line.strip()
+            if line:
+                workers.submit(run, line)
+
+
+if __name__ == "__main__":
+    flags = {a for a in sys.argv[1:] if a.startswith("--")}
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    sequential = SEQUENTIAL_DEFAULT or "--sequential" in flags
+    options = dict(f[2:].split("=", 1) for f in flags if "=" in f)
+
+    if "--serve" in flags:
+        serve()
+        sys.exit(0)
+
+    if len(args) != 3:
+        print(json.dumps({"error": "세션 키, 시작 시간, 종료 시간을 인자로 전달해야 합니다."}))
+        sys.exit(1)
+
+    session_key, start_time_str, end_time_str = args
+
+    combined_result = fetch_window(session_key, start_time_str, end_time_str, sequential=sequential,
+                                   lod=int(options.get("lod", 0)),
+                                   resolution_ms=int(options["resolution-ms"]) if "resolution-ms" in options else None,
+                                   epsilon=float(options.get("epsilon", 0)),
+                                   include=parse_list(options.get("include")),
+                                   drivers=parse_list(options.get("drivers"), int),
+                                   fields=parse_fields(options.get("fields")))
+
+    if options.get("format") == "columnar":
+        combined_result = telemetry_columns.to_columnar(combined_result)
+
+    # --- 최종 결과 출력 ---
+    print(telemetry_columns.dumps(combined_result, default=handle_nan))
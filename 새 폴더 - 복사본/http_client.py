@@ -0,0 +1,173 @@
+# http_client.py
+# 모든 스크립트가 함께 쓰는 HTTP 클라이언트.
+# - 프로세스 공용 requests.Session (호스트별 keep-alive 연결 풀, gzip 응답; requests 는 첫 요청 때 import)
+# - conditional=True 면 ETag / Last-Modified 로 재검증하고, 304 응답은 로컬 응답 캐시의 본문으로 돌려줌
+# - (연결, 읽기) 타임아웃 기본값은 환경 변수로 조정
+# - 연결 오류 / 타임아웃 / 429 / 5xx 는 지터가 들어간 지수 백오프로 재시도 (429 는 Retry-After 우선)
+# 환경 변수:
+#   F1_HTTP_CONNECT_TIMEOUT (기본 5초), F1_HTTP_READ_TIMEOUT (기본 30초), F1_HTTP_CACHE_DIR
+import gzip
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("F1_HTTP_CACHE_DIR", os.path.join(ROOT_DIR, ".cache", "http"))
+DEFAULT_TIMEOUT = (float(os.environ.get("F1_HTTP_CONNECT_TIMEOUT", "5")),
+                   float(os.environ.get("F1_HTTP_READ_TIMEOUT", "30")))
+# 재시도 대기 상한(초)
+MAX_BACKOFF_S = 60.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "retries": 0, "not_modified": 0, "bytes": 0}
+
+
+def session():
+    """프로세스 공용 Session 을 돌려줍니다. (처음 호출할 때 생성)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.headers.update({"Accept-Encoding": "gzip, deflate", "User-Agent": "relic-f1/1.0"})
+            _session = s
+        return _session
+
+
+def stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _count(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+def retry_after_seconds(response):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 초 단위로 돌려줍니다. 없으면 None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(when.tzinfo)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt, delay):
+    """지수 백오프 + 지터 (최대 MAX_BACKOFF_S 초)."""
+    return min(MAX_BACKOFF_S, delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+# --- 조건부 요청용 응답 캐시 ---
+
+def _cache_path(url, params):
+    full = f"{url}?{urlencode(sorted((params or {}).items()))}"
+    digest = hashlib.sha256(full.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, digest[:2], f"{digest}.json.gz")
+
+
+def _load_cached(path):
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cached(path, response):
+    validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    if not any(validators.values()):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump({**validators, "url": response.url, "body": response.text}, f)
+    os.replace(tmp, path)
+
+
+def get(url, params=None, timeout=None, retries=3, backoff=1.0, conditional=False, limiter=None):
+    """GET 요청을 보내고 성공한 Response 를 돌려줍니다.
+
+    retries 는 최대 시도 횟수입니다. 마지막 시도까지 실패하면 requests 예외를 그대로 올립니다.
+    conditional=True 면 304 응답을 캐시된 본문을 가진 200 응답으로 바꿔 돌려줍니다. (response.from_cache)
+    limiter 는 acquire()/pause(seconds) 를 가진 객체로, 매 시도 전 acquire 하고 429 때 pause 합니다.
+    """
+    import requests
+
+    timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    cache_path = _cache_path(url, params) if conditional else None
+    cached = _load_cached(cache_path) if conditional else None
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    for attempt in range(max(1, retries)):
+        last = attempt == max(1, retries) - 1
+        if limiter is not None:
+            limiter.acquire()
+        _count("requests")
+        try:
+            response = session().get(url, params=params, timeout=timeout, headers=headers)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if last:
+                raise
+            wait = backoff_seconds(attempt, backoff)
+            print(f"[HTTP] {e} -> {wait:.1f}s 후 재시도 ({attempt + 1}/{retries})", file=sys.stderr)
+            _count("retries")
+            time.sleep(wait)
+            continue
+
+        if response.status_code == 304 and cached:
+            _count("not_modified")
+            response.status_code = 200
+            response._content = cached["body"].encode("utf-8")
+            response.encoding = "utf-8"
+            response.from_cache = True
+            return response
+
+        if response.status_code in RETRY_STATUS and not last:
+            wait = retry_after_seconds(response) if response.status_code == 429 else None
+            if wait is None:
+                wait = backoff_seconds(attempt, backoff)
+            else:
+                wait = min(wait, MAX_BACKOFF_S)  # 큰 Retry-After 로 워커가 오래 묶이지 않게
+            print(f"[HTTP] {response.status_code} {url} -> {wait:.1f}s 후 재시도 ({attempt + 1}/{retries})",
+                  file=sys.stderr)
+            _count("retries")
+            if limiter is not None and response.status_code == 429:
+                limiter.pause(wait)
+            else:
+                time.sleep(wait)
+            continue
+
+        response.raise_for_status()
+        response.from_cache = False
+        _count("bytes", len(response.content))
+        if conditional:
+            _store_cached(cache_path, response)
+        return response
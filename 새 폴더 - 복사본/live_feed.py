@@ -0,0 +1,322 @@
+# live_feed.py
+# 진행 중인 세션의 OpenF1 데이터를 세션당 한 번만 폴링하고, 드라이버별 변경분(delta)을
+# Server-Sent Events 로 모든 접속자에게 보냅니다. (업스트림 요청 수가 시청자 수와 무관)
+# 사용법:
+#   python live_feed.py [port]                 # 기본 8790
+#   GET /live/<session_key>   text/event-stream  (event: snapshot 1회, 이후 event: delta)
+#   GET /stats                세션별 구독자 수 / 폴링 수 / 업스트림 요청 수
+# 로컬 테스트:
+#   python scripts/fake_openf1.py 8765 --live
+#   OPENF1_BASE_URL=http://127.0.0.1:8765/v1 python live_feed.py
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import get_driver_locations
+import telemetry_cache
+import track_centerline
+
+# 폴링 간격(초)
+POLL_INTERVAL_S = float(os.environ.get("F1_LIVE_POLL_S", "1.0"))
+# 늦게 도착하는 행을 놓치지 않도록 커서보다 이만큼 앞에서부터 다시 조회 (중복은 드라이버별 시각으로 제거)
+OVERLAP_US = 3_000_000
+# 구독자가 모두 떠난 뒤 폴링을 멈추고 피드(폴링 상태)를 버리기까지의 시간(초)
+IDLE_STOP_S = 30.0
+# 구독자별 대기열 크기. 넘치면 (느린 클라이언트) 연결을 끊음
+SUBSCRIBER_QUEUE = 256
+# 스냅샷에 담을 최근 race_control 메시지 수
+RECENT_MESSAGES = 20
+KEEPALIVE_S = 15.0
+
+# (delta 키, 엔드포인트)
+FEEDS = [
+    ("locations", "location"),
+    ("positions", "position"),
+    ("intervals", "intervals"),
+    ("race_control", "race_control"),
+]
+
+
+def _sse(event, data, event_id=None):
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+class SessionFeed:
+    """세션 하나의 폴링 상태와 구독자 목록."""
+
+    def __init__(self, session_key):
+        self.session_key = session_key
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.polls = 0
+        self.upstream_requests = 0
+        self.idle_since = None
+        self._cursor = {}       # 엔드포인트별 가장 늦은 행 시각 (epoch us)
+        self._seen = {}         # (엔드포인트, 드라이버) -> 마지막으로 반영한 행 시각
+        # 현재 상태 (스냅샷용)
+        self.locations = {}     # 드라이버 -> [t_ms, x, y(, 랩 거리)]
+        self.positions = {}     # 드라이버 -> 순위
+        self.intervals = {}     # 드라이버 -> {"interval", "gap_to_leader"}
+        self.messages = []      # 최근 race_control 메시지
+        self._pool = ThreadPoolExecutor(max_workers=len(FEEDS))
+        self._thread = None
+
+    # --- 업스트림 ---
+
+    def _params(self, endpoint):
+        cursor = self._cursor.get(endpoint)
+        if cursor is None:
+            # 첫 조회: race_control 은 세션 전체, 나머지는 최신값만
+            if endpoint == "race_control":
+                return {"session_key": self.session_key}
+            return {"session_key": self.session_key, "date>=": "latest"}
+        return {"session_key": self.session_key, "date>": telemetry_cache.from_us(cursor - OVERLAP_US)}
+
+    def _fetch(self, endpoint):
+        errors = {}
+        rows = get_driver_locations.get_data(endpoint, self._params(endpoint), errors=errors)
+        return None if errors else rows
+
+    def _fresh(self, endpoint, rows, key):
+        """이미 반영한 행을 걸러 (시각 us, 행) 목록으로 돌려주고 커서를 옮깁니다."""
+        out = []
+        for row in rows:
+            try:
+                at = telemetry_cache.to_us(row.get("date"))
+            except ValueError:
+                continue
+            if at is None:
+                continue
+            k = (endpoint, key(row))
+            if at <= self._seen.get(k, -1):
+                continue
+            self._seen[k] = at
+            out.append((at, row))
+            if at > self._cursor.get(endpoint, -1):
+                self._cursor[endpoint] = at
+        out.sort(key=lambda item: item[0])
+        return out
+
+    def poll(self):
+        """한 번 폴링해 delta 를 돌려줍니다. 바뀐 것이 없으면 None."""
+        endpoints = [endpoint for _, endpoint in FEEDS]
+        results = dict(zip(endpoints, self._pool.map(self._fetch, endpoints)))
+        with self.lock:
+            return self._apply(results)
+
+    def _apply(self, results):
+        """폴링 결과를 상태에 반영하고 delta 를 만듭니다. (self.lock 안에서 호출)"""
+        endpoints = list(results)
+        self.polls += 1
+        self.upstream_requests += len(endpoints)
+        delta = {}
+
+        rows = results["location"]
+        if rows:
+            locations = {}
+            for at, row in self._fresh("location", rows, lambda r: r.get("driver_number")):
+                sample = [at // 1000, row.get("x"), row.get("y")]
+                locations.setdefault(str(row.get("driver_number")), []).append(sample)
+                self.locations[str(row.get("driver_number"))] = sample
+            if locations:
+                self._add_lap_distance(locations)
+                delta["locations"] = locations
+
+        rows = results["position"]
+        if rows:
+            changed = {}
+            for _, row in self._fresh("position", rows, lambda r: r.get("driver_number")):
+                dn = str(row.get("driver_number"))
+                if self.positions.get(dn) != row.get("position"):
+                    self.positions[dn] = changed[dn] = row.get("position")
+            if changed:
+                delta["positions"] = changed
+
+        rows = results["intervals"]
+        if rows:
+            changed = {}
+            for _, row in self._fresh("intervals", rows, lambda r: r.get("driver_number")):
+                dn = str(row.get("driver_number"))
+                value = {"interval": row.get("interval"), "gap_to_leader": row.get("gap_to_leader")}
+                if self.intervals.get(dn) != value:
+                    self.intervals[dn] = changed[dn] = value
+            if changed:
+                delta["intervals"] = changed
+
+        rows = results["race_control"]
+        if rows:
+            # race_control 은 드라이버 단위가 아니므로 메시지 내용으로 중복 제거
+            new = [row for _, row in self._fresh("race_control", rows,
+                                                lambda r: (r.get("date"), r.get("message")))]
+            if new:
+                delta["race_control"] = new
+                self.messages = (self.messages + new)[-RECENT_MESSAGES:]
+
+        return delta or None
+
+    def _add_lap_distance(self, locations):
+        """서킷 중심선이 있으면 샘플 [t_ms, x, y] 끝에 랩 거리를 붙입니다. (폴링 한 번에 한 번 투영)"""
+        centerline = track_centerline.for_session(self.session_key)
+        samples = [s for per_driver in locations.values() for s in per_driver
+                   if s[1] is not None and s[2] is not None]
+        if centerline is None or not samples:
+            return
+        dist, _ = centerline.project([s[1] for s in samples], [s[2] for s in samples])
+        for sample, d in zip(samples, np.round(dist, 1).tolist()):
+            sample.append(d)
+
+    # --- 구독 ---
+
+    def snapshot(self):
+        return {"session_key": self.session_key, "locations": self.locations, "positions": self.positions,
+                "intervals": self.intervals, "race_control": self.messages}
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE)
+        with self.lock:
+            q.put_nowait(_sse("snapshot", self.snapshot(), self.seq))
+            self.subscribers.add(q)
+            self.idle_since = None
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            self.subscribers.discard(q)
+            if not self.subscribers:
+                self.idle_since = time.monotonic()
+
+    def publish(self, delta):
+        with self.lock:
+            self.seq += 1
+            payload = _sse("delta", delta, self.seq)  # 직렬화는 구독자 수와 무관하게 한 번
+            for q in list(self.subscribers):
+                try:
+                    q.put_nowait(payload)
+                except queue.Full:
+                    # 따라오지 못하는 구독자는 끊음 (재접속하면 스냅샷부터 다시 받음)
+                    self.subscribers.discard(q)
+                    with q.mutex:
+                        q.queue.clear()
+                    q.put_nowait(None)
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            if self._close_if_idle(started):
+                return
+            try:
+                delta = self.poll()
+            except Exception as e:
+                print(f"[LIVE] {self.session_key} 폴링 실패: {e}", file=sys.stderr)
+                delta = None
+            if delta:
+                delta["t"] = int(time.time() * 1000)
+                self.publish(delta)
+            time.sleep(max(0.0, POLL_INTERVAL_S - (time.monotonic() - started)))
+
+    def _close_if_idle(self, now):
+        """구독자 없이 IDLE_STOP_S 가 지났으면 _feeds 에서 빼고 True. (같은 세션의 다음 접속은 새 피드로 시작)"""
+        with _feeds_lock, self.lock:
+            if self.subscribers or self.idle_since is None or now - self.idle_since <= IDLE_STOP_S:
+                return False
+            self._thread = None
+            if _feeds.get(self.session_key) is self:
+                del _feeds[self.session_key]
+        self._pool.shutdown(wait=False)
+        return True
+
+    def stats(self):
+        with self.lock:
+            return {"subscribers": len(self.subscribers), "polls": self.polls,
+                    "upstream_requests": self.upstream_requests, "events": self.seq}
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def subscribe(session_key):
+    """세션 피드를 구독해 (SessionFeed, 대기열) 을 돌려줍니다. (세션당 피드 하나, 없으면 만듦)
+
+    유휴 피드가 _feeds 에서 빠지는 것과 겹치지 않도록 _feeds_lock 안에서 찾고 구독합니다.
+    """
+    with _feeds_lock:
+        session = _feeds.get(session_key)
+        if session is None:
+            session = _feeds[session_key] = SessionFeed(session_key)
+        return session, session.subscribe()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if parts == ["stats"]:
+            with _feeds_lock:
+                feeds = dict(_feeds)
+            return self._json(200, {key: f.stats() for key, f in feeds.items()})
+        if len(parts) != 2 or parts[0] != "live" or not parts[1].isdigit():
+            return self._json(404, {"error": "GET /live/<session_key> 만 지원합니다."})
+
+        session, q = subscribe(parts[1])
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "keep-alive")
+        self.end_headers()
+        try:
+            self.wfile.write(b"retry: 2000\n\n")
+            while True:
+                try:
+                    payload = q.get(timeout=KEEPALIVE_S)
+                except queue.Empty:
+                    payload = b": keepalive\n\n"
+                if payload is None:
+                    break
+                self.wfile.write(payload)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            session.unsubscribe(q)
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0):
+    """백그라운드 스레드에서 피드 서버를 띄우고 (server, base_url) 을 돌려줍니다."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else int(os.environ.get("LIVE_FEED_PORT", "8790"))
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    print(f"Live feed listening on http://127.0.0.1:{port}/live/<session_key>", file=sys.stderr)
+    server.serve_forever()
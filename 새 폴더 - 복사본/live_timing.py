@@ -0,0 +1,161 @@
+# live_timing.py
+# 라이브 타이밍 표를 증분으로 유지하는 집계기.
+# 드라이버별 최신 포지션/랩/인터벌 상태를 차 번호로 인덱싱한 고정 크기 배열(__slots__ 레코드)에 보관하고,
+# 새 행이 들어오면 바뀐 드라이버의 표 항목만 다시 만듭니다. (pandas 없이 O(바뀐 드라이버 수))
+import math
+from datetime import datetime, timedelta, timezone
+
+# 차 번호는 1~99
+MAX_CAR_NUMBER = 100
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _time_us(value):
+    if value is None:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _num(value, cast=float):
+    """숫자로 바꿀 수 있으면 cast 값을, 아니면 (None, NaN, "+1 LAP" 등) None 을 돌려줍니다."""
+    if value is None:
+        return None
+    try:
+        f = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) else cast(f)
+
+
+def _car(row):
+    n = _num(row.get("driver_number"), int)
+    return n if n is not None and 0 <= n < MAX_CAR_NUMBER else None
+
+
+class DriverTiming:
+    """드라이버 한 명의 최신 상태. 각 값은 해당 행의 시각(epoch us)과 함께 보관합니다."""
+
+    __slots__ = ("driver_number", "position", "position_at", "interval", "gap_to_leader", "interval_at",
+                 "lap_time", "lap_number", "lap_at")
+
+    def __init__(self, driver_number):
+        self.driver_number = driver_number
+        self.position = self.interval = self.gap_to_leader = self.lap_time = self.lap_number = None
+        self.position_at = self.interval_at = self.lap_at = None
+
+    def entry(self):
+        return {
+            "position": self.position,
+            "driver_number": self.driver_number,
+            "status": "On Track",  # 단순화된 상태
+            "interval": self.interval,
+            "gap_to_leader": self.gap_to_leader,
+            "lap_time": self.lap_time,
+            "lap_number": self.lap_number,
+        }
+
+
+class LiveTimingAggregator:
+    """position / laps / intervals 행을 받아 포지션 순 라이브 타이밍 표를 유지합니다.
+
+    같은 드라이버의 행은 시각이 더 늦을 때만 반영하므로 행 순서나 중복에 영향을 받지 않습니다.
+    """
+
+    def __init__(self):
+        self._cars = [None] * MAX_CAR_NUMBER
+        self._entries = [None] * MAX_CAR_NUMBER
+        self._dirty = set()
+        self._order_dirty = False
+        self._table = []
+        self._index = {}
+
+    def _state(self, n):
+        car = self._cars[n]
+        if car is None:
+            car = self._cars[n] = DriverTiming(n)
+        return car
+
+    def apply_positions(self, rows):
+        for row in rows:
+            n = _car(row)
+            at = _time_us(row.get("date"))
+            if n is None or at is None:
+                continue
+            car = self._state(n)
+            if car.position_at is not None and at <= car.position_at:
+                continue
+            position = _num(row.get("position"), int)
+            if car.position_at is None or position != car.position:
+                self._order_dirty = True
+            car.position, car.position_at = position, at
+            self._dirty.add(n)
+
+    def apply_laps(self, rows):
+        for row in rows:
+            n = _car(row)
+            at = _time_us(row.get("date_start"))
+            if n is None or at is None:
+                continue
+            car = self._state(n)
+            if car.lap_at is not None and at <= car.lap_at:
+                continue
+            car.lap_time, car.lap_number, car.lap_at = _num(row.get("lap_duration")), _num(row.get("lap_number"), int), at
+            self._dirty.add(n)
+
+    def apply_intervals(self, rows):
+        for row in rows:
+            n = _car(row)
+            at = _time_us(row.get("date"))
+            if n is None or at is None:
+                continue
+            car = self._state(n)
+            if car.interval_at is not None and at <= car.interval_at:
+                continue
+            car.interval, car.gap_to_leader, car.interval_at = _num(row.get("interval")), _num(row.get("gap_to_leader")), at
+            self._dirty.add(n)
+
+    def apply(self, position_rows=(), lap_rows=(), interval_rows=()):
+        self.apply_positions(position_rows or ())
+        self.apply_laps(lap_rows or ())
+        self.apply_intervals(interval_rows or ())
+
+    def table(self):
+        """포지션 순 타이밍 표. 포지션 데이터가 있는 드라이버만 포함하며, 바뀐 드라이버의 항목만 새로 만듭니다.
+
+        돌려준 리스트와 항목은 이후 호출에서 수정되지 않습니다. (바뀐 항목은 새 dict 로 교체)
+        """
+        if self._dirty:
+            table = list(self._table)
+            for n in self._dirty:
+                car = self._cars[n]
+                if car.position_at is None:
+                    continue
+                entry = car.entry()
+                if self._entries[n] is None:
+                    self._order_dirty = True
+                else:
+                    table[self._index[n]] = entry
+                self._entries[n] = entry
+            self._dirty.clear()
+            self._table = table
+        if self._order_dirty:
+            table = [e for e in self._entries if e is not None]
+            table.sort(key=lambda e: (e["position"] is None, e["position"] or 0))
+            self._index = {e["driver_number"]: i for i, e in enumerate(table)}
+            self._table = table
+            self._order_dirty = False
+        return self._table
+
+
+def build_live_timing(latest_position_data, latest_lap_data, latest_interval_data):
+    """최신 포지션/랩/인터벌 행으로 포지션 순 라이브 타이밍 표를 만듭니다. (1회용)"""
+    aggregator = LiveTimingAggregator()
+    aggregator.apply(latest_position_data, latest_lap_data, latest_interval_data)
+    return aggregator.table()
@@ -0,0 +1,189 @@
+# replay_binary.py
+# 리플레이 위치 데이터를 드라이버별 열(column) 단위 바이너리로 저장/조회합니다.
+#
+# 파일 구조
+#   MAGIC(4) | version u16 | reserved u16 | meta 길이 u32 | meta(JSON, UTF-8) | 블록 데이터...
+#   meta: session_key, bbox, duration_ms, block_size, compression,
+#         drivers: {"<번호>": {"count": n, "blocks": [[t_first, t_last, offset, length, n, xy_bytes], ...]}}
+#   블록 (compression 이 "zlib" 이면 블록 단위로 압축):
+#     t0 int64 | x0 int32 | y0 int32 | dt int32[n-1] | dx int16/int32[n-1] | dy int16/int32[n-1]
+#   각 블록은 첫 샘플을 절댓값으로 가지므로, 원하는 시간 구간에 걸친 블록만 풀면 됩니다.
+import json
+import mmap
+import struct
+import zlib
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+MAGIC = b"F1RB"
+VERSION = 1
+BLOCK_SIZE = 1024
+_PREAMBLE = struct.Struct("<4sHHI")
+_BLOCK_HEAD = struct.Struct("<qii")
+_INT16 = np.iinfo(np.int16)
+
+
+def columns_from_locations(locations):
+    """OpenF1 location 행 목록(또는 telemetry_ingest.to_frame("location") 결과)을
+    {driver_number: (t_ms, x, y)} 정렬 배열로 바꿉니다. x/y 가 비어 있는 행은 버립니다.
+    """
+    import telemetry_ingest
+
+    df = locations if hasattr(locations, "columns") else telemetry_ingest.to_frame("location", locations)
+    if df.empty:
+        return {}
+    t_ms = df["date_ms"].to_numpy()
+    dn = df["driver_number"].to_numpy().astype(np.int64)
+    xs = df["x"].to_numpy().astype(np.int32)
+    ys = df["y"].to_numpy().astype(np.int32)
+
+    order = np.lexsort((t_ms, dn))
+    dn, t_ms, xs, ys = dn[order], t_ms[order], xs[order], ys[order]
+    keys, starts = np.unique(dn, return_index=True)
+    ends = np.append(starts[1:], len(dn))
+    return {int(k): (t_ms[a:b], xs[a:b], ys[a:b]) for k, a, b in zip(keys, starts, ends)}
+
+
+def _encode_block(t, x, y):
+    dt = np.diff(t)
+    if dt.size and (dt.max() > np.iinfo(np.int32).max or dt.min() < 0):
+        raise ValueError("샘플 간격이 int32 범위를 벗어났거나 시간이 정렬되어 있지 않습니다.")
+    dx = np.diff(x.astype(np.int64))
+    dy = np.diff(y.astype(np.int64))
+    narrow = not dx.size or (min(dx.min(), dy.min()) >= _INT16.min and max(dx.max(), dy.max()) <= _INT16.max)
+    xy_dtype = np.int16 if narrow else np.int32
+    payload = b"".join([
+        _BLOCK_HEAD.pack(int(t[0]), int(x[0]), int(y[0])),
+        dt.astype("<i4").tobytes(),
+        dx.astype(np.dtype(xy_dtype).newbyteorder("<")).tobytes(),
+        dy.astype(np.dtype(xy_dtype).newbyteorder("<")).tobytes(),
+    ])
+    return payload, np.dtype(xy_dtype).itemsize
+
+
+def _decode_block(payload, n, xy_bytes):
+    t0, x0, y0 = _BLOCK_HEAD.unpack_from(payload, 0)
+    xy_dtype = "<i2" if xy_bytes == 2 else "<i4"
+    off = _BLOCK_HEAD.size
+    dt = np.frombuffer(payload, dtype="<i4", count=n - 1, offset=off)
+    off += 4 * (n - 1)
+    dx = np.frombuffer(payload, dtype=xy_dtype, count=n - 1, offset=off)
+    off += xy_bytes * (n - 1)
+    dy = np.frombuffer(payload, dtype=xy_dtype, count=n - 1, offset=off)
+
+    t = np.empty(n, dtype=np.int64)
+    x = np.empty(n, dtype=np.int32)
+    y = np.empty(n, dtype=np.int32)
+    t[0], x[0], y[0] = t0, x0, y0
+    if n > 1:
+        t[1:] = t0 + np.cumsum(dt, dtype=np.int64)
+        x[1:] = x0 + np.cumsum(dx, dtype=np.int64)
+        y[1:] = y0 + np.cumsum(dy, dtype=np.int64)
+    return t, x, y
+
+
+def write_replay(path, columns, session_key=None, bbox=None, duration_ms=None,
+                 compress=True, block_size=BLOCK_SIZE):
+    """{driver_number: (t_ms, x, y)} 배열을 바이너리 리플레이 파일로 씁니다. 쓴 바이트 수를 돌려줍니다."""
+    blocks = []
+    meta_drivers = {}
+    offset = 0
+    for dn in sorted(columns):
+        t, x, y = (np.asarray(a) for a in columns[dn])
+        entries = []
+        for lo in range(0, len(t), block_size):
+            hi = min(lo + block_size, len(t))
+            payload, xy_bytes = _encode_block(t[lo:hi], x[lo:hi], y[lo:hi])
+            if compress:
+                payload = zlib.compress(payload, 6)
+            entries.append([int(t[lo]), int(t[hi - 1]), offset, len(payload), hi - lo, xy_bytes])
+            blocks.append(payload)
+            offset += len(payload)
+        meta_drivers[str(dn)] = {"count": int(len(t)), "blocks": entries}
+
+    if bbox is None and columns:
+        all_x = [c[1] for c in columns.values() if len(c[1])]
+        all_y = [c[2] for c in columns.values() if len(c[2])]
+        if all_x:
+            bbox = {"minX": int(min(a.min() for a in all_x)), "maxX": int(max(a.max() for a in all_x)),
+                    "minY": int(min(a.min() for a in all_y)), "maxY": int(max(a.max() for a in all_y))}
+    meta = {
+        "session_key": session_key,
+        "bbox": bbox,
+        "duration_ms": duration_ms,
+        "block_size": block_size,
+        "compression": "zlib" if compress else None,
+        "drivers": meta_drivers,
+    }
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, 0, len(meta_bytes)))
+        f.write(meta_bytes)
+        for payload in blocks:
+            f.write(payload)
+    return _PREAMBLE.size + len(meta_bytes) + offset
+
+
+class ReplayReader:
+    """바이너리 리플레이 파일을 메모리 매핑해 필요한 시간 구간의 블록만 풀어 읽습니다."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, meta_len = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"지원하지 않는 리플레이 파일입니다: {path}")
+        self.meta = json.loads(self._mm[_PREAMBLE.size:_PREAMBLE.size + meta_len].decode("utf-8"))
+        self._data_start = _PREAMBLE.size + meta_len
+        self._compressed = self.meta.get("compression") == "zlib"
+        # 블록 탐색용 (t_first, t_last) 목록
+        self._firsts = {dn: [b[0] for b in d["blocks"]] for dn, d in self.meta["drivers"].items()}
+        self._lasts = {dn: [b[1] for b in d["blocks"]] for dn, d in self.meta["drivers"].items()}
+
+    @property
+    def drivers(self):
+        return [int(dn) for dn in self.meta["drivers"]]
+
+    def _block(self, entry):
+        _, _, offset, length, n, xy_bytes = entry
+        start = self._data_start + offset
+        payload = self._mm[start:start + length]
+        if self._compressed:
+            payload = zlib.decompress(payload)
+        return _decode_block(payload, n, xy_bytes)
+
+    def slice(self, start_ms=None, end_ms=None, drivers=None):
+        """[start_ms, end_ms] 구간의 {driver_number: (t_ms, x, y)} 를 돌려줍니다. None 은 열린 구간."""
+        lo = float("-inf") if start_ms is None else start_ms
+        hi = float("inf") if end_ms is None else end_ms
+        wanted = self.meta["drivers"] if drivers is None else [str(d) for d in drivers]
+        out = {}
+        for dn in wanted:
+            info = self.meta["drivers"].get(dn)
+            if info is None:
+                continue
+            # t_last >= lo 인 첫 블록부터 t_first <= hi 인 마지막 블록까지
+            first = bisect_left(self._lasts[dn], lo)
+            last = bisect_right(self._firsts[dn], hi)
+            parts = [self._block(entry) for entry in info["blocks"][first:last]]
+            if not parts:
+                out[int(dn)] = (np.empty(0, np.int64), np.empty(0, np.int32), np.empty(0, np.int32))
+                continue
+            t = np.concatenate([p[0] for p in parts])
+            x = np.concatenate([p[1] for p in parts])
+            y = np.concatenate([p[2] for p in parts])
+            a, b = np.searchsorted(t, lo, side="left"), np.searchsorted(t, hi, side="right")
+            out[int(dn)] = (t[a:b], x[a:b], y[a:b])
+        return out
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
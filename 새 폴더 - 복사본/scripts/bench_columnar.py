@@ -0,0 +1,94 @@
+# scripts/bench_columnar.py
+# get_driver_locations 응답의 행 형식과 열 형식(telemetry_columns.py) 비교 벤치마크.
+# fake_openf1 의 합성 데이터로 구간 응답(locations/positions/car_data/race_control)을 만들어
+# 페이로드 크기, 직렬화 시간(json / orjson), 파싱 시간(파이썬 json.loads, node 가 있으면 V8 JSON.parse)을 출력합니다.
+# 사용법:
+#   python scripts/bench_columnar.py [--seconds 60] [--repeat 5]
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_openf1
+import telemetry_columns
+
+NODE_PARSE = """
+const fs = require('fs');
+const text = fs.readFileSync(process.argv[1], 'utf8');
+const repeat = Number(process.argv[2]);
+JSON.parse(text);
+const t0 = process.hrtime.bigint();
+for (let i = 0; i < repeat; i++) JSON.parse(text);
+console.log(Number(process.hrtime.bigint() - t0) / 1e6 / repeat);
+"""
+
+
+def window_result(seconds):
+    start = fake_openf1.SESSION_START + timedelta(minutes=30)
+    params = {"session_key": "9999", "date>": start.isoformat(),
+              "date<": (start + timedelta(seconds=seconds)).isoformat()}
+    result = {"error": None, "errors": {}}
+    for key, endpoint in [("locations", "location"), ("positions", "position"),
+                          ("car_data", "car_data"), ("race_control", "race_control")]:
+        result[key] = fake_openf1.generate(endpoint, params)
+    result["timing"] = []
+    return result
+
+
+def best_of(repeat, fn, *args):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        times.append(time.perf_counter() - t0)
+    return out, min(times) * 1000
+
+
+def node_parse_ms(text, repeat):
+    if shutil.which("node") is None:
+        return None
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        f.write(text)
+        path = f.name
+    try:
+        out = subprocess.run(["node", "-e", NODE_PARSE, path, str(repeat)], capture_output=True, text=True, check=True)
+        return float(out.stdout.strip())
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = window_result(args.seconds)
+    n = sum(len(rows[k]) for k in telemetry_columns.COLUMNAR_KEYS)
+    columnar, t_convert = best_of(args.repeat, telemetry_columns.to_columnar, rows)
+    print(f"{args.seconds:.0f} s window, {n:,} rows (locations/positions/car_data); "
+          f"row -> columnar conversion {t_convert:.1f} ms; orjson {'yes' if telemetry_columns.orjson else 'no'}")
+    print(f"{'format':<10}{'encoder':<9}{'bytes':>12}{'encode ms':>11}{'py parse ms':>13}{'node parse ms':>15}")
+
+    encoders = [("json", lambda obj: json.dumps(obj, indent=None))]
+    if telemetry_columns.orjson is not None:
+        encoders.append(("orjson", telemetry_columns.dumps))
+    for name, data in [("rows", rows), ("columnar", columnar)]:
+        for encoder, dumps in encoders:
+            text, t_encode = best_of(args.repeat, dumps, data)
+            _, t_parse = best_of(args.repeat, json.loads, text)
+            t_node = node_parse_ms(text, args.repeat)
+            node = f"{t_node:15.1f}" if t_node is not None else f"{'-':>15}"
+            print(f"{name:<10}{encoder:<9}{len(text.encode('utf-8')):>12,}{t_encode:>11.1f}{t_parse:>13.1f}{node}")
+
+
+if __name__ == "__main__":
+    main()
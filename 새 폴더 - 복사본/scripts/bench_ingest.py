@@ -0,0 +1,86 @@
+# scripts/bench_ingest.py
+# OpenF1 행 목록 -> DataFrame 변환 비교 벤치마크.
+# 기존 방식(pd.DataFrame(rows) + pd.to_datetime(format="ISO8601"))과 telemetry_ingest.to_frame 의
+# 변환 시간과 메모리(memory_usage(deep=True), 100만 행 기준으로 환산)를 엔드포인트별로 출력하고,
+# 두 방식의 시각/값이 같은지도 확인합니다.
+# 사용법:
+#   python scripts/bench_ingest.py [--rows 1000000] [--repeat 3]
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_openf1
+import telemetry_ingest
+
+
+def make_rows(endpoint, n):
+    """fake_openf1 로 n 행을 만듭니다. (세션 전체가 n 행보다 적으면 되풀이)"""
+    rows = []
+    start = fake_openf1.SESSION_START
+    step = timedelta(minutes=10)
+    while len(rows) < n:
+        params = {"session_key": "9999", "date>": start.isoformat(), "date<": (start + step).isoformat()}
+        chunk = fake_openf1.generate(endpoint, params)
+        if not chunk:
+            break
+        rows.extend(chunk)
+        start += step
+    if rows and len(rows) < n:
+        rows = rows * -(-n // len(rows))
+    return rows[:n]
+
+
+def legacy_frame(rows, time_field):
+    df = pd.DataFrame(rows)
+    df[time_field] = pd.to_datetime(df[time_field], format="ISO8601", utc=True)
+    return df
+
+
+def best_of(repeat, fn, *args):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        times.append(time.perf_counter() - t0)
+    return out, min(times)
+
+
+def same_values(legacy, typed, time_field, unit):
+    t_legacy = legacy[time_field].dt.as_unit(unit).astype("int64").to_numpy()
+    if not np.array_equal(t_legacy, typed[f"{time_field}_{unit}"].to_numpy()):
+        return False
+    for name in typed.columns:
+        if name in legacy.columns and not legacy[name].astype(object).equals(typed[name].astype(object)):
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<14}{'rows':>11}{'method':>9}{'parse s':>10}{'MB / 1M rows':>15}{'same':>6}")
+    for endpoint, n in [("location", args.rows), ("race_control", args.rows // 100)]:
+        rows = make_rows(endpoint, n)
+        if not rows:
+            continue
+        legacy, t_legacy = best_of(args.repeat, legacy_frame, rows, "date")
+        typed, t_typed = best_of(args.repeat, telemetry_ingest.to_frame, endpoint, rows)
+        same = same_values(legacy, typed, "date", "ms")
+        for method, df, t in [("legacy", legacy, t_legacy), ("typed", typed, t_typed)]:
+            mb = df.memory_usage(deep=True).sum() / len(rows) * 1_000_000 / 1e6
+            print(f"{endpoint:<14}{len(rows):>11,}{method:>9}{t:>10.2f}{mb:>15.1f}{str(same):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# scripts/bench_live_feed.py
+# live_feed.py 팬아웃 확인용 벤치마크.
+# fake_openf1 을 --live 모드로 띄우고 SSE 클라이언트 N 개를 붙여, 업스트림 요청 수가 클라이언트 수와
+# 무관한지(폴링 방식이면 클라이언트 x 폴링 x 7 요청)와 클라이언트가 받은 이벤트/바이트를 출력합니다.
+# 사용법:
+#   python scripts/bench_live_feed.py [--clients 50] [--seconds 10]
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_openf1
+
+SESSION_KEY = "9999"
+
+
+def client(base_url, stop, stats, idx):
+    url = urlparse(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=5)
+    conn.request("GET", f"/live/{SESSION_KEY}")
+    response = conn.getresponse()
+    events = received = 0
+    try:
+        while not stop.is_set():
+            line = response.fp.readline()
+            if not line:
+                break
+            received += len(line)
+            if line.startswith(b"event: "):
+                events += 1
+    except OSError:
+        pass
+    finally:
+        conn.close()
+    stats[idx] = (events, received)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    _, openf1_url = fake_openf1.start_server(live=True)
+    os.environ["OPENF1_BASE_URL"] = openf1_url
+    import live_feed  # OPENF1_BASE_URL 설정 후 import
+    import get_driver_locations
+    _, feed_url = live_feed.start_server()
+
+    stats_conn = http.client.HTTPConnection(urlparse(feed_url).hostname, urlparse(feed_url).port, timeout=5)
+    stop = threading.Event()
+    stats = {}
+    threads = [threading.Thread(target=client, args=(feed_url, stop, stats, i), daemon=True)
+               for i in range(args.clients)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    # 클라이언트가 붙어 있는 동안 피드 지표를 읽음 (모두 떠나면 유휴 시간 뒤 피드가 사라짐)
+    stats_conn.request("GET", "/stats")
+    feed = json.loads(stats_conn.getresponse().read())[SESSION_KEY]
+    stats_conn.close()
+    stop.set()
+    for t in threads:
+        t.join(timeout=5)
+
+    upstream = sum(fake_openf1.request_counts.values())
+    events = [s[0] for s in stats.values()]
+    received = sum(s[1] for s in stats.values())
+    per_poll = len(get_driver_locations.WINDOW_QUERIES)
+    print(f"clients {args.clients}, {args.seconds:.0f} s, polls {feed['polls']}, events published {feed['events']}")
+    print(f"upstream requests: {upstream} (SSE)  vs  ~{args.clients * feed['polls'] * per_poll} "
+          f"(each client polling /api/locations at the same rate)")
+    print(f"events per client min {min(events)} max {max(events)}, total received {received / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
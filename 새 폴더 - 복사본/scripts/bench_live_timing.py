@@ -0,0 +1,133 @@
+# scripts/bench_live_timing.py
+# 라이브 타이밍 표 생성 벤치마크: 기존 pandas 경로(호출마다 DataFrame 3개 + groupby/idxmax + iterrows) vs
+# live_timing.LiveTimingAggregator (드라이버별 상태를 유지하고 바뀐 드라이버만 갱신).
+# fake_openf1 의 합성 데이터로 1초 간격 폴링을 흉내 내고, 매 폴링 결과가 같은지도 확인합니다.
+# 사용법:
+#   python scripts/bench_live_timing.py [--polls 600]
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_openf1
+import live_timing
+
+
+def legacy_build_live_timing(latest_position_data, latest_lap_data, latest_interval_data):
+    """기존 get_driver_locations.build_live_timing (pandas)."""
+    if not latest_position_data:
+        return []
+    pos_df = pd.DataFrame(latest_position_data)
+    pos_df['date'] = pd.to_datetime(pos_df['date'])
+    pos_df = pos_df.dropna(subset=['driver_number'])
+    pos_df['driver_number'] = pos_df['driver_number'].astype(int)
+    latest_pos_df = pos_df.loc[pos_df.groupby('driver_number')['date'].idxmax()]
+    latest_pos_df = latest_pos_df.sort_values(by='position')
+
+    laps_df = pd.DataFrame(latest_lap_data) if latest_lap_data else pd.DataFrame()
+    latest_laps_map = {}
+    if not laps_df.empty and 'driver_number' in laps_df.columns:
+        laps_df = laps_df.dropna(subset=['driver_number'])
+        laps_df['driver_number'] = laps_df['driver_number'].astype(int)
+        laps_df['date_start'] = pd.to_datetime(laps_df['date_start'])
+        latest_laps = laps_df.loc[laps_df.groupby('driver_number')['date_start'].idxmax()]
+        latest_laps_map = latest_laps.set_index('driver_number').to_dict('index')
+
+    intervals_df = pd.DataFrame(latest_interval_data) if latest_interval_data else pd.DataFrame()
+    latest_intervals_map = {}
+    if not intervals_df.empty and 'driver_number' in intervals_df.columns:
+        intervals_df = intervals_df.dropna(subset=['driver_number'])
+        intervals_df['driver_number'] = intervals_df['driver_number'].astype(int)
+        intervals_df['date'] = pd.to_datetime(intervals_df['date'])
+        latest_intervals = intervals_df.loc[intervals_df.groupby('driver_number')['date'].idxmax()]
+        latest_intervals_map = latest_intervals.set_index('driver_number').to_dict('index')
+
+    result = []
+    for _, row in latest_pos_df.iterrows():
+        driver_number = int(row['driver_number'])
+        latest_lap = latest_laps_map.get(driver_number, {})
+        latest_interval = latest_intervals_map.get(driver_number, {})
+        interval_val = latest_interval.get('interval')
+        gap_val = latest_interval.get('gap_to_leader')
+        lap_duration_val = latest_lap.get('lap_duration')
+        result.append({
+            "position": int(row['position']) if pd.notna(row['position']) else None,
+            "driver_number": driver_number,
+            "status": "On Track",
+            "interval": float(interval_val) if pd.notna(interval_val) else None,
+            "gap_to_leader": float(gap_val) if pd.notna(gap_val) else None,
+            "lap_time": float(lap_duration_val) if pd.notna(lap_duration_val) else None,
+            "lap_number": int(latest_lap['lap_number']) if pd.notna(latest_lap.get('lap_number')) else None,
+        })
+    return result
+
+
+def polls(n):
+    """1초 간격 폴링마다 'date>=latest' 응답에 해당하는 (positions, laps, intervals) 행을 만듭니다."""
+    out = []
+    for i in range(n):
+        now = fake_openf1.SESSION_START + timedelta(seconds=120 + i)
+        def window(endpoint, seconds):
+            lo = now - timedelta(seconds=seconds)
+            return fake_openf1.generate(endpoint, {"session_key": 9999, "date>=": lo.isoformat(), "date<": now.isoformat()})
+        out.append((window("position", 15), window("laps", 90), window("intervals", 4)))
+    return out
+
+
+def measure(label, fn, inputs):
+    times = []
+    for args in inputs:
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    peaks = []
+    for args in inputs[:50]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(*args)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    times.sort()
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+    print(f"{label:<12} p50 {statistics.median(times):8.3f} ms   p99 {p99:8.3f} ms   "
+          f"peak alloc/poll {statistics.median(peaks) / 1024:8.1f} KiB")
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--polls", type=int, default=600)
+    args = parser.parse_args()
+
+    inputs = polls(args.polls)
+    aggregator = live_timing.LiveTimingAggregator()
+
+    def incremental(positions, laps, intervals):
+        aggregator.apply(positions, laps, intervals)
+        return aggregator.table()
+
+    # 매 폴링 결과 비교 (별도 집계기로)
+    check = live_timing.LiveTimingAggregator()
+    for positions, laps, intervals in inputs:
+        check.apply(positions, laps, intervals)
+        if check.table() != legacy_build_live_timing(positions, laps, intervals):
+            print("결과가 다릅니다.")
+            sys.exit(1)
+    print(f"{len(inputs)} polls, identical=True")
+
+    t_old = measure("pandas", legacy_build_live_timing, inputs)
+    t_new = measure("incremental", incremental, inputs)
+    print(f"speedup {t_old / t_new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# scripts/bench_locations_worker.py
+# 요청마다 get_driver_locations.py 를 새로 띄우는 방식과 --serve 상주 워커 방식의 지연시간(p50/p99)을 비교합니다.
+# 기본으로 로컬 대체 OpenF1 서버(scripts/fake_openf1.py)를 띄워 네트워크 영향을 제거합니다.
+# 사용법:
+#   python scripts/bench_locations_worker.py [--requests 50] [--base-url https://api.openf1.org/v1] [--session-key 9693]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_PATH = os.path.join(ROOT_DIR, "get_driver_locations.py")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_openf1
+
+
+def windows(count, chunk_s=20):
+    """레이스 트래커처럼 연속된 청크 구간을 만듭니다."""
+    start = fake_openf1.SESSION_START
+    for i in range(count):
+        a = start + timedelta(seconds=i * chunk_s)
+        b = a + timedelta(seconds=chunk_s)
+        yield a.isoformat().replace("+00:00", "Z"), b.isoformat().replace("+00:00", "Z")
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def bench_spawn(session_key, count, env):
+    samples = []
+    for start, end in windows(count):
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, "-X", "utf8", SCRIPT_PATH, session_key, start, end],
+                             capture_output=True, text=True, env=env, check=True).stdout
+        json.loads(out)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def bench_worker(session_key, count, env):
+    proc = subprocess.Popen([sys.executable, "-X", "utf8", SCRIPT_PATH, "--serve"], stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, text=True, env=env)
+    samples = []
+    try:
+        # 워커 기동 비용은 한 번뿐이므로 첫 요청으로 예열한 뒤 측정
+        for i, (start, end) in enumerate(windows(count + 1)):
+            t0 = time.perf_counter()
+            proc.stdin.write(json.dumps({"id": i, "session_key": session_key, "start": start, "end": end}) + "\n")
+            proc.stdin.flush()
+            json.loads(proc.stdout.readline())
+            if i > 0:
+                samples.append((time.perf_counter() - t0) * 1000)
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return samples
+
+
+def report(name, samples):
+    print(f"{name:>8}: n={len(samples)}  p50={percentile(samples, 50):8.1f} ms  "
+          f"p99={percentile(samples, 99):8.1f} ms  mean={statistics.mean(samples):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--base-url", default=None, help="지정하지 않으면 로컬 대체 서버를 사용")
+    parser.add_argument("--session-key", default="9693")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # 디스크 캐시가 결과를 왜곡하지 않도록 실행마다 빈 캐시 디렉터리 사용
+    env["F1_CACHE_DIR"] = tempfile.mkdtemp(prefix="f1-bench-cache-")
+    if args.base_url:
+        env["OPENF1_BASE_URL"] = args.base_url
+    else:
+        server, base_url = fake_openf1.start_server()
+        env["OPENF1_BASE_URL"] = base_url
+
+    print(f"upstream: {env['OPENF1_BASE_URL']}")
+    spawn_samples = bench_spawn(args.session_key, args.requests, env)
+    worker_samples = bench_worker(args.session_key, args.requests, env)
+    report("spawn", spawn_samples)
+    report("worker", worker_samples)
+    print(f"p50 speedup: {percentile(spawn_samples, 50) / percentile(worker_samples, 50):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# scripts/bench_replay_binary.py
+# JSON 리플레이 출력과 replay_binary 형식의 크기, 구간 조회 속도를 비교합니다.
+# 사용법:
+#   python scripts/bench_replay_binary.py [--rows 1000000]
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPTS_DIR))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import f1_get_track_data
+import replay_binary
+from bench_track_frames import synthetic_race
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    locations, positions = synthetic_race(args.rows)
+    replay = f1_get_track_data.process_data(9999, locations, [], positions)
+    json_bytes = len(json.dumps(replay, ensure_ascii=False).encode("utf-8"))
+    positions_only = {**replay, "frames": [{"t": f["t"], "positions": f["positions"]} for f in replay["frames"]]}
+    json_pos_bytes = len(json.dumps(positions_only, ensure_ascii=False).encode("utf-8"))
+    del replay, positions_only
+
+    columns = replay_binary.columns_from_locations(locations)
+    tmp = tempfile.mkdtemp(prefix="f1-bench-bin-")
+    sizes = {}
+    for compress in (False, True):
+        path = os.path.join(tmp, f"replay{'.z' if compress else ''}.f1rb")
+        t0 = time.perf_counter()
+        sizes[compress] = replay_binary.write_replay(path, columns, session_key=9999, compress=compress)
+        print(f"write ({'zlib' if compress else 'raw '}) {time.perf_counter() - t0:6.2f} s")
+
+    print(f"rows                     : {len(locations):,}")
+    print(f"JSON (frames+standings)  : {json_bytes / 1e6:9.1f} MB")
+    print(f"JSON (positions only)    : {json_pos_bytes / 1e6:9.1f} MB")
+    for compress, size in sizes.items():
+        label = "binary zlib" if compress else "binary raw"
+        print(f"{label:<25}: {size / 1e6:9.2f} MB   "
+              f"{json_bytes / size:6.1f}x vs JSON, {json_pos_bytes / size:6.1f}x vs positions-only JSON")
+
+    # 무작위 20초 구간 조회: 전체 파일을 읽지 않고 해당 블록만 풂
+    path = os.path.join(tmp, "replay.z.f1rb")
+    with replay_binary.ReplayReader(path) as reader:
+        full = reader.slice()
+        ok = all(np.array_equal(full[dn][i], columns[dn][i]) for dn in columns for i in range(3))
+        print(f"round-trip identical     : {ok}")
+        t_min = min(int(c[0][0]) for c in columns.values())
+        t_max = max(int(c[0][-1]) for c in columns.values())
+        rng = np.random.default_rng(1)
+        starts = rng.integers(t_min, t_max - 20_000, 200).tolist()
+        t0 = time.perf_counter()
+        for s in starts:
+            reader.slice(s, s + 20_000)
+        per = (time.perf_counter() - t0) / len(starts) * 1000
+        print(f"20 s slice (all drivers) : {per:6.2f} ms")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# scripts/bench_startup.py
+# CLI 스크립트의 시작 시간 예산 검사. 두 가지를 잽니다 (여러 번 중 최솟값):
+# - import: 새 인터프리터에서 `python -X importtime -c "import <모듈>"` 의 모듈 누적 import 시간
+# - run: 실제 작은 요청 한 번의 프로세스 전체 시간. fake_openf1 을 띄우고 빈 캐시로 실행하므로
+#   요청 도중에 불러오는 requests/numpy 등도 포함됩니다. (get_driver_locations.py 의 5초 구간 조회)
+# 예산(ms)을 넘으면 가장 무거운 import 를 보여 주고 종료 코드 1 로 끝납니다.
+# 요청마다 새로 뜨는 get_driver_locations.py 는 예산을 작게, 상주 서버/배치 스크립트는 넉넉하게 잡습니다.
+# 사용법 (프로젝트 루트에서):
+#   python scripts/bench_startup.py [--repeat 5] [--budget get_driver_locations=60 ...]
+#                                   [--run-budget get_driver_locations=300 ...] [--top 8]
+#   F1_STARTUP_BUDGET_SCALE=2 : 모든 예산에 곱할 배수 (느린 CI 머신 등)
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_openf1
+
+# 모듈 -> 누적 import 시간 예산(ms)
+BUDGETS_MS = {
+    "get_driver_locations": 60,
+    "f1_get_gp_list": 40,
+    "track_calibration": 20,
+    "live_feed": 250,
+    "f1_get_track_data": 250,
+}
+# 스크립트 -> 작은 요청 한 번의 프로세스 시간 예산(ms)
+RUN_BUDGETS_MS = {
+    "get_driver_locations": 300,
+}
+# run 측정에 쓰는 구간 (fake_openf1 세션 시작 30분 뒤부터 5초, 보정이 있는 세션)
+RUN_SESSION = "9693"
+RUN_WINDOW_S = 5
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력을 (모듈 이름, 자체 us, 누적 us, 깊이) 목록으로 바꿉니다."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # 머리글 줄
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), self_us, cumulative_us, depth))
+    return entries
+
+
+def measure(module):
+    """새 인터프리터로 module 을 import 해 (누적 import ms, 프로세스 ms, importtime 항목) 을 돌려줍니다."""
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT_DIR, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - t0) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import 실패")
+    entries = parse_importtime(proc.stderr)
+    own = [e for e in entries if e[0] == module and e[3] == 0]
+    return (own[-1][2] / 1000 if own else 0.0), wall_ms, entries
+
+
+def run_args(script):
+    start = fake_openf1.SESSION_START + timedelta(minutes=30)
+    end = start + timedelta(seconds=RUN_WINDOW_S)
+    return [f"{script}.py", RUN_SESSION, start.isoformat(), end.isoformat()]
+
+
+def measure_run(script, base_url):
+    """빈 캐시로 script 의 작은 요청을 한 번 실행해 (프로세스 ms, importtime 항목) 을 돌려줍니다."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "OPENF1_BASE_URL": base_url,
+               "F1_CACHE_DIR": os.path.join(tmp, "openf1"), "F1_HTTP_CACHE_DIR": os.path.join(tmp, "http")}
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", *run_args(script)],
+                              cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+        wall_ms = (time.perf_counter() - t0) * 1000
+    try:
+        result = json.loads(proc.stdout)
+    except ValueError:
+        result = None
+    if proc.returncode != 0 or not isinstance(result, dict) or result.get("error") or result.get("errors"):
+        lines = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        raise RuntimeError(lines[-1] if lines else (result or {}).get("error") or "실행 실패")
+    return wall_ms, parse_importtime(proc.stderr)
+
+
+def heaviest(entries, module, top):
+    """module 아래에서 직접 import 된 모듈을 누적 시간 순으로 top 개. (module 이 None 이면 최상위 import)"""
+    children = []
+    for name, _, cumulative_us, depth in entries:
+        if module is None:
+            if depth == 0:
+                children.append((cumulative_us / 1000, name))
+        elif depth == 1:
+            children.append((cumulative_us / 1000, name))
+        elif depth == 0 and name == module:
+            break
+        elif depth == 0:
+            children = []
+    return sorted(children, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="예산 덮어쓰기/추가 (여러 번 가능)")
+    parser.add_argument("--run-budget", action="append", default=[], metavar="SCRIPT=MS",
+                        help="작은 요청 실행 예산 덮어쓰기/추가 (여러 번 가능)")
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    budgets = dict(BUDGETS_MS)
+    for item in args.budget:
+        module, _, ms = item.partition("=")
+        budgets[module] = float(ms)
+    run_budgets = dict(RUN_BUDGETS_MS)
+    for item in args.run_budget:
+        script, _, ms = item.partition("=")
+        run_budgets[script] = float(ms)
+    scale = float(os.environ.get("F1_STARTUP_BUDGET_SCALE", "1"))
+
+    print(f"{'module':<24}{'import ms':>11}{'process ms':>12}{'budget ms':>11}  result")
+    failed = []
+    for module, budget in budgets.items():
+        budget *= scale
+        try:
+            runs = [measure(module) for _ in range(max(1, args.repeat))]
+        except RuntimeError as e:
+            print(f"{module:<24}{'-':>11}{'-':>12}{budget:>11.0f}  ERROR {e}")
+            failed.append(module)
+            continue
+        import_ms, _, entries = min(runs, key=lambda r: r[0])
+        wall_ms = min(r[1] for r in runs)
+        ok = import_ms <= budget
+        print(f"{module:<24}{import_ms:>11.1f}{wall_ms:>12.1f}{budget:>11.0f}  {'ok' if ok else 'OVER'}")
+        if not ok:
+            failed.append(module)
+            for ms, name in heaviest(entries, module, args.top):
+                print(f"{'':<6}{ms:>8.1f} ms  {name}")
+
+    server, base_url = fake_openf1.start_server()
+    try:
+        print(f"{'script (run)':<24}{'':>11}{'process ms':>12}{'budget ms':>11}  result")
+        for script, budget in run_budgets.items():
+            budget *= scale
+            label = f"{script} {RUN_WINDOW_S}s"
+            try:
+                runs = [measure_run(script, base_url) for _ in range(max(1, args.repeat))]
+            except RuntimeError as e:
+                print(f"{label:<24}{'':>11}{'-':>12}{budget:>11.0f}  ERROR {e}")
+                failed.append(f"{script} (run)")
+                continue
+            wall_ms, entries = min(runs, key=lambda r: r[0])
+            ok = wall_ms <= budget
+            print(f"{label:<24}{'':>11}{wall_ms:>12.1f}{budget:>11.0f}  {'ok' if ok else 'OVER'}")
+            if not ok:
+                failed.append(f"{script} (run)")
+                for ms, name in heaviest(entries, None, args.top):
+                    print(f"{'':<6}{ms:>8.1f} ms  {name}")
+    finally:
+        server.shutdown()
+
+    if failed:
+        print(f"시작 시간 예산 초과: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
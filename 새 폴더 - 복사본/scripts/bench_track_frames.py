@@ -0,0 +1,141 @@
+# scripts/bench_track_frames.py
+# f1_get_track_data.process_data 벤치마크.
+# 합성 레이스 데이터(기본 약 100만 location 행)로 벡터화 버전의 처리 시간을 재고,
+# 작은 부분집합에서는 기존 행 단위(iterrows + 프레임별 groupby) 구현과 결과가 같은지 확인합니다.
+# (순위는 헤더의 standings 타임라인을 StandingsTimeline 으로 프레임마다 복원해 비교하고, 출력 크기도 비교)
+# 사용법:
+#   python scripts/bench_track_frames.py [--rows 1000000] [--legacy-rows 20000]
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import f1_get_track_data
+from standings_timeline import StandingsTimeline
+
+SESSION_START = datetime(2025, 3, 16, 4, 0, 0, tzinfo=timezone.utc)
+DRIVERS = [1, 4, 5, 6, 10, 12, 14, 16, 18, 22, 23, 27, 30, 31, 43, 44, 55, 63, 81, 87]
+
+
+def _iso(us):
+    dt = SESSION_START + timedelta(microseconds=int(us))
+    # OpenF1 처럼 소수점이 없는 시각과 있는 시각을 섞음
+    return dt.isoformat(timespec="seconds" if us % 1_000_000 == 0 else "microseconds")
+
+
+def synthetic_race(n_rows, seed=0):
+    """n_rows 개의 location 행과 그에 맞는 position 행(드라이버별 수십 회 순위 변화)을 만듭니다."""
+    rng = np.random.default_rng(seed)
+    per_driver = n_rows // len(DRIVERS)
+    locations = []
+    for k, dn in enumerate(DRIVERS):
+        # 드라이버마다 약 3.7Hz, 샘플 간격에 약간의 흔들림
+        offsets = np.cumsum(rng.integers(250_000, 290_000, per_driver)) + k * 13_000
+        phase = np.linspace(0, 2 * np.pi * per_driver / 330, per_driver)
+        xs = (3000 * np.cos(phase)).astype(int)
+        ys = (2000 * np.sin(phase)).astype(int)
+        for us, x, y in zip(offsets.tolist(), xs.tolist(), ys.tolist()):
+            locations.append({"date": _iso(us), "driver_number": dn, "x": x, "y": y, "z": 0,
+                              "session_key": 9999, "meeting_key": 1000})
+    locations.sort(key=lambda r: r["date"])
+
+    race_us = per_driver * 270_000
+    positions = []
+    order = list(DRIVERS)
+    for i, us in enumerate(np.sort(rng.integers(0, race_us, 400)).tolist()):
+        if i:
+            a = int(rng.integers(0, len(order) - 1))
+            order[a], order[a + 1] = order[a + 1], order[a]
+            changed = [order[a], order[a + 1]]
+        else:
+            changed = order
+        for dn in changed:
+            positions.append({"date": _iso(us), "driver_number": dn, "position": order.index(dn) + 1,
+                              "session_key": 9999, "meeting_key": 1000})
+    return locations, positions
+
+
+def legacy_process_data(session_key, locations, laps, positions):
+    """기존 행 단위 구현 (타임존이 있는 date 비교만 UTC 로 맞춤)."""
+    df_loc = pd.DataFrame(locations)
+    df_pos = pd.DataFrame(positions)
+    for df in [df_loc, df_pos]:
+        df['date'] = pd.to_datetime(df['date'], format="ISO8601", utc=True)
+
+    frames_map = {}
+    for _, row in df_loc.iterrows():
+        ts_ms = int(row['date'].timestamp() * 1000)
+        frame = frames_map.setdefault(ts_ms, {"t": ts_ms, "positions": [], "driver_standings": {}})
+        frame["positions"].append({"driver_number": row['driver_number'], "x": row['x'], "y": row['y']})
+
+    df_pos_sorted = df_pos.sort_values('date', kind='stable')
+    for ts_ms, frame in sorted(frames_map.items()):
+        current_time = pd.to_datetime(ts_ms, unit='ms', utc=True)
+        latest_pos = df_pos_sorted[df_pos_sorted['date'] <= current_time]
+        if not latest_pos.empty:
+            frame['driver_standings'] = latest_pos.groupby('driver_number')['position'].last().to_dict()
+
+    frames = sorted(frames_map.values(), key=lambda f: f['t'])
+    all_x = [p["x"] for f in frames for p in f["positions"]]
+    all_y = [p["y"] for f in frames for p in f["positions"]]
+    bbox = {"minX": min(all_x), "maxX": max(all_x), "minY": min(all_y), "maxY": max(all_y)}
+    return {"session_key": session_key, "duration_ms": frames[-1]['t'] - frames[0]['t'], "bbox": bbox, "frames": frames}
+
+
+def same_as_legacy(new, old):
+    """새 출력(프레임 + standings 타임라인)을 기존 형식(프레임별 driver_standings)으로 펼쳐 비교합니다."""
+    timeline = StandingsTimeline(new["standings"])
+    expanded = {k: v for k, v in new.items() if k not in ("standings", "frames")}
+    expanded["frames"] = [{**f, "driver_standings": timeline.at(f["t"])} for f in new["frames"]]
+    return expanded == old
+
+
+def json_mb(data):
+    return len(json.dumps(data, ensure_ascii=False)) / 1e6
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    small_loc, small_pos = synthetic_race(args.legacy_rows)
+    new_small, t_new_small = timed(f1_get_track_data.process_data, 9999, small_loc, [], small_pos)
+    old_small, t_old_small = timed(legacy_process_data, 9999, small_loc, [], small_pos)
+    same = same_as_legacy(new_small, old_small)
+    print(f"[{len(small_loc):>9,} rows] legacy {t_old_small:8.2f} s   vectorized {t_new_small:8.2f} s   "
+          f"speedup {t_old_small / t_new_small:6.1f}x   identical={same}")
+    if not same:
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    locations, positions = synthetic_race(args.rows)
+    print(f"generated {len(locations):,} location / {len(positions):,} position rows in {time.perf_counter() - t0:.1f} s")
+    result, t_new = timed(f1_get_track_data.process_data, 9999, locations, [], positions)
+    print(f"[{len(locations):>9,} rows] vectorized {t_new:8.2f} s   frames={len(result['frames']):,}   "
+          f"standings events={len(result['standings']['events']):,}")
+    timeline = StandingsTimeline(result["standings"])
+    per_frame = {"frames": [{"driver_standings": timeline.at(f["t"])} for f in result["frames"]]}
+    print(f"output {json_mb(result):,.1f} MB  (per-frame driver_standings would add {json_mb(per_frame):,.1f} MB; "
+          f"timeline {json_mb(result['standings']) * 1000:,.0f} KB)")
+    # 기존 구현은 프레임 수 x position 행 수에 비례하므로 작은 집합의 측정값으로 추정
+    scale = (len(result['frames']) / max(1, len(new_small['frames']))) * (len(positions) / max(1, len(small_pos)))
+    print(f"legacy estimate (O(frames x positions)): ~{t_old_small * scale / 60:,.0f} min")
+
+
+if __name__ == "__main__":
+    main()
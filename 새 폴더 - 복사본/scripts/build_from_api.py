@@ -1,10 +1,18 @@
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
 import re
+import sys
+import threading
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client
+from results_store import ResultsStore
+
 # --- CONFIG ---
 CURRENT_SEASON = datetime.now().year
 BASE_URL = "https://api.jolpi.ca/ergast/f1"
@@ -12,6 +20,13 @@ OUTPUT_DIR_STATS = "public/data/stats"
 OUTPUT_DIR_DRIVERS = "public/data"
 TEAM_COLORS_FILE = "f1_team.json" 
 
+# jolpi.ca 공개 제한: 초당 4회(버스트), 시간당 500회(지속) -> (허용 요청 수, 기간 초)
+RATE_LIMITS = [(4, 1.0), (500, 3600.0)]
+# 동시에 처리할 드라이버 수 (실제 처리량은 RATE_LIMITS 가 결정)
+MAX_WORKERS = 4
+# jolpi.ca 가 허용하는 최대 limit (그 이상은 잘려서 돌아옴)
+PAGE_SIZE = 100
+
 # Slug (URL) 수동 수정
 SLUG_FIXES = {
     "de_vries": "nyck-de-vries",
@@ -25,27 +40,107 @@ NAME_FIXES = {
     "Nico Hülkenberg": "Nico Hulkenberg"
 }
 
-def safe_get_request(url, retries=3, delay=5):
+class RateLimiter:
+    """여러 토큰 버킷을 동시에 만족할 때만 요청을 통과시키는 스레드 안전 제한기."""
+
+    def __init__(self, limits):
+        now = time.monotonic()
+        # 버킷: [용량, 초당 충전량, 현재 토큰]
+        self._buckets = [[float(count), count / period, float(count)] for count, period in limits]
+        self._updated = now
+        self._paused_until = now
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        for bucket in self._buckets:
+            bucket[2] = min(bucket[0], bucket[2] + elapsed * bucket[1])
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    wait = max((1 - b[2]) / b[1] for b in self._buckets)
+                    if wait <= 0:
+                        for bucket in self._buckets:
+                            bucket[2] -= 1
+                        return
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """서버가 Retry-After 로 알려준 시간 동안 모든 작업자의 요청을 멈춥니다."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+_limiter = RateLimiter(RATE_LIMITS)
+
+
+def safe_get_request(url, retries=5, delay=2):
     """
-    HTTP GET 요청을 보내고, 429 오류 시 재시도하는 함수
+    HTTP GET 요청을 보내고, 429/5xx/연결 오류 시 재시도하는 함수 (실패하면 None)
+    모든 요청은 공용 RateLimiter 를 거치며, 429 응답은 Retry-After 만큼 전체 작업자를 멈춥니다.
+    변경되지 않은 응답은 ETag/Last-Modified 재검증(304)으로 로컬 캐시에서 돌려받습니다.
     """
-    for i in range(retries):
-        try:
-            response = requests.get(url)
-            if response.status_code == 429:
-                print(f"  -> Rate limit exceeded. Retrying in {delay} seconds...")
-                time.sleep(delay)
-                continue
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            print(f"[HTTP ERROR] {e}")
-            if i < retries - 1:
-                print(f"  -> Retrying... ({i+1}/{retries})")
-                time.sleep(delay)
-            else:
+    try:
+        return http_client.get(url, retries=retries, backoff=delay, conditional=True, limiter=_limiter)
+    except requests.exceptions.RequestException as e:
+        print(f"[HTTP ERROR] {e}")
+        return None
+
+
+class SeasonStandingsIndex:
+    """시즌별 전체 driverStandings 를 한 번씩만 받아 두고 모든 드라이버가 공유하는 색인.
+
+    {season: {driverId: DriverStanding}} 형태로 보관하며, 같은 시즌을 여러 작업자가 동시에
+    요청해도 실제 요청은 한 번만 나갑니다.
+    """
+
+    def __init__(self):
+        self._seasons = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, season):
+        standings = {}
+        offset = 0
+        while True:
+            url = f"{BASE_URL}/{season}/driverStandings.json?limit={PAGE_SIZE}&offset={offset}"
+            res = safe_get_request(url)
+            if not res or res.status_code != 200:
                 return None
-    return None
+            data = res.json()['MRData']
+            lists = data['StandingsTable']['StandingsLists']
+            rows = lists[0].get('DriverStandings', []) if lists else []
+            for row in rows:
+                standings[row['Driver']['driverId']] = row
+            offset += PAGE_SIZE
+            if not rows or offset >= int(data.get('total', 0)):
+                return standings
+
+    def season(self, season):
+        """시즌의 {driverId: DriverStanding} 을 돌려줍니다. 실패하면 None (다음 호출 때 재시도)."""
+        season = str(season)
+        with self._lock:
+            if season in self._seasons:
+                return self._seasons[season]
+            season_lock = self._locks.setdefault(season, threading.Lock())
+        with season_lock:
+            with self._lock:
+                if season in self._seasons:
+                    return self._seasons[season]
+            standings = self._fetch(season)
+            if standings is not None:
+                with self._lock:
+                    self._seasons[season] = standings
+            return standings
+
+
+_standings_index = SeasonStandingsIndex()
 
 
 def slugify(name):
@@ -86,119 +181,88 @@ def get_current_drivers():
         driver_list.append(driver_info)
     return driver_list
 
-def get_driver_season_stats(driver_id, season):
-    season_stats = {}
-    url_results = f"{BASE_URL}/{season}/drivers/{driver_id}/results.json"
-    res_results = safe_get_request(url_results)
-    if not res_results or res_results.status_code != 200:
-        return None, None
-    races = res_results.json()['MRData']['RaceTable']['Races']
-
-    if not races:
-        return {}, None
-
-    season_stats['gp_races'] = len(races)
-    season_stats['gp_points'] = sum(float(r['Results'][0]['points']) for r in races)
-    season_stats['gp_podiums'] = sum(1 for r in races if r['Results'][0].get('position') and r['Results'][0]['position'].isdigit() and int(r['Results'][0]['position']) <= 3)
-    season_stats['gp_top10'] = sum(1 for r in races if r['Results'][0].get('position') and r['Results'][0]['position'].isdigit() and int(r['Results'][0]['position']) <= 10)
-    
-    dnfs = 0
-    for r in races:
-        status = r['Results'][0]['status']
-        if 'Finished' not in status and '+' not in status:
-            dnfs += 1
-    season_stats['dnfs'] = dnfs
-
-    url_standings = f"{BASE_URL}/{season}/drivers/{driver_id}/driverStandings.json"
-    res_standings = safe_get_request(url_standings)
-    if res_standings and res_standings.status_code == 200:
-        standings = res_standings.json()['MRData']['StandingsTable']['StandingsLists']
-        if standings and standings[0].get('DriverStandings'):
-            driver_standing = standings[0]['DriverStandings'][0]
-            season_stats['season_position'] = driver_standing.get('position')
-            season_stats['season_points'] = driver_standing.get('points')
-
-    team_name = races[-1]['Results'][0]['Constructor']['name'] if races else None
-    return season_stats, team_name
-
-
-def get_driver_career_stats(driver_id):
-    career_stats = {}
-    
-    url = f"{BASE_URL}/drivers/{driver_id}/results.json?limit=1000"
-    res = safe_get_request(url)
-    if not res or res.status_code != 200:
-        return None
-    races = res.json()['MRData']['RaceTable']['Races']
-    
-    career_stats['gp_entered'] = len(races)
-    career_stats['career_points'] = sum(float(r['Results'][0]['points']) for r in races)
-    career_stats['podiums'] = sum(1 for r in races if r['Results'][0].get('position') and r['Results'][0]['position'].isdigit() and int(r['Results'][0]['position']) <= 3)
-    
-    dnfs = 0
-    for r in races:
-        status = r['Results'][0]['status']
-        if 'Finished' not in status and '+' not in status:
-            dnfs += 1
-    career_stats['dnfs'] = dnfs
-
-    poles_res = safe_get_request(f"{BASE_URL}/drivers/{driver_id}/results/1.json")
-    if poles_res and poles_res.status_code == 200:
-        career_stats['poles'] = int(poles_res.json()['MRData']['total'])
-    else:
-        career_stats['poles'] = 0
-
-    best_finish_pos = float('inf')
-    for r in races:
-        pos_str = r['Results'][0].get('position')
-        if pos_str and pos_str.isdigit():
-            pos = int(pos_str)
-            if pos < best_finish_pos:
-                best_finish_pos = pos
-    career_stats['best_finish'] = best_finish_pos if best_finish_pos != float('inf') else '-'
-
-    best_grid_res = safe_get_request(f"{BASE_URL}/drivers/{driver_id}/qualifying.json?limit=1000")
-    if best_grid_res and best_grid_res.status_code == 200:
-        qualifying_results = best_grid_res.json()['MRData']['RaceTable']['Races']
-        if qualifying_results:
-            best_grid_positions = [int(q['QualifyingResults'][0]['position']) for q in qualifying_results if q.get('QualifyingResults') and q['QualifyingResults'][0].get('position')]
-            if best_grid_positions:
-                career_stats['best_grid'] = min(best_grid_positions)
-            else:
-                career_stats['best_grid'] = '-'
-        else:
-            career_stats['best_grid'] = '-'
-    else:
-        career_stats['best_grid'] = '-'
-
-    seasons_res = safe_get_request(f"{BASE_URL}/drivers/{driver_id}/seasons.json?limit=100")
-    if not seasons_res or seasons_res.status_code != 200:
-        return None
-    
-    seasons = [s['season'] for s in seasons_res.json()['MRData']['SeasonTable']['Seasons']]
-    
-    standings_data = []
-    for season in seasons:
-        standing_res = safe_get_request(f"{BASE_URL}/{season}/drivers/{driver_id}/driverStandings.json")
-        if standing_res and standing_res.status_code == 200:
-            season_standings = standing_res.json()['MRData']['StandingsTable']['StandingsLists']
-            if season_standings:
-                standings_data.extend(season_standings)
-
-    if standings_data:
-        valid_standings = [
-            s['DriverStandings'][0] for s in standings_data
-            if s.get('DriverStandings') and s['DriverStandings'][0].get('position')
-        ]
-
-        if valid_standings:
-            career_stats['titles'] = sum(1 for st in valid_standings if st['position'] == '1')
-        else:
-            career_stats['titles'] = 0
-    else:
-        career_stats['titles'] = 0
-
-    return career_stats
+def fetch_races(path):
+    """path 의 Races 목록을 limit/offset 으로 끝까지 받아 돌려줍니다. 실패하면 None."""
+    races = []
+    offset = 0
+    while True:
+        res = safe_get_request(f"{BASE_URL}/{path}?limit={PAGE_SIZE}&offset={offset}")
+        if not res or res.status_code != 200:
+            return None
+        data = res.json()['MRData']
+        races.extend(data['RaceTable']['Races'])
+        offset += PAGE_SIZE
+        if offset >= int(data.get('total', 0)):
+            return races
+
+
+def backfill_driver(store, driver_id):
+    """처음 보는 드라이버의 전체 커리어 결과/예선을 한 번만 받아 저장소에 넣습니다."""
+    if store.get_state(f"driver:{driver_id}"):
+        return True
+    results = fetch_races(f"drivers/{driver_id}/results.json")
+    qualifying = fetch_races(f"drivers/{driver_id}/qualifying.json")
+    if results is None or qualifying is None:
+        print(f"[HTTP ERROR] Failed to backfill {driver_id}, will retry next run")
+        return False
+    store.save_results(results)
+    store.save_qualifying(qualifying)
+    store.set_state(f"driver:{driver_id}", "done")
+    print(f"  -> Backfilled {driver_id}: {len(results)} races")
+    return True
+
+
+def sync_new_rounds(store):
+    """저장된 마지막 라운드 이후의 라운드만 (전체 그리드) 받아 넣습니다. 새로 받은 라운드 수를 돌려줍니다."""
+    cursor = store.grid_cursor() or store.latest_round()
+    if cursor is None:
+        return 0
+    season, last_round = cursor
+    added = 0
+    for s in range(season, CURRENT_SEASON + 1):
+        rnd = last_round + 1 if s == season else 1
+        while True:
+            results = fetch_races(f"{s}/{rnd}/results.json")
+            if results is None:
+                return added
+            if not results:
+                break
+            qualifying = fetch_races(f"{s}/{rnd}/qualifying.json")
+            if qualifying is None:
+                return added
+            store.save_results(results)
+            store.save_qualifying(qualifying)
+            store.set_grid_cursor(s, rnd)
+            print(f"  -> Stored {s} round {rnd}")
+            added += 1
+            rnd += 1
+    if store.grid_cursor() is None:
+        store.set_grid_cursor(season, last_round)
+    return added
+
+
+def sync_standings(store, seasons, refresh_current):
+    """시즌 순위를 저장소에 넣습니다. 지난 시즌은 한 번만, 이번 시즌은 새 라운드가 있을 때만 받습니다."""
+    def sync(season):
+        state = store.get_state(f"standings:{season}")
+        if state == "final" or (state and season == CURRENT_SEASON and not refresh_current):
+            return
+        standings = _standings_index.season(season)
+        if standings is None:
+            return
+        store.save_standings(season, standings)
+        store.set_state(f"standings:{season}", "final" if season < CURRENT_SEASON else "partial")
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        list(pool.map(sync, seasons))
+
+
+def get_driver_season_stats(store, driver_id, season):
+    return store.season_stats(driver_id, season)
+
+
+def get_driver_career_stats(store, driver_id):
+    return store.career_stats(driver_id)
 
 def main():
     if not os.path.exists(OUTPUT_DIR_STATS):
@@ -214,12 +278,22 @@ def main():
         team_color_map = {}
 
     all_drivers_data = get_current_drivers()
+    store = ResultsStore()
 
-    for driver in all_drivers_data:
+    # 1) 새 드라이버만 커리어 전체를 받고, 2) 마지막 저장 라운드 이후만 받고, 3) 순위 갱신
+    # (요청 속도는 RateLimiter 가 jolpi.ca 제한에 맞춤)
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        list(pool.map(lambda d: backfill_driver(store, d['driverId']), all_drivers_data))
+    new_rounds = sync_new_rounds(store)
+    sync_standings(store, store.seasons(), refresh_current=new_rounds > 0)
+    print(f"\nSynced results store in {time.time() - started:.1f} s ({new_rounds} new rounds)")
+
+    def process_driver(driver):
         print(f"Processing {driver['full_name']}...")
         
-        season_stats, team_name = get_driver_season_stats(driver['driverId'], CURRENT_SEASON)
-        career_stats = get_driver_career_stats(driver['driverId'])
+        season_stats, team_name = get_driver_season_stats(store, driver['driverId'], CURRENT_SEASON)
+        career_stats = get_driver_career_stats(store, driver['driverId'])
         
         if team_name:
             driver['team_name'] = team_name
@@ -236,7 +310,11 @@ def main():
             json.dump(driver_stats, f, ensure_ascii=False, indent=2)
         
         print(f"  -> Saved stats to {output_path}")
-        time.sleep(1.1)
+
+    # 통계는 모두 로컬 저장소에서 계산하므로 HTTP 요청이 없음
+    for driver in all_drivers_data:
+        process_driver(driver)
+    store.close()
 
     drivers_output_path = os.path.join(OUTPUT_DIR_DRIVERS, "drivers.json")
     with open(drivers_output_path, 'w', encoding='utf-8') as f:
@@ -0,0 +1,120 @@
+# scripts/build_replays.py
+# public/data/schedule.json 의 종료된 세션마다 리플레이 파일을 한 번만 만들어
+# public/data/replays/<session_key>.json 에 저장합니다. (이미 있는 세션은 건너뜀)
+# location 다운샘플링 피라미드(<session_key>.lod<n>.f1rb, trajectory_lod.py)도 함께 만듭니다.
+# 사용법 (프로젝트 루트에서):
+#   python scripts/build_replays.py [--jobs 3] [--force] [session_key ...]
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import f1_get_track_data
+import telemetry_cache
+import trajectory_lod
+
+SCHEDULE_FILE = "public/data/schedule.json"
+OUTPUT_DIR = "public/data/replays"
+# 일정상 시작 후 이 시간이 지나지 않은 세션은 OpenF1 에 묻지도 않음
+MIN_AGE = timedelta(hours=3)
+
+
+def artifact_path(session_key):
+    return os.path.join(OUTPUT_DIR, f"{session_key}.json")
+
+
+def finished_sessions(schedule, now=None):
+    """일정에서 끝난 세션의 session_key 목록을 돌려줍니다."""
+    now = now or datetime.now(timezone.utc)
+    keys = []
+    for session in schedule:
+        key, date_start = session.get("session_key"), session.get("date_start")
+        if not key or not date_start:
+            continue
+        if datetime.fromisoformat(date_start) + MIN_AGE > now:
+            continue
+        if telemetry_cache.session_finished(key):
+            keys.append(key)
+    return keys
+
+
+def write_artifact(path, header, frames, race_control):
+    """프레임을 하나씩 직렬화해 파일에 씁니다. (거대한 문자열을 만들지 않음, 완료 후 원자적으로 교체)"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        head = json.dumps({**header, "race_control": race_control}, ensure_ascii=False)
+        f.write(head[:-1] + ', "frames": [')
+        for i, frame in enumerate(frames):
+            if i:
+                f.write(",")
+            f.write(json.dumps(frame, ensure_ascii=False))
+        f.write("]}")
+    os.replace(tmp, path)
+
+
+def build_session(session_key):
+    """세션 하나의 리플레이 파일을 만듭니다. (작업 프로세스에서 실행)"""
+    started = time.time()
+    params = {"session_key": session_key}
+    locations = f1_get_track_data.fetch_sliced("location", session_key)
+    laps = f1_get_track_data.fetch_api("laps", params)
+    positions = f1_get_track_data.fetch_api("position", params)
+    race_control = f1_get_track_data.fetch_api("race_control", params)
+    if isinstance(race_control, dict) and "error" in race_control:
+        return session_key, race_control["error"], time.time() - started
+
+    header, frames = f1_get_track_data.build_replay(session_key, locations, laps, positions)
+    if frames is None:
+        return session_key, header["error"], time.time() - started
+    trajectory_lod.build_pyramid(session_key, locations)
+    del locations, positions
+    write_artifact(artifact_path(session_key), header, frames, race_control)
+    return session_key, None, time.time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=3, help="동시에 처리할 세션 수")
+    parser.add_argument("--force", action="store_true", help="이미 만든 세션도 다시 생성")
+    parser.add_argument("sessions", nargs="*", help="지정하면 일정 대신 이 세션들만 처리")
+    args = parser.parse_args()
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    if args.sessions:
+        keys = args.sessions
+    else:
+        with open(SCHEDULE_FILE, "r", encoding="utf-8") as f:
+            keys = finished_sessions(json.load(f))
+
+    todo = [k for k in keys if args.force or not os.path.exists(artifact_path(k))
+            or not os.path.exists(trajectory_lod.pyramid_path(k, 1))]
+    print(f"종료된 세션 {len(keys)}개 중 {len(todo)}개를 생성합니다. (나머지는 이미 존재)")
+    if not todo:
+        return
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [pool.submit(build_session, key) for key in todo]
+        for future in as_completed(futures):
+            try:
+                key, error, elapsed = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[실패] {e}")
+                continue
+            if error:
+                failed += 1
+                print(f"[실패] {key}: {error}")
+            else:
+                print(f"[완료] {key} -> {artifact_path(key)} ({elapsed:.1f} s)")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# scripts/fake_openf1.py
+# 벤치마크/로컬 테스트용 OpenF1 대체 서버. 합성 데이터를 결정적으로 생성합니다.
+# 사용법:
+#   python scripts/fake_openf1.py [port] [--live]
+#   OPENF1_BASE_URL=http://127.0.0.1:<port>/v1 python get_driver_locations.py ...
+# --live : 세션 시계를 실제 시간에 맞춰 흘려 보냄 (서버 시작 시점 = 세션 시작 + LIVE_START_S).
+#          아직 "일어나지 않은" 행은 돌려주지 않으므로 진행 중인 세션처럼 데이터가 점점 늘어납니다.
+import json
+import math
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+SESSION_START = datetime(2025, 3, 16, 4, 0, 0, tzinfo=timezone.utc)
+SESSION_LENGTH_S = 2 * 60 * 60
+DRIVERS = [1, 4, 5, 6, 10, 12, 14, 16, 18, 22, 23, 27, 30, 31, 43, 44, 55, 63, 81, 87]
+LAP_S = 90.0
+
+# 엔드포인트별 샘플 간격(초)
+SAMPLE_INTERVAL_S = {
+    "location": 0.27,
+    "car_data": 0.27,
+    "position": 15.0,
+    "intervals": 4.0,
+    "laps": LAP_S,
+    "race_control": 120.0,
+}
+
+# --live 일 때 서버 시작 시점에 해당하는 세션 경과 시간(초)
+LIVE_START_S = 600
+_live_started_at = None
+# 엔드포인트별 받은 요청 수 (벤치마크에서 업스트림 요청 수 확인용)
+request_counts = {}
+_count_lock = threading.Lock()
+
+
+def set_live(enabled=True):
+    """세션 시계를 실제 시간에 맞춰 흘려 보내는 모드를 켜고 끕니다."""
+    global _live_started_at
+    _live_started_at = time.time() if enabled else None
+
+
+def session_now():
+    """--live 모드의 현재 세션 시각. 꺼져 있으면 None."""
+    if _live_started_at is None:
+        return None
+    return SESSION_START + timedelta(seconds=LIVE_START_S + time.time() - _live_started_at)
+
+
+def _iso(dt):
+    return dt.isoformat(timespec="microseconds")
+
+
+def _parse_time(value):
+    if value == "latest":
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _row(endpoint, session_key, driver_number, idx, ts):
+    t = (ts - SESSION_START).total_seconds()
+    base = {"session_key": session_key, "meeting_key": 1000, "date": _iso(ts)}
+    if endpoint == "race_control":
+        return {**base, "category": "Flag", "flag": "GREEN", "message": f"MESSAGE {idx}",
+                "driver_number": None, "lap_number": int(t // LAP_S) + 1, "scope": "Track", "sector": None}
+    base["driver_number"] = driver_number
+    phase = 2 * math.pi * ((t + driver_number) % LAP_S) / LAP_S
+    if endpoint == "location":
+        return {**base, "x": int(3000 * math.cos(phase)), "y": int(2000 * math.sin(phase)), "z": 0}
+    if endpoint == "car_data":
+        return {**base, "speed": 250 + driver_number, "rpm": 11000, "n_gear": 7, "throttle": 99, "brake": 0, "drs": 0}
+    if endpoint == "position":
+        return {**base, "position": (DRIVERS.index(driver_number) + idx) % len(DRIVERS) + 1}
+    if endpoint == "intervals":
+        return {**base, "interval": 0.5 + (driver_number % 7) / 10, "gap_to_leader": float(DRIVERS.index(driver_number))}
+    if endpoint == "laps":
+        base.pop("date")
+        return {**base, "date_start": _iso(ts), "lap_number": idx + 1, "lap_duration": LAP_S + driver_number / 100}
+    return base
+
+
+def generate(endpoint, params):
+    """요청 파라미터(session_key, date>/date</date>=)에 맞는 합성 행 목록을 만듭니다."""
+    session_key = int(params.get("session_key", 0) or 0)
+    session_end = SESSION_START + timedelta(seconds=SESSION_LENGTH_S)
+    if endpoint == "sessions":
+        return [{"session_key": session_key, "meeting_key": 1000, "session_name": "Race",
+                 "date_start": _iso(SESSION_START), "date_end": _iso(session_end)}]
+    interval = SAMPLE_INTERVAL_S.get(endpoint)
+    if interval is None:
+        return []
+    lo, hi = SESSION_START, session_end
+    now = session_now()
+    if now is not None:
+        hi = min(hi, now)
+    lo_inclusive = True
+    if params.get("date>=") == "latest":
+        lo = hi - timedelta(seconds=interval)
+    elif "date>=" in params:
+        lo = max(lo, _parse_time(params["date>="]))
+    elif "date>" in params:
+        lo, lo_inclusive = max(lo, _parse_time(params["date>"])), False
+    if "date<" in params:
+        hi = min(hi, _parse_time(params["date<"]))
+
+    wanted = params.get("driver_number")
+    drivers = [None] if endpoint == "race_control" else DRIVERS
+    rows = []
+    first = max(0, math.floor((lo - SESSION_START).total_seconds() / interval))
+    idx = first
+    while True:
+        ts = SESSION_START + timedelta(seconds=idx * interval)
+        if ts >= hi:
+            break
+        if ts > lo or (lo_inclusive and ts == lo):
+            for dn in drivers:
+                if wanted is not None and str(dn) != str(wanted):
+                    continue
+                rows.append(_row(endpoint, session_key, dn, idx, ts))
+        idx += 1
+    return rows
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        endpoint = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+        params = dict(parse_qsl(parsed.query, keep_blank_values=True))
+        with _count_lock:
+            request_counts[endpoint] = request_counts.get(endpoint, 0) + 1
+        body = json.dumps(generate(endpoint, params)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, live=False):
+    """백그라운드 스레드에서 서버를 띄우고 (server, base_url) 을 돌려줍니다."""
+    if live:
+        set_live()
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    port = int(args[0]) if args else 8765
+    if "--live" in sys.argv[1:]:
+        set_live()
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    print(f"Fake OpenF1 listening on http://127.0.0.1:{port}/v1")
+    server.serve_forever()
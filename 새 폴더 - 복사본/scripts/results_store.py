@@ -0,0 +1,187 @@
+# scripts/results_store.py
+# build_from_api.py 가 쓰는 로컬 결과 저장소 (SQLite).
+# 레이스 결과 / 예선 / 시즌 순위 행을 보관하고, 드라이버 시즌/커리어 통계를 SQL 로 계산합니다.
+# 새 라운드만 받아 채워 넣기 때문에 매주 다시 빌드해도 HTTP 요청은 몇 번뿐입니다.
+import os
+import sqlite3
+import threading
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.environ.get("F1_RESULTS_DB", os.path.join(ROOT_DIR, ".cache", "results.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    season        INTEGER NOT NULL,
+    round         INTEGER NOT NULL,
+    driver_id     TEXT    NOT NULL,
+    constructor   TEXT,
+    position      INTEGER,
+    position_text TEXT,
+    points        REAL    NOT NULL DEFAULT 0,
+    grid          INTEGER,
+    status        TEXT,
+    PRIMARY KEY (season, round, driver_id)
+);
+CREATE INDEX IF NOT EXISTS results_driver ON results (driver_id, season, round);
+
+CREATE TABLE IF NOT EXISTS qualifying (
+    season    INTEGER NOT NULL,
+    round     INTEGER NOT NULL,
+    driver_id TEXT    NOT NULL,
+    position  INTEGER,
+    PRIMARY KEY (season, round, driver_id)
+);
+CREATE INDEX IF NOT EXISTS qualifying_driver ON qualifying (driver_id);
+
+CREATE TABLE IF NOT EXISTS standings (
+    season        INTEGER NOT NULL,
+    driver_id     TEXT    NOT NULL,
+    position      TEXT,
+    points        TEXT,
+    wins          INTEGER,
+    PRIMARY KEY (season, driver_id)
+);
+
+-- 동기화 상태 (예: grid_cursor = "2025/7", driver:<id> = 백필 완료, standings:<season> = final)
+CREATE TABLE IF NOT EXISTS sync_state (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# 완주로 보지 않는 status 판별 (기존 Python 집계와 동일: 'Finished' 도 '+N Lap(s)' 도 아니면 DNF)
+_DNF = "(status NOT LIKE '%Finished%' AND status NOT LIKE '%+%')"
+
+
+def _int(value):
+    return int(value) if value is not None and str(value).isdigit() else None
+
+
+class ResultsStore:
+    """여러 작업 스레드가 함께 쓰는 SQLite 저장소. 쓰기는 내부 잠금으로 직렬화합니다."""
+
+    def __init__(self, path=DB_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    # --- 동기화 상태 ---
+
+    def get_state(self, key):
+        rows = self._query("SELECT value FROM sync_state WHERE key = ?", (key,))
+        return rows[0]["value"] if rows else None
+
+    def set_state(self, key, value):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def grid_cursor(self):
+        """전체 그리드를 받아 둔 마지막 (season, round). 없으면 None."""
+        value = self.get_state("grid_cursor")
+        if not value:
+            return None
+        season, rnd = value.split("/")
+        return int(season), int(rnd)
+
+    def set_grid_cursor(self, season, rnd):
+        self.set_state("grid_cursor", f"{season}/{rnd}")
+
+    def latest_round(self):
+        rows = self._query("SELECT season, round FROM results ORDER BY season DESC, round DESC LIMIT 1")
+        return (rows[0]["season"], rows[0]["round"]) if rows else None
+
+    # --- 적재 (Ergast/jolpica 의 Races 목록을 그대로 받음) ---
+
+    def save_results(self, races):
+        rows = [
+            (int(race["season"]), int(race["round"]), r["Driver"]["driverId"],
+             r.get("Constructor", {}).get("name"), _int(r.get("position")), r.get("positionText"),
+             float(r.get("points", 0) or 0), _int(r.get("grid")), r.get("status"))
+            for race in races for r in race.get("Results", [])
+        ]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def save_qualifying(self, races):
+        rows = [
+            (int(race["season"]), int(race["round"]), q["Driver"]["driverId"], _int(q.get("position")))
+            for race in races for q in race.get("QualifyingResults", [])
+        ]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO qualifying VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def save_standings(self, season, standings):
+        """시즌 순위 {driverId: DriverStanding} 으로 해당 시즌 행을 교체합니다."""
+        rows = [
+            (int(season), driver_id, row.get("position"), row.get("points"), _int(row.get("wins")))
+            for driver_id, row in standings.items()
+        ]
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM standings WHERE season = ?", (int(season),))
+            self._db.executemany("INSERT INTO standings VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # --- 조회 ---
+
+    def seasons(self):
+        return [r["season"] for r in self._query("SELECT DISTINCT season FROM results ORDER BY season")]
+
+    def season_stats(self, driver_id, season):
+        """(season_stats, team_name). 해당 시즌 결과가 없으면 ({}, None)."""
+        rows = self._query(f"""
+            SELECT COUNT(*)                                  AS gp_races,
+                   COALESCE(SUM(points), 0)                  AS gp_points,
+                   COALESCE(SUM(position <= 3), 0)           AS gp_podiums,
+                   COALESCE(SUM(position <= 10), 0)          AS gp_top10,
+                   COALESCE(SUM({_DNF}), 0)                  AS dnfs,
+                   (SELECT constructor FROM results
+                     WHERE driver_id = :d AND season = :s
+                     ORDER BY round DESC LIMIT 1)            AS team_name
+              FROM results WHERE driver_id = :d AND season = :s
+        """, {"d": driver_id, "s": int(season)})
+        stats = dict(rows[0])
+        team_name = stats.pop("team_name")
+        if not stats["gp_races"]:
+            return {}, None
+
+        standing = self._query("SELECT position, points FROM standings WHERE season = ? AND driver_id = ?",
+                               (int(season), driver_id))
+        if standing:
+            stats["season_position"] = standing[0]["position"]
+            stats["season_points"] = standing[0]["points"]
+        return stats, team_name
+
+    def career_stats(self, driver_id):
+        rows = self._query(f"""
+            SELECT COUNT(*)                                  AS gp_entered,
+                   COALESCE(SUM(points), 0)                  AS career_points,
+                   COALESCE(SUM(position <= 3), 0)           AS podiums,
+                   COALESCE(SUM({_DNF}), 0)                  AS dnfs,
+                   COALESCE(SUM(position = 1), 0)            AS poles,     -- 기존 /results/1 total 과 같은 값
+                   MIN(position)                             AS best_finish,
+                   (SELECT MIN(position) FROM qualifying
+                     WHERE driver_id = :d)                   AS best_grid,
+                   (SELECT COUNT(*) FROM standings
+                     WHERE driver_id = :d AND position = '1'
+                       AND season IN (SELECT season FROM results WHERE driver_id = :d)) AS titles
+              FROM results WHERE driver_id = :d
+        """, {"d": driver_id})
+        stats = dict(rows[0])
+        stats["best_finish"] = stats["best_finish"] if stats["best_finish"] is not None else "-"
+        stats["best_grid"] = stats["best_grid"] if stats["best_grid"] is not None else "-"
+        # 기존 출력과 같은 키 순서
+        order = ["gp_entered", "career_points", "podiums", "dnfs", "poles", "best_finish", "best_grid", "titles"]
+        return {k: stats[k] for k in order}
@@ -0,0 +1,80 @@
+# standings_timeline.py
+# 리플레이 순위표를 이벤트 기록 방식으로 담습니다.
+# 프레임마다 전체 순위 딕셔너리를 넣는 대신, 첫 시각의 순위(initial)와 이후 바뀐 순위만 이벤트로 보냅니다.
+#   {"t0": ms, "initial": [[driver_number, position], ...], "events": [[t_ms, driver_number, position], ...]}
+# 이벤트 시각 t 는 "그 시각의 프레임부터 반영" 을 뜻합니다. (position 행 시각을 ms 로 올림)
+# 임의 시각의 순위는 StandingsTimeline.at(t_ms) 로 복원합니다. (이분 탐색 + 체크포인트)
+import bisect
+
+import numpy as np
+
+# 체크포인트 간격 (이벤트 수). 조회 한 번에 최대 이만큼만 다시 적용
+CHECKPOINT_EVERY = 64
+
+
+def encode(t_us, drivers, positions):
+    """position 행 (시각 us, 드라이버, 순위) 배열을 타임라인 딕셔너리로 만듭니다. 행이 없으면 None."""
+    t_us = np.asarray(t_us, dtype=np.int64)
+    drivers = np.asarray(drivers)
+    positions = np.asarray(positions, dtype=np.float64)
+    valid = ~np.isnan(positions)
+    if not valid.any():
+        return None
+    order = np.argsort(t_us[valid], kind="stable")
+    # us -> ms 올림: 프레임 시각 t_ms 에는 t_us <= t_ms * 1000 인 행까지 반영
+    t_ms = (-(-t_us[valid][order] // 1000)).tolist()
+    drivers = drivers[valid][order].tolist()
+    as_int = bool(np.all(positions[valid] == np.round(positions[valid])))
+    values = positions[valid][order]
+    values = values.astype(np.int64).tolist() if as_int else values.tolist()
+
+    t0 = t_ms[0]
+    current = {}
+    initial = None
+    events = []
+    for t, dn, pos in zip(t_ms, drivers, values):
+        if initial is None and t != t0:
+            initial = dict(current)
+        if current.get(dn) == pos:
+            continue
+        current[dn] = pos
+        if initial is None:
+            continue
+        if events and events[-1][0] == t and events[-1][1] == dn:
+            events[-1] = [t, dn, pos]  # 같은 시각에 같은 드라이버가 여러 번 바뀌면 마지막 값만
+        else:
+            events.append([t, dn, pos])
+    if initial is None:
+        initial = current
+    return {"t0": t0, "initial": sorted(([dn, pos] for dn, pos in initial.items()), key=lambda p: p[1]),
+            "events": events}
+
+
+class StandingsTimeline:
+    """타임라인 딕셔너리에서 임의 시각의 순위표를 복원합니다."""
+
+    def __init__(self, timeline):
+        timeline = timeline or {"t0": None, "initial": [], "events": []}
+        self.t0 = timeline["t0"]
+        self.events = timeline["events"]
+        self.times = [e[0] for e in self.events]
+        # 체크포인트 k: 이벤트 k * CHECKPOINT_EVERY 개를 적용하기 전의 순위표
+        state = {dn: pos for dn, pos in timeline["initial"]}
+        self.checkpoints = []
+        for i, (_, dn, pos) in enumerate(self.events):
+            if i % CHECKPOINT_EVERY == 0:
+                self.checkpoints.append(dict(state))
+            state[dn] = pos
+        if not self.checkpoints:
+            self.checkpoints.append(state)
+
+    def at(self, t_ms):
+        """t_ms 시각 프레임의 {driver_number: position}. 첫 순위 시각 이전이면 빈 딕셔너리."""
+        if self.t0 is None or t_ms < self.t0:
+            return {}
+        n = bisect.bisect_right(self.times, t_ms)
+        k = min(n // CHECKPOINT_EVERY, len(self.checkpoints) - 1)
+        state = dict(self.checkpoints[k])
+        for _, dn, pos in self.events[k * CHECKPOINT_EVERY:n]:
+            state[dn] = pos
+        return state
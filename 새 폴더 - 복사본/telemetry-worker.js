@@ -0,0 +1,80 @@
+// telemetry-worker.js
+// get_driver_locations.py 를 --serve 모드로 한 번만 띄워 두고 JSON-lines 로 질의합니다.
+// (요청마다 python + pandas 를 새로 띄우던 비용 제거)
+const path = require('path');
+const readline = require('readline');
+const { spawn } = require('child_process');
+
+const SCRIPT_PATH = path.join(__dirname, 'get_driver_locations.py');
+const REQUEST_TIMEOUT_MS = 120000;
+
+let worker = null;
+let nextId = 1;
+const pending = new Map();
+
+function failAll(message) {
+    for (const { reject, timer } of pending.values()) {
+        clearTimeout(timer);
+        reject(new Error(message));
+    }
+    pending.clear();
+}
+
+function startWorker() {
+    const proc = spawn('python', ['-X', 'utf8', SCRIPT_PATH, '--serve']);
+    proc.stdout.setEncoding('utf8');
+    proc.stderr.on('data', (data) => { console.error(`[Python STDERR]: ${data.toString('utf8')}`); });
+
+    const rl = readline.createInterface({ input: proc.stdout });
+    rl.on('line', (line) => {
+        let msg;
+        try { msg = JSON.parse(line); } catch (e) { console.error('[Telemetry Worker] 응답 파싱 실패:', line.slice(0, 200)); return; }
+        const entry = pending.get(msg.id);
+        if (!entry) return;
+        pending.delete(msg.id);
+        clearTimeout(entry.timer);
+        if (msg.error) entry.reject(new Error(msg.error));
+        else entry.resolve(msg.result);
+    });
+
+    const onExit = (reason) => {
+        if (worker === proc) worker = null; // 다음 요청 때 다시 띄움
+        failAll(`텔레메트리 워커 종료: ${reason}`);
+    };
+    proc.on('exit', (code) => onExit(`code ${code}`));
+    proc.on('error', (err) => onExit(err.message));
+    // 요청 사이에 워커가 죽으면 write 가 EPIPE 를 내므로, 서버를 죽이지 않고 대기 중인 요청만 실패 처리
+    proc.stdin.on('error', (err) => onExit(err.message));
+    return proc;
+}
+
+function query(payload) {
+    if (!worker) worker = startWorker();
+    const id = nextId++;
+    return new Promise((resolve, reject) => {
+        const timer = setTimeout(() => {
+            pending.delete(id);
+            reject(new Error('텔레메트리 워커 응답 시간 초과'));
+        }, REQUEST_TIMEOUT_MS);
+        pending.set(id, { resolve, reject, timer });
+        worker.stdin.write(JSON.stringify({ id, ...payload }) + '\n');
+    });
+}
+
+// options: { lod, resolution_ms, epsilon } (location 다운샘플링, 생략하면 원본), format: 'columnar' (열 지향 응답),
+//          include / drivers / fields (필요한 결과 키/드라이버/필드만, get_driver_locations.py 참고)
+function getLocations(session_key, start, end, options = {}) {
+    return query({ session_key, start, end, ...options });
+}
+
+// 캐시 적중률과 요청 합치기(coalesce) 지표: flights, coalesced, in_flight, in_flight_waiters
+function getStats() {
+    return query({ op: 'stats' });
+}
+
+function stop() {
+    if (worker) worker.kill();
+    worker = null;
+}
+
+module.exports = { getLocations, getStats, stop, SCRIPT_PATH };
@@ -0,0 +1,484 @@
+# telemetry_cache.py
+# OpenF1 시간 구간 응답을 로컬 디스크에 보관하는 캐시.
+# - (endpoint, session_key) 마다 이미 받아 둔 [시작, 종료) 구간(세그먼트)의 인덱스를 유지
+# - 요청 구간 중 비어 있는 부분(gap)만 업스트림에서 받아 오고, 세그먼트를 이어 붙여 요청 구간으로 잘라 응답
+# - 세그먼트 객체 키: (endpoint, session_key, 시작, 종료) 의 해시 (content-addressed)
+# - 저장 형식: gzip 으로 압축한 JSON 행 목록
+# - 종료된 세션은 영구 보관, 진행 중인 세션은 TTL 이 지나면 만료
+# - 동시에 들어온 같은 구간 요청은 업스트림 요청 하나를 함께 기다림 (coalesce, single-flight)
+# 사용법:
+#   python telemetry_cache.py stats    # 누적 적중률 / 절약한 업스트림 바이트 출력
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import http_client
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("F1_CACHE_DIR", os.path.join(ROOT_DIR, ".cache", "openf1"))
+BASE_URL = os.environ.get("OPENF1_BASE_URL", "https://api.openf1.org/v1")
+
+# 진행 중인 세션의 캐시 유지 시간(초)
+LIVE_TTL_S = float(os.environ.get("F1_CACHE_LIVE_TTL", "10"))
+# 세션 종료(date_end) 후 이 시간이 지나야 데이터가 확정된 것으로 봄
+FINISHED_GRACE_S = 30 * 60
+# 인접 세그먼트를 하나로 합칠 때의 최대 행 수
+MAX_SEGMENT_ROWS = 200_000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_lock = threading.Lock()
+
+# 프로세스 내 누적 지표 (flush_metrics 로 디스크의 누적값에 더해짐)
+_metrics = {
+    "requests": 0,          # 구간 조회 요청 수
+    "hits": 0,              # 업스트림 호출 없이 응답
+    "partial_hits": 0,      # 일부 구간만 업스트림에서 받음
+    "misses": 0,            # 전부 업스트림에서 받음
+    "upstream_requests": 0,
+    "upstream_bytes": 0,    # 업스트림에서 받은 JSON 바이트 (추정)
+    "bytes_saved": 0,       # 캐시에서 응답해 받지 않아도 된 바이트 (추정)
+    "flights": 0,           # coalesce 로 실제 실행한 호출 수
+    "coalesced": 0,         # 진행 중인 같은 호출의 결과를 나눠 받은 수
+}
+
+# coalesce: key -> 진행 중인 호출
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def to_us(value):
+    """ISO 8601 문자열을 epoch 마이크로초로 바꿉니다. (None 은 그대로 None)"""
+    if value is None:
+        return None
+    dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def from_us(us):
+    """epoch 마이크로초를 OpenF1 쿼리에 쓸 ISO 문자열로 바꿉니다."""
+    return (_EPOCH + timedelta(microseconds=us)).isoformat(timespec="microseconds")
+
+
+def _write_atomic(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def _object_path(key):
+    return os.path.join(CACHE_DIR, "objects", key[:2], f"{key}.json.gz")
+
+
+def _index_path(endpoint, session_key):
+    return os.path.join(CACHE_DIR, "index", f"{endpoint}-{session_key}.json")
+
+
+def make_key(endpoint, session_key, start_us, end_us):
+    raw = json.dumps([endpoint, str(session_key), start_us, end_us])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _load_index(endpoint, session_key):
+    try:
+        with open(_index_path(endpoint, session_key), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def _save_index(endpoint, session_key, entries):
+    entries = sorted(entries, key=lambda e: (e["start_us"] is not None, e["start_us"] or 0))
+    payload = json.dumps(entries, separators=(",", ":")).encode("utf-8")
+    _write_atomic(_index_path(endpoint, session_key), payload)
+
+
+def _read_object(key):
+    try:
+        with gzip.open(_object_path(key), "rb") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_object(key, rows):
+    """행 목록을 저장하고 압축 전 JSON 바이트 수를 돌려줍니다."""
+    raw = json.dumps(rows, separators=(",", ":")).encode("utf-8")
+    _write_atomic(_object_path(key), gzip.compress(raw, compresslevel=6))
+    return len(raw)
+
+
+def _remove_object(key):
+    try:
+        os.remove(_object_path(key))
+    except OSError:
+        pass
+
+
+def _alive(entry, now):
+    return entry.get("expires") is None or entry["expires"] > now
+
+
+def _live_entries(endpoint, session_key):
+    """만료되지 않은 인덱스 항목. 만료된 항목이 있으면 인덱스에서 빼고 객체 파일도 지웁니다."""
+    with _lock:
+        entries = _load_index(endpoint, session_key)
+        now = time.time()
+        alive = [e for e in entries if _alive(e, now)]
+        if len(alive) != len(entries):
+            _save_index(endpoint, session_key, alive)
+            for entry in entries:
+                if not _alive(entry, now):
+                    _remove_object(entry["key"])
+    return alive
+
+
+def _bounds(entry):
+    lo = entry["start_us"] if entry["start_us"] is not None else float("-inf")
+    hi = entry["end_us"] if entry["end_us"] is not None else float("inf")
+    return lo, hi
+
+
+def _row_us(row):
+    value = row.get("date")
+    return to_us(value) if value is not None else None
+
+
+def _trim(rows, start_us, end_us, keep_from_us=None):
+    """행 목록에서 start < date < end 인 것만 남깁니다. (OpenF1 의 date>, date< 와 같은 의미)
+
+    keep_from_us 를 주면 date >= keep_from_us 인 행만 남깁니다. (앞 세그먼트와 겹치는 부분 제외)
+    """
+    out = []
+    for row in rows:
+        ts = _row_us(row)
+        if ts is None:
+            continue
+        if start_us is not None and ts <= start_us:
+            continue
+        if keep_from_us is not None and ts < keep_from_us:
+            continue
+        if end_us is not None and ts >= end_us:
+            continue
+        out.append(row)
+    return out
+
+
+def find_gaps(segments, start_us, end_us):
+    """[start, end) 중 segments 가 덮지 못하는 구간 목록을 돌려줍니다."""
+    gaps = []
+    cursor = start_us
+    for entry in sorted(segments, key=lambda e: _bounds(e)[0]):
+        lo, hi = _bounds(entry)
+        if hi <= cursor or lo >= end_us:
+            continue
+        if lo > cursor:
+            gaps.append((cursor, lo))
+        cursor = max(cursor, hi)
+        if cursor >= end_us:
+            break
+    if cursor < end_us:
+        gaps.append((cursor, end_us))
+    return gaps
+
+
+# --- 세션 종료 여부 ---
+
+def session_finished(session_key):
+    """세션이 끝났고 데이터가 확정됐는지 확인합니다. 메타데이터는 캐시해 두고 재사용합니다."""
+    path = os.path.join(CACHE_DIR, "sessions", f"{session_key}.json")
+    now = time.time()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("finished") or meta.get("checked_at", 0) + LIVE_TTL_S > now:
+            return bool(meta.get("finished"))
+    except (OSError, ValueError):
+        pass
+
+    import requests
+
+    finished = False
+    try:
+        response = http_client.get(f"{BASE_URL}/sessions", params={"session_key": session_key}, timeout=10)
+        sessions = response.json()
+        date_end = sessions[0].get("date_end") if sessions else None
+        if date_end:
+            finished = to_us(date_end) / 1e6 + FINISHED_GRACE_S < now
+    except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+        # 확인할 수 없으면 진행 중인 세션으로 취급 (TTL 캐시만 사용)
+        print(f"[CACHE] 세션 {session_key} 메타데이터 조회 실패: {e}", file=sys.stderr)
+
+    payload = json.dumps({"finished": finished, "checked_at": now}).encode("utf-8")
+    _write_atomic(path, payload)
+    return finished
+
+
+# --- 세그먼트 저장 ---
+
+def _store_segment(endpoint, session_key, start_us, end_us, rows, permanent):
+    """새 세그먼트를 인덱스에 넣고, 맞닿은 영구 세그먼트와 합칠 수 있으면 합칩니다."""
+    with _lock:
+        now = time.time()
+        entries = _load_index(endpoint, session_key)
+        expired_keys = {e["key"] for e in entries if not _alive(e, now)}
+        entries = [e for e in entries if e["key"] not in expired_keys]
+
+        merged_rows, lo, hi = rows, start_us, end_us
+        absorbed = []
+        if permanent and start_us is not None and end_us is not None:
+            for entry in sorted(entries, key=lambda e: _bounds(e)[0]):
+                if entry.get("expires") is not None or entry["start_us"] is None or entry["end_us"] is None:
+                    continue
+                touches = entry["end_us"] == lo or entry["start_us"] == hi
+                if not touches or entry["rows"] + len(merged_rows) > MAX_SEGMENT_ROWS:
+                    continue
+                other = _read_object(entry["key"])
+                if other is None:
+                    continue
+                if entry["end_us"] == lo:
+                    merged_rows, lo = other + merged_rows, entry["start_us"]
+                else:
+                    merged_rows, hi = merged_rows + other, entry["end_us"]
+                absorbed.append(entry)
+
+        key = make_key(endpoint, session_key, lo, hi)
+        size = _write_object(key, merged_rows)
+        absorbed_keys = {e["key"] for e in absorbed}
+        entries = [e for e in entries if e["key"] not in absorbed_keys and e["key"] != key]
+        entries.append({
+            "key": key,
+            "start_us": lo,
+            "end_us": hi,
+            "rows": len(merged_rows),
+            "bytes": size,
+            "expires": None if permanent else now + LIVE_TTL_S,
+        })
+        _save_index(endpoint, session_key, entries)
+        # 합쳐진 세그먼트와 만료된 라이브 세그먼트의 객체 파일 정리 (같은 구간을 다시 쓴 경우는 남김)
+        for old_key in (absorbed_keys | expired_keys) - {key}:
+            _remove_object(old_key)
+
+
+def _drop_segment(endpoint, session_key, key):
+    with _lock:
+        entries = [e for e in _load_index(endpoint, session_key) if e["key"] != key]
+        _save_index(endpoint, session_key, entries)
+
+
+def _count(name, amount=1):
+    with _lock:
+        _metrics[name] += amount
+
+
+# --- 공개 API ---
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = self.error = None
+        self.waiters = 0
+
+
+class UpstreamError(Exception):
+    """cached_fetch 의 fetch 가 실패 사유를 전할 때 올리는 예외.
+
+    같은 gap 을 함께 기다리던 호출에도 같은 예외가 전달되므로, 호출마다 자기 오류 목록에 기록할 수 있습니다.
+    """
+
+
+def coalesce(key, fn):
+    """같은 key 의 호출이 이미 진행 중이면 fn 을 다시 실행하지 않고 그 결과를 함께 받습니다. (single-flight)
+
+    (결과, shared) 를 돌려줍니다. shared 가 True 면 다른 호출이 받아 온 결과(같은 객체)입니다.
+    진행 중인 호출이 예외로 끝나면 기다리던 호출에도 같은 예외가 전달됩니다.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+        else:
+            flight.waiters += 1
+    if not leader:
+        _count("coalesced")
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, True
+
+    _count("flights")
+    try:
+        flight.result = fn()
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+    return flight.result, False
+
+
+def is_covered(endpoint, session_key, start, end):
+    """(start, end) 구간이 캐시 세그먼트로 모두 덮여 있는지 인덱스만 보고 확인합니다. (행은 읽지 않음)"""
+    start_us, end_us = to_us(start), to_us(end)
+    segments = _live_entries(endpoint, session_key)
+    if start_us is None or end_us is None:
+        lo = start_us if start_us is not None else float("-inf")
+        hi = end_us if end_us is not None else float("inf")
+        return any(_bounds(e)[0] <= lo and _bounds(e)[1] >= hi for e in segments)
+    return not find_gaps(segments, start_us, end_us)
+
+
+def cached_fetch(endpoint, session_key, start, end, fetch):
+    """(start, end) 구간의 행 목록을 캐시 세그먼트와 업스트림을 조합해 돌려줍니다.
+
+    fetch(lo, hi) 는 date>=lo, date<hi 조건(둘 다 None 이면 세션 전체)으로 업스트림을 조회해
+    성공 시 행 목록, 실패 시 None 을 돌려주거나 UpstreamError 를 올려야 합니다. 실패한 결과는 저장하지 않으며,
+    하나의 gap 이라도 실패하면 None 을 돌려줍니다. (UpstreamError 는 그 gap 을 기다리던 모든 호출에 그대로 올림)
+    """
+    start_us, end_us = to_us(start), to_us(end)
+    try:
+        segments = _live_entries(endpoint, session_key)
+    except Exception as e:
+        print(f"[CACHE] 인덱스 조회 실패 ({endpoint}): {e}", file=sys.stderr)
+        segments = []
+
+    if start_us is None or end_us is None:
+        # 한쪽이 열린 구간(세션 전체 등)은 통째로 덮는 세그먼트가 있을 때만 캐시에서 응답
+        lo = start_us if start_us is not None else float("-inf")
+        hi = end_us if end_us is not None else float("inf")
+        covering = [e for e in segments if _bounds(e)[0] <= lo and _bounds(e)[1] >= hi]
+        gaps = [] if covering else [(start_us, end_us)]
+        segments = covering[:1]
+    else:
+        gaps = find_gaps(segments, start_us, end_us)
+
+    ranged = start_us is not None or end_us is not None
+    lo_req = start_us if start_us is not None else float("-inf")
+    hi_req = end_us if end_us is not None else float("inf")
+
+    # 1) 요청 구간과 겹치는 캐시 세그먼트를 읽어 둠 (새 세그먼트 저장 시 병합되기 전에)
+    #    세션 전체 세그먼트와 구간 세그먼트가 함께 있으면 서로 겹치므로, 시작 순으로 보며 이미 덮은 부분은 건너뜀
+    parts = []
+    covered = lo_req
+    for entry in sorted(segments, key=lambda e: _bounds(e)[0]):
+        lo, hi = _bounds(entry)
+        if hi <= covered or lo >= hi_req:
+            continue
+        keep_from = covered if lo < covered and covered > lo_req else None
+        part_start = max(lo, covered)
+        covered = max(covered, hi)
+        rows = _read_object(entry["key"])
+        if rows is None:
+            # 객체 파일이 사라졌으면 인덱스에서 빼고 처음부터 다시 조회
+            _drop_segment(endpoint, session_key, entry["key"])
+            return cached_fetch(endpoint, session_key, start, end, fetch)
+        used = _trim(rows, start_us, end_us, keep_from) if ranged or keep_from is not None else rows
+        if entry.get("rows"):
+            _count("bytes_saved", int(entry.get("bytes", 0) * len(used) / entry["rows"]))
+        parts.append((part_start, used))
+    cached_parts = len(parts)
+
+    # 2) 비어 있는 구간만 업스트림에서 받아 세그먼트로 저장
+    #    동시에 같은 구간을 요청한 호출들은 업스트림 요청 하나를 함께 기다림 (저장도 한 번만)
+    permanent = None
+    for lo, hi in gaps:
+        bounded = lo is not None and hi is not None
+        rows, shared = coalesce(("gap", endpoint, str(session_key), lo, hi),
+                                lambda: fetch(from_us(lo), from_us(hi)) if bounded else fetch(None, None))
+        if not shared:
+            _count("upstream_requests")
+        if rows is None:
+            return None
+        if not shared:
+            _count("upstream_bytes", len(json.dumps(rows, separators=(",", ":"))))
+            if permanent is None:
+                permanent = session_finished(session_key)
+            try:
+                _store_segment(endpoint, session_key, lo, hi, rows, permanent)
+            except Exception as e:
+                print(f"[CACHE] 저장 실패 ({endpoint}): {e}", file=sys.stderr)
+        parts.append((lo if lo is not None else float("-inf"), _trim(rows, start_us, end_us) if ranged else rows))
+
+    _count("requests")
+    if not gaps:
+        _count("hits")
+    elif cached_parts:
+        _count("partial_hits")
+    else:
+        _count("misses")
+
+    # 3) 시간순으로 이어 붙임 (세그먼트끼리는 겹치지 않음)
+    parts.sort(key=lambda p: p[0])
+    result = []
+    for _, rows in parts:
+        result.extend(rows)
+    return result
+
+
+def metrics():
+    """이 프로세스의 캐시 지표와 적중률을 돌려줍니다."""
+    with _lock:
+        snapshot = dict(_metrics)
+    total = snapshot["requests"]
+    snapshot["hit_rate"] = snapshot["hits"] / total if total else 0.0
+    with _flights_lock:
+        snapshot["in_flight"] = len(_flights)
+        snapshot["in_flight_waiters"] = sum(f.waiters for f in _flights.values())
+    return snapshot
+
+
+def _metrics_path():
+    return os.path.join(CACHE_DIR, "metrics.json")
+
+
+def flush_metrics():
+    """이 프로세스의 지표를 디스크의 누적 지표에 더하고 카운터를 비웁니다."""
+    with _lock:
+        delta = dict(_metrics)
+        for name in _metrics:
+            _metrics[name] = 0
+    if not delta["requests"]:
+        return
+    try:
+        with open(_metrics_path(), "r", encoding="utf-8") as f:
+            total = json.load(f)
+    except (OSError, ValueError):
+        total = {}
+    for name, value in delta.items():
+        total[name] = total.get(name, 0) + value
+    try:
+        _write_atomic(_metrics_path(), json.dumps(total).encode("utf-8"))
+    except OSError as e:
+        print(f"[CACHE] 지표 저장 실패: {e}", file=sys.stderr)
+
+
+atexit.register(flush_metrics)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "stats":
+        try:
+            with open(_metrics_path(), "r", encoding="utf-8") as f:
+                total = json.load(f)
+        except (OSError, ValueError):
+            total = {}
+        requests_total = total.get("requests", 0)
+        total["hit_rate"] = total.get("hits", 0) / requests_total if requests_total else 0.0
+        print(json.dumps(total, indent=2))
+    else:
+        print("사용법: python telemetry_cache.py stats")
+        sys.exit(1)
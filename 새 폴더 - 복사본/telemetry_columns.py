@@ -0,0 +1,67 @@
+# telemetry_columns.py
+# get_driver_locations 응답의 열 지향(columnar) 형식과 JSON 인코더.
+# 행 형식: [{"session_key": .., "meeting_key": .., "date": "..", "driver_number": 1, "x": .., "y": ..}, ...]
+# 열 형식: {"1": {"t": [epoch ms, ...], "x": [...], "y": [...]}, ...}   (드라이버별 평행 배열, 원래 순서 유지)
+# 행마다 반복되던 session_key/meeting_key/driver_number/date 문자열이 빠지므로 응답 크기와 인코딩/파싱 시간이 줄어듭니다.
+# orjson 이 설치돼 있으면 직렬화에 사용하고, 없으면 표준 json 을 씁니다.
+import json
+from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 열 형식으로 바꾸는 결과 키 (race_control 은 드라이버 단위가 아니고 행 수도 적어 그대로 둠)
+COLUMNAR_KEYS = ("locations", "positions", "car_data")
+# 열 형식에서 버리는 반복 메타데이터 (요청에 이미 있거나 드라이버 키/t 로 옮겨짐)
+DROPPED_FIELDS = ("session_key", "meeting_key", "driver_number", "date")
+
+
+def epoch_ms(date):
+    """ISO 8601 문자열을 epoch 밀리초로 바꿉니다. (telemetry_cache.to_us 보다 빠른 timestamp() 경로)"""
+    dt = datetime.fromisoformat(date)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return round(dt.timestamp() * 1_000_000) // 1000
+
+
+def rows_to_columns(rows):
+    """행 목록을 {"<driver_number>": {"t": [...], <필드>: [...]}} 로 바꿉니다. 시각이나 드라이버가 없는 행은 버림."""
+    fields = []
+    seen = set(DROPPED_FIELDS)
+    for row in rows:
+        for name in row:
+            if name not in seen:
+                seen.add(name)
+                fields.append(name)
+
+    drivers = {}
+    for row in rows:
+        dn, date = row.get("driver_number"), row.get("date")
+        if dn is None or date is None:
+            continue
+        columns = drivers.get(dn)
+        if columns is None:
+            columns = drivers[dn] = {"t": [], **{name: [] for name in fields}}
+        columns["t"].append(epoch_ms(date))
+        for name in fields:
+            columns[name].append(row.get(name))
+    return {str(dn): columns for dn, columns in drivers.items()}
+
+
+def to_columnar(result):
+    """fetch_window 결과의 COLUMNAR_KEYS 를 열 형식으로 바꾼 새 딕셔너리를 돌려줍니다."""
+    out = dict(result)
+    for key in COLUMNAR_KEYS:
+        if isinstance(out.get(key), list):
+            out[key] = rows_to_columns(out[key])
+    out["format"] = "columnar"
+    return out
+
+
+def dumps(obj, default=None):
+    """obj 를 한 줄짜리 JSON 문자열로 직렬화합니다. (orjson 이 있으면 orjson, NaN 은 null)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, default=default, separators=(",", ":"))
@@ -0,0 +1,176 @@
+# telemetry_ingest.py
+# OpenF1 행 목록(JSON dict)을 엔드포인트별 고정 스키마의 작은 DataFrame 으로 바꿉니다.
+# - driver_number int16, 좌표 int32, 속도/rpm int16, 기어/DRS int8 ... (값이 빠진 열만 pandas nullable 정수)
+# - 시각 문자열은 epoch ms(int64) 열 "<이름>_ms" 로 (UTC 고정 형식이면 numpy 로 한 번에 파싱, 아니면 pandas 로 대체)
+# - race_control 의 category/flag/scope 처럼 반복되는 문자열은 category
+# - 실수 필드의 숫자가 아닌 값(intervals 의 "+1 LAP" 등)은 NaN
+# 스키마에 없는 필드는 버리고, 필수 필드가 빠진 행도 버립니다.
+import numpy as np
+
+# 엔드포인트 -> {필드: 형식}. 형식: "time" (epoch 시각), numpy 정수/실수 dtype 이름, "bool", "category", "str"
+SCHEMAS = {
+    "location": {"date": "time", "driver_number": "int16", "x": "int32", "y": "int32", "z": "int32"},
+    "car_data": {"date": "time", "driver_number": "int16", "speed": "int16", "rpm": "int16",
+                 "n_gear": "int8", "throttle": "int16", "brake": "int16", "drs": "int8"},
+    "position": {"date": "time", "driver_number": "int16", "position": "int8"},
+    "intervals": {"date": "time", "driver_number": "int16", "interval": "float32", "gap_to_leader": "float32"},
+    "laps": {"date_start": "time", "driver_number": "int16", "lap_number": "int16", "lap_duration": "float32",
+             "duration_sector_1": "float32", "duration_sector_2": "float32", "duration_sector_3": "float32",
+             "i1_speed": "int16", "i2_speed": "int16", "st_speed": "int16", "is_pit_out_lap": "bool"},
+    "race_control": {"date": "time", "driver_number": "int16", "lap_number": "int16", "sector": "int8",
+                     "category": "category", "flag": "category", "scope": "category", "message": "str"},
+}
+# 엔드포인트 -> 이 필드가 빠진 행은 버림
+REQUIRED = {
+    "location": ("date", "driver_number", "x", "y"),
+    "car_data": ("date", "driver_number"),
+    "position": ("date", "driver_number", "position"),
+    "intervals": ("date", "driver_number"),
+    "laps": ("driver_number", "lap_number"),
+    "race_control": ("date",),
+}
+
+# 시각을 파싱할 수 없을 때의 값 (pandas NaT 와 같은 int64 최솟값)
+MISSING_TIME = np.iinfo(np.int64).min
+
+_WIDTH = 40
+_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+
+
+def _days_from_civil(y, m, d):
+    """그레고리력 날짜 배열을 1970-01-01 기준 일수로 바꿉니다."""
+    y = y - (m <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * np.where(m > 2, m - 3, m + 9) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _parse_fixed(values):
+    """YYYY-MM-DDTHH:MM:SS[.f{1,9}][+00:00|Z] 를 epoch us 로 파싱합니다. (결과, 형식이 맞는 행 마스크)"""
+    n = len(values)
+    raw = np.array(values, dtype=f"S{_WIDTH}")
+    b = raw.view(np.uint8).reshape(n, _WIDTH)
+    rows = np.arange(n)
+
+    def digit(i):
+        return b[:, i].astype(np.int64) - 48
+
+    ok = (b[:, 4] == 45) & (b[:, 7] == 45) & ((b[:, 10] == 84) | (b[:, 10] == 32)) \
+        & (b[:, 13] == 58) & (b[:, 16] == 58)
+    for i in _DIGITS:
+        ok &= (b[:, i] >= 48) & (b[:, i] <= 57)
+
+    # 소수점 이하 (자릿수가 행마다 다름)
+    frac = np.zeros(n, dtype=np.int64)
+    ndig = np.zeros(n, dtype=np.int64)
+    active = b[:, 19] == 46
+    for k in range(9):
+        c = b[:, 20 + k]
+        is_digit = active & (c >= 48) & (c <= 57)
+        frac = np.where(is_digit, frac * 10 + c.astype(np.int64) - 48, frac)
+        ndig += is_digit
+        active = is_digit
+    ok &= (b[:, 19] != 46) | (ndig > 0)
+    frac_us = np.where(ndig <= 6, frac * 10 ** np.clip(6 - ndig, 0, 6), frac // 10 ** np.clip(ndig - 6, 0, 3))
+
+    # 시간대: 없음(UTC 로 간주) / Z / +00:00 / -00:00 만 빠른 경로로 처리
+    p = np.where(b[:, 19] == 46, 20 + ndig, 19)
+    c0 = b[rows, p]
+    zero_offset = ((c0 == 43) | (c0 == 45)) & (b[rows, p + 1] == 48) & (b[rows, p + 2] == 48) \
+        & (b[rows, p + 3] == 58) & (b[rows, p + 4] == 48) & (b[rows, p + 5] == 48) & (b[rows, p + 6] == 0)
+    ok &= (c0 == 0) | ((c0 == 90) & (b[rows, p + 1] == 0)) | zero_offset
+    # 잘린 문자열(너비 초과)은 빠른 경로에서 제외
+    ok &= b[:, _WIDTH - 1] == 0
+
+    days = _days_from_civil(digit(0) * 1000 + digit(1) * 100 + digit(2) * 10 + digit(3),
+                            digit(5) * 10 + digit(6), digit(8) * 10 + digit(9))
+    seconds = ((days * 24 + digit(11) * 10 + digit(12)) * 60 + digit(14) * 10 + digit(15)) * 60 \
+        + digit(17) * 10 + digit(18)
+    return seconds * 1_000_000 + frac_us, ok
+
+
+def parse_iso(values, unit="ms"):
+    """ISO 8601 문자열 목록을 epoch ms (unit="us" 면 us) int64 배열로 바꿉니다.
+
+    UTC 고정 형식은 numpy 로 한 번에 파싱하고, 나머지(다른 시간대, None 등)만 pandas 로 처리합니다.
+    파싱할 수 없는 값은 MISSING_TIME 입니다.
+    """
+    values = list(values)
+    if not values:
+        return np.zeros(0, dtype=np.int64)
+    try:
+        us, ok = _parse_fixed(values)
+    except (UnicodeEncodeError, TypeError, ValueError):
+        us, ok = np.zeros(len(values), dtype=np.int64), np.zeros(len(values), dtype=bool)
+    if not ok.all():
+        import pandas as pd
+
+        bad = np.flatnonzero(~ok)
+        parsed = pd.to_datetime(pd.Series([values[i] for i in bad], dtype=object), format="ISO8601",
+                                utc=True, errors="coerce")
+        fallback = parsed.dt.as_unit("us").astype("int64").to_numpy()
+        us[bad] = np.where(parsed.isna().to_numpy(), MISSING_TIME, fallback)
+    if unit == "us":
+        return us
+    return np.where(us == MISSING_TIME, MISSING_TIME, us // 1000)
+
+
+def _float_or_nan(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _numeric_column(values, kind):
+    import pandas as pd
+
+    if kind != "bool" and np.dtype(kind).kind == "f":
+        try:
+            arr = np.asarray([np.nan if v is None else v for v in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            arr = np.fromiter((_float_or_nan(v) for v in values), dtype=np.float64, count=len(values))
+        return arr.astype(kind)
+    mask = None
+    if None in values:
+        mask = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+        values = [0 if v is None else v for v in values]
+    if kind == "bool":
+        arr = np.asarray(values, dtype=bool)
+        return pd.arrays.BooleanArray(arr, mask) if mask is not None else arr
+    arr = np.rint(np.asarray(values, dtype=np.float64))
+    dtype = np.dtype(kind)
+    info = np.iinfo(dtype)
+    if arr.size and (arr.min() < info.min or arr.max() > info.max):
+        dtype = np.dtype(np.int64)  # 범위를 벗어나면 넓힘
+    arr = arr.astype(dtype)
+    return pd.arrays.IntegerArray(arr, mask) if mask is not None else arr
+
+
+def to_frame(endpoint, rows, time_unit="ms"):
+    """행 목록을 SCHEMAS[endpoint] 형식의 DataFrame 으로 바꿉니다.
+
+    시각 필드 <이름> 은 epoch 시각(int64) 열 <이름>_ms (time_unit="us" 면 <이름>_us) 가 됩니다.
+    """
+    import pandas as pd
+
+    schema = SCHEMAS[endpoint]
+    required = REQUIRED.get(endpoint, ())
+    if required:
+        rows = [r for r in rows if all(r.get(name) is not None for name in required)]
+    columns = {}
+    for name, kind in schema.items():
+        values = [r.get(name) for r in rows]
+        if all(v is None for v in values) and name not in required:
+            continue
+        if kind == "time":
+            columns[f"{name}_{time_unit}"] = parse_iso(values, unit=time_unit)
+        elif kind == "category":
+            columns[name] = pd.Categorical(values)
+        elif kind == "str":
+            columns[name] = pd.array(values, dtype=object)
+        else:
+            columns[name] = _numeric_column(values, kind)
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(rows)))
@@ -0,0 +1,7 @@
+# tests/conftest.py
+# 프로젝트 루트의 모듈을 테스트에서 import 할 수 있도록 경로를 추가합니다.
+# 실행: python -m pytest -q tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
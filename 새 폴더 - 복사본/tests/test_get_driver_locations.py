@@ -0,0 +1,46 @@
+# tests/test_get_driver_locations.py
+# fetch_window 가 기본으로는 파생 필드(ix/iy/lap_dist)를 붙이지 않고, fields 로 고른 경우에만 계산하는지 확인합니다.
+import os
+import sys
+
+import pytest
+
+import get_driver_locations
+import telemetry_cache
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import fake_openf1  # noqa: E402
+
+SESSION = "9693"  # 보정/중심선이 있는 서킷 (melbourne)
+START = "2025-03-16T04:30:00+00:00"
+END = "2025-03-16T04:30:05+00:00"
+
+
+@pytest.fixture(autouse=True)
+def upstream(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetry_cache, "CACHE_DIR", str(tmp_path))
+    server, url = fake_openf1.start_server()
+    monkeypatch.setattr(get_driver_locations, "BASE_URL", url)
+    monkeypatch.setattr(telemetry_cache, "BASE_URL", url)
+    yield
+    server.shutdown()
+
+
+def fetch(**kwargs):
+    return get_driver_locations.fetch_window(SESSION, START, END, include={"locations"}, **kwargs)
+
+
+def test_derived_fields_are_off_by_default():
+    result = fetch()
+    assert result["locations"]
+    assert "calibration" not in result
+    for row in result["locations"]:
+        assert not set(get_driver_locations.DERIVED_LOCATION_FIELDS) & set(row)
+        assert {"x", "y"} <= set(row)
+
+
+def test_derived_fields_when_requested():
+    result = fetch(fields={"locations": ["ix", "iy"]})
+    assert "calibration" in result
+    row = result["locations"][0]
+    assert set(row) == {"date", "driver_number", "ix", "iy"}
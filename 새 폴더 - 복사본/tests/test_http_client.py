@@ -0,0 +1,45 @@
+# tests/test_http_client.py
+# 429 응답의 Retry-After 대기가 MAX_BACKOFF_S 로 제한되는지 확인합니다.
+import pytest
+
+import http_client
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b"[]"
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def get(self, url, params=None, timeout=None, headers=None):
+        return self.responses.pop(0)
+
+
+@pytest.mark.parametrize("retry_after", ["3600", "Wed, 21 Oct 2099 07:28:00 GMT"])
+def test_retry_after_is_capped(retry_after, monkeypatch):
+    slept = []
+    fake = FakeSession([FakeResponse(429, {"Retry-After": retry_after}), FakeResponse(200)])
+    monkeypatch.setattr(http_client, "session", lambda: fake)
+    monkeypatch.setattr(http_client.time, "sleep", slept.append)
+
+    response = http_client.get("http://example.invalid/v1/location")
+    assert response.status_code == 200
+    assert slept == [http_client.MAX_BACKOFF_S]
+
+
+def test_short_retry_after_is_kept(monkeypatch):
+    slept = []
+    fake = FakeSession([FakeResponse(429, {"Retry-After": "2"}), FakeResponse(200)])
+    monkeypatch.setattr(http_client, "session", lambda: fake)
+    monkeypatch.setattr(http_client.time, "sleep", slept.append)
+
+    http_client.get("http://example.invalid/v1/location")
+    assert slept == [2.0]
@@ -0,0 +1,43 @@
+# tests/test_live_feed.py
+# 구독자가 모두 떠난 세션 피드가 유휴 시간 뒤 _feeds 에서 빠지는지 확인합니다.
+import time
+
+import live_feed
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_idle_feed_is_dropped(monkeypatch):
+    monkeypatch.setattr(live_feed, "IDLE_STOP_S", 0.05)
+    monkeypatch.setattr(live_feed, "POLL_INTERVAL_S", 0.01)
+    monkeypatch.setattr(live_feed.SessionFeed, "poll", lambda self: None)
+
+    session, q = live_feed.subscribe("123")
+    assert live_feed._feeds["123"] is session
+    session.unsubscribe(q)
+    assert wait_until(lambda: "123" not in live_feed._feeds)
+
+    # 다시 접속하면 새 피드로 시작
+    again, q = live_feed.subscribe("123")
+    assert again is not session
+    again.unsubscribe(q)
+    assert wait_until(lambda: "123" not in live_feed._feeds)
+
+
+def test_feed_with_subscribers_is_kept(monkeypatch):
+    monkeypatch.setattr(live_feed, "IDLE_STOP_S", 0.05)
+    monkeypatch.setattr(live_feed, "POLL_INTERVAL_S", 0.01)
+    monkeypatch.setattr(live_feed.SessionFeed, "poll", lambda self: None)
+
+    session, q = live_feed.subscribe("456")
+    time.sleep(0.2)
+    assert live_feed._feeds.get("456") is session
+    session.unsubscribe(q)
+    assert wait_until(lambda: "456" not in live_feed._feeds)
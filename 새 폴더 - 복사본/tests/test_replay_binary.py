@@ -0,0 +1,88 @@
+# tests/test_replay_binary.py
+# replay_binary 의 쓰기 -> 읽기 왕복과 ReplayReader.slice 구간 경계를 확인합니다.
+import numpy as np
+import pytest
+
+import replay_binary
+
+
+def columns(n, seed=0, jump=0):
+    rng = np.random.default_rng(seed)
+    t = np.cumsum(rng.integers(200, 300, n)).astype(np.int64) + 1_742_097_600_000
+    x = np.cumsum(rng.integers(-50, 50, n)).astype(np.int32)
+    y = np.cumsum(rng.integers(-50, 50, n)).astype(np.int32)
+    if jump:
+        x[n // 2:] += jump  # int16 을 넘는 델타 (블록 하나가 int32 로 저장됨)
+        y[n // 3:] -= jump
+    return t, x, y
+
+
+def read_all(path, **kwargs):
+    with replay_binary.ReplayReader(path) as reader:
+        return reader.slice(**kwargs), reader.meta
+
+
+def assert_same(actual, expected):
+    assert sorted(actual) == sorted(expected)
+    for dn, arrays in expected.items():
+        for got, want in zip(actual[dn], arrays):
+            assert np.array_equal(got, want)
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_round_trip_with_int16_overflowing_deltas(tmp_path, compress):
+    data = {1: columns(3000, seed=1, jump=100_000), 44: columns(2500, seed=2)}
+    path = tmp_path / "r.f1rb"
+    replay_binary.write_replay(path, data, session_key=9693, compress=compress, block_size=512)
+    out, meta = read_all(path)
+    assert_same(out, data)
+    xy_bytes = {b[5] for b in meta["drivers"]["1"]["blocks"]}
+    assert xy_bytes == {2, 4}
+    assert {b[5] for b in meta["drivers"]["44"]["blocks"]} == {2}
+
+
+def test_single_sample_driver(tmp_path):
+    data = {7: (np.array([1000], np.int64), np.array([-123456], np.int32), np.array([654321], np.int32)),
+            8: columns(10)}
+    path = tmp_path / "r.f1rb"
+    replay_binary.write_replay(path, data)
+    out, meta = read_all(path)
+    assert_same(out, data)
+    assert meta["drivers"]["7"]["count"] == 1
+
+
+def test_empty_column_set(tmp_path):
+    path = tmp_path / "r.f1rb"
+    replay_binary.write_replay(path, {}, session_key=1)
+    out, meta = read_all(path)
+    assert out == {}
+    assert meta["drivers"] == {} and meta["bbox"] is None
+    with replay_binary.ReplayReader(path) as reader:
+        assert reader.drivers == []
+        assert reader.slice(0, 10, drivers=[1]) == {}
+
+
+def test_slice_at_block_boundaries(tmp_path):
+    block = 100
+    t, x, y = columns(block * 5 + 1, seed=3)
+    path = tmp_path / "r.f1rb"
+    replay_binary.write_replay(path, {1: (t, x, y)}, block_size=block)
+
+    with replay_binary.ReplayReader(path) as reader:
+        def check(lo, hi):
+            got = reader.slice(lo, hi)[1]
+            keep = (t >= (t[0] if lo is None else lo)) & (t <= (t[-1] if hi is None else hi))
+            for a, b in zip(got, (t[keep], x[keep], y[keep])):
+                assert np.array_equal(a, b)
+
+        for k in range(1, 6):
+            first, last_prev = t[k * block], t[k * block - 1]
+            check(first, first)                 # 블록 첫 샘플 하나
+            check(last_prev, last_prev)         # 앞 블록 마지막 샘플 하나
+            check(last_prev, first)             # 두 블록에 걸친 두 샘플
+            check(last_prev + 1, first - 1)     # 블록 사이 빈 구간
+        check(t[0], t[-1])
+        check(None, t[block])
+        check(t[-1], None)
+        assert len(reader.slice(t[-1] + 1, None)[1][0]) == 0
+        assert len(reader.slice(None, t[0] - 1)[1][0]) == 0
@@ -0,0 +1,94 @@
+# tests/test_standings_timeline.py
+# StandingsTimeline.at(t) 가 position 행을 처음부터 다시 적용한 결과(기존 프레임별 driver_standings)와 같은지 확인합니다.
+import math
+
+import numpy as np
+import pytest
+
+import standings_timeline
+
+T0_US = 1_742_097_600_000_000
+
+
+def brute_force(t_us, drivers, positions, t_ms):
+    """t_ms 프레임의 순위표: ms 로 올린 시각이 t_ms 이하인 행을 시간순으로 모두 적용."""
+    rows = sorted(zip(t_us, drivers, positions), key=lambda r: r[0])  # 안정 정렬
+    valid = [r for r in rows if not math.isnan(r[2])]
+    if not valid or t_ms < -(-valid[0][0] // 1000):
+        return {}
+    state = {}
+    for at, dn, pos in valid:
+        if -(-at // 1000) <= t_ms:
+            state[dn] = pos
+    return state
+
+
+def check(t_us, drivers, positions, queries):
+    timeline = standings_timeline.encode(t_us, drivers, positions)
+    reader = standings_timeline.StandingsTimeline(timeline)
+    for t in queries:
+        assert reader.at(t) == brute_force(t_us, drivers, positions, t), t
+    return timeline
+
+
+def random_rows(n, seed, fractional=False):
+    rng = np.random.default_rng(seed)
+    t_us = T0_US + np.sort(rng.integers(0, 5_000_000, n))
+    drivers = rng.choice([1, 4, 16, 44, 81], n)
+    positions = rng.integers(1, 6, n).astype(np.float64)
+    if fractional:
+        positions += rng.choice([0.0, 0.5], n)
+    return t_us.tolist(), drivers.tolist(), positions.tolist()
+
+
+def queries_for(t_us):
+    ms = sorted({-(-t // 1000) for t in t_us})
+    return [ms[0] - 1000, ms[0] - 1] + [m + d for m in ms for d in (-1, 0, 1)] + [ms[-1] + 10_000]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_brute_force(seed, monkeypatch):
+    monkeypatch.setattr(standings_timeline, "CHECKPOINT_EVERY", 4)
+    t_us, drivers, positions = random_rows(300, seed)
+    check(t_us, drivers, positions, queries_for(t_us))
+
+
+def test_before_first_row_is_empty():
+    t_us, drivers, positions = [T0_US + 1500, T0_US + 9000], [1, 44], [1.0, 2.0]
+    timeline = check(t_us, drivers, positions, [0, T0_US // 1000, T0_US // 1000 + 1, T0_US // 1000 + 2])
+    assert timeline["t0"] == T0_US // 1000 + 2
+    assert standings_timeline.StandingsTimeline(None).at(T0_US) == {}
+
+
+def test_several_changes_for_one_driver_in_the_same_ms():
+    base = T0_US + 10_000
+    t_us = [T0_US, T0_US, base + 100, base + 200, base + 300, base + 400, base + 400]
+    drivers = [1, 44, 1, 1, 44, 1, 44]
+    positions = [1.0, 2.0, 2.0, 3.0, 1.0, 1.0, 2.0]
+    timeline = check(t_us, drivers, positions, queries_for(t_us))
+    # 같은 ms 에 이어진 같은 드라이버 변경(2 -> 3)은 마지막 값 하나로 합쳐짐
+    t = (base + 1000) // 1000
+    assert [e for e in timeline["events"] if e[1] == 1 and e[0] == t] == [[t, 1, 3], [t, 1, 1]]
+
+
+@pytest.mark.parametrize("multiple", [1, 2, 3])
+def test_event_count_exact_multiple_of_checkpoint(multiple):
+    n = standings_timeline.CHECKPOINT_EVERY * multiple
+    t_us = [T0_US, T0_US] + [T0_US + (i + 1) * 1000 for i in range(n)]
+    drivers = [1, 44] + [1 if i % 2 else 44 for i in range(n)]
+    positions = [1.0, 2.0] + [float(10 + i) for i in range(n)]
+    timeline = check(t_us, drivers, positions, queries_for(t_us))
+    assert len(timeline["events"]) == n
+
+
+def test_non_integer_positions(monkeypatch):
+    monkeypatch.setattr(standings_timeline, "CHECKPOINT_EVERY", 8)
+    t_us, drivers, positions = random_rows(200, seed=7, fractional=True)
+    timeline = check(t_us, drivers, positions, queries_for(t_us))
+    assert any(isinstance(pos, float) and pos != int(pos) for _, _, pos in timeline["events"])
+
+
+def test_missing_positions_are_skipped():
+    t_us = [T0_US, T0_US + 1000, T0_US + 2000]
+    check(t_us, [1, 1, 44], [1.0, float("nan"), 2.0], queries_for(t_us))
+    assert standings_timeline.encode(t_us[:2], [1, 1], [float("nan")] * 2) is None
@@ -0,0 +1,110 @@
+# tests/test_telemetry_cache.py
+# 같은 업스트림 조회를 함께 기다린(coalesce) 호출들이 모두 실패 사유를 받는지 확인합니다.
+import threading
+import time
+
+import pytest
+
+import get_driver_locations
+import telemetry_cache
+
+START = "2025-03-16T04:30:00+00:00"
+END = "2025-03-16T04:30:05+00:00"
+CALLERS = 3
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetry_cache, "CACHE_DIR", str(tmp_path))
+
+
+def wait_for_waiters(n, timeout=5.0):
+    """진행 중인 조회에 n 개의 호출이 합류할 때까지 기다립니다."""
+    deadline = time.time() + timeout
+    while telemetry_cache.metrics()["in_flight_waiters"] < n:
+        if time.time() > deadline:
+            raise AssertionError("coalesce 에 합류한 호출이 없습니다.")
+        time.sleep(0.005)
+
+
+def run_concurrently(fn):
+    results = [None] * CALLERS
+
+    def worker(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(CALLERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return results
+
+
+def test_cached_fetch_raises_upstream_error_to_every_waiter():
+    calls = []
+
+    def upstream(lo, hi):
+        calls.append((lo, hi))
+        wait_for_waiters(CALLERS - 1)
+        raise telemetry_cache.UpstreamError("boom")
+
+    results = run_concurrently(lambda: telemetry_cache.cached_fetch("location", "1", START, END, upstream))
+    assert len(calls) == 1
+    assert all(isinstance(r, telemetry_cache.UpstreamError) and str(r) == "boom" for r in results)
+
+
+@pytest.mark.parametrize("key", ["locations", "latest_laps"])
+def test_fetch_all_records_error_for_every_caller(key, monkeypatch):
+    calls = []
+
+    def failing_get_data(endpoint, params, timeout=None, errors=None, error_key=None):
+        calls.append(endpoint)
+        wait_for_waiters(CALLERS - 1)
+        errors[error_key or endpoint] = f"Error fetching {endpoint}: unreachable"
+        return []
+
+    monkeypatch.setattr(get_driver_locations, "get_data", failing_get_data)
+    skip = {q[0] for q in get_driver_locations.WINDOW_QUERIES if q[0] != key}
+
+    def fetch():
+        errors = {}
+        data = get_driver_locations.fetch_all("1", START, END, errors=errors, skip=skip)
+        return data, errors
+
+    results = run_concurrently(fetch)
+    assert len(calls) == 1
+    for data, errors in results:
+        assert data[key] == []
+        assert "unreachable" in errors.get(key, "")
+
+
+def test_expired_live_segment_object_is_removed(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(telemetry_cache.time, "time", lambda: now[0])
+    old_lo, old_hi = telemetry_cache.to_us(START), telemetry_cache.to_us(END)
+    telemetry_cache._store_segment("location", "1", old_lo, old_hi, [{"date": START}], permanent=False)
+    old_key = telemetry_cache.make_key("location", "1", old_lo, old_hi)
+    old_path = telemetry_cache._object_path(old_key)
+    assert telemetry_cache.os.path.exists(old_path)
+
+    now[0] += telemetry_cache.LIVE_TTL_S + 1
+    telemetry_cache._store_segment("location", "1", old_hi, old_hi + 1_000_000, [{"date": END}], permanent=False)
+    assert not telemetry_cache.os.path.exists(old_path)
+    assert old_key not in [e["key"] for e in telemetry_cache._load_index("location", "1")]
+
+
+def test_lookup_prunes_expired_segment_objects(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(telemetry_cache.time, "time", lambda: now[0])
+    lo, hi = telemetry_cache.to_us(START), telemetry_cache.to_us(END)
+    telemetry_cache._store_segment("location", "1", lo, hi, [{"date": START}], permanent=False)
+    path = telemetry_cache._object_path(telemetry_cache.make_key("location", "1", lo, hi))
+
+    now[0] += telemetry_cache.LIVE_TTL_S + 1
+    assert not telemetry_cache.is_covered("location", "1", START, END)
+    assert not telemetry_cache.os.path.exists(path)
+    assert telemetry_cache._load_index("location", "1") == []
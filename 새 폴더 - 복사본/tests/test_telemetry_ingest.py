@@ -0,0 +1,21 @@
+# tests/test_telemetry_ingest.py
+# telemetry_ingest.to_frame 의 엔드포인트별 스키마 변환을 확인합니다.
+import numpy as np
+
+import telemetry_ingest
+
+
+def test_intervals_keep_interval_and_gap_with_lapped_cars_as_nan():
+    rows = [
+        {"date": "2025-03-16T04:30:00+00:00", "driver_number": 1, "interval": None, "gap_to_leader": 0.0},
+        {"date": "2025-03-16T04:30:00.5+00:00", "driver_number": 44, "interval": 1.25, "gap_to_leader": 1.25},
+        {"date": "2025-03-16T04:30:01+00:00", "driver_number": 2, "interval": "+1 LAP", "gap_to_leader": "+1 LAP"},
+    ]
+    df = telemetry_ingest.to_frame("intervals", rows)
+    assert df["interval"].dtype == np.float32
+    assert df["gap_to_leader"].dtype == np.float32
+    assert np.isnan(df["interval"][0]) and np.isnan(df["interval"][2])
+    assert df["interval"][1] == np.float32(1.25)
+    assert df["gap_to_leader"].tolist()[:2] == [0.0, 1.25]
+    assert np.isnan(df["gap_to_leader"][2])
+    assert df["date_ms"].tolist() == [1742099400000, 1742099400500, 1742099401000]
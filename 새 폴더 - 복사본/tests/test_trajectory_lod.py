@@ -0,0 +1,28 @@
+# tests/test_trajectory_lod.py
+# Douglas-Peucker 가 선분 끝을 넘어가는 점(헤어핀)을 버리지 않는지 확인합니다.
+import numpy as np
+
+import trajectory_lod
+
+
+def test_douglas_peucker_keeps_hairpin_overshoot():
+    # 0 -> 100 으로 갔다가 끝점(50)을 지나 150 까지 나간 뒤 되돌아오는 헤어핀.
+    # 150 은 0-50 직선 위에 있어 직선 거리로는 0 이지만, 선분까지는 100 떨어져 있음
+    x = [0.0, 100.0, 150.0, 50.0]
+    y = [0.0, 0.0, 0.0, 0.0]
+    keep = trajectory_lod.douglas_peucker(x, y, epsilon=10)
+    assert 2 in keep.tolist()
+
+
+def test_douglas_peucker_drops_points_within_epsilon():
+    x = np.linspace(0, 100, 11)
+    y = np.where(np.arange(11) % 2, 0.5, 0.0)
+    keep = trajectory_lod.douglas_peucker(x, y, epsilon=1)
+    assert keep.tolist() == [0, 10]
+
+
+def test_douglas_peucker_closed_loop():
+    # 시작점과 끝점이 같은 경로: 모든 점이 그 한 점까지의 거리로 비교됨
+    angle = np.linspace(0, 2 * np.pi, 9)
+    keep = trajectory_lod.douglas_peucker(np.cos(angle) * 100, np.sin(angle) * 100, epsilon=1)
+    assert keep[0] == 0 and keep[-1] == 8 and len(keep) > 2
@@ -0,0 +1,196 @@
+# track_calibration.py
+# 서킷별 텔레메트리 (x, y) -> 트랙 이미지 좌표 변환.
+# public/data/track_layouts.json 의 img <-> telemetry 대응점(서킷당 3개)으로 아핀 변환을 풀어
+# .cache/track_calibration.json 에 저장해 두고, 텔레메트리 배열에 한 번에 적용합니다.
+# 변환 행렬은 2x3 중첩 리스트입니다. numpy 는 행렬을 새로 풀거나 큰 배열에 적용할 때만 불러오고,
+# SMALL_ROWS 행 이하는 순수 파이썬으로 변환합니다. (짧은 구간 요청의 import 시간 절약)
+# 세션 -> 서킷은 public/data/schedule.json 의 circuit_short_name 을 f1api.js 와 같은 규칙
+# (소문자, 공백 -> '-') 으로 바꿔 찾습니다.
+# 사용법:
+#   python track_calibration.py [session_key]    # 변환 행렬과 대응점 오차 출력
+import json
+import os
+import re
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+LAYOUTS_FILE = os.path.join(ROOT_DIR, "public", "data", "track_layouts.json")
+SCHEDULE_FILE = os.path.join(ROOT_DIR, "public", "data", "schedule.json")
+CACHE_FILE = os.path.join(ROOT_DIR, ".cache", "track_calibration.json")
+
+# 일정의 circuit_short_name 과 레이아웃 이름이 다른 서킷
+CIRCUIT_ALIASES = {
+    "singapore": "marina-bay",
+    "mexico-city": "rodriguez",
+    "sao-paulo": "interlagos",
+    "lusail": "losail",
+}
+# project_rows 가 numpy 없이 변환하는 최대 행 수
+SMALL_ROWS = 5000
+
+_transforms = None
+_sessions = None
+
+
+def circuit_name(short_name):
+    """일정의 circuit_short_name 을 track_layouts.json 의 이름으로 바꿉니다."""
+    if not short_name:
+        return None
+    name = re.sub(r"\s+", "-", str(short_name).strip().lower())
+    return CIRCUIT_ALIASES.get(name, name)
+
+
+def solve_affine(img_points, telemetry_points):
+    """대응점으로 img = M @ [x, y, 1] 인 2x3 행렬 M 을 구합니다. (3개면 정확히, 더 많으면 최소제곱)"""
+    import numpy as np
+
+    src = np.array([[p["x"], p["y"], 1.0] for p in telemetry_points], dtype=np.float64)
+    dst = np.array([[p["x"], p["y"]] for p in img_points], dtype=np.float64)
+    if len(src) < 3 or np.linalg.matrix_rank(src) < 3:
+        raise ValueError("아핀 변환에는 한 직선 위에 있지 않은 대응점이 3개 이상 필요합니다.")
+    solution, *_ = np.linalg.lstsq(src, dst, rcond=None)
+    return solution.T.tolist()
+
+
+def _load_transforms():
+    """서킷별 변환 행렬을 캐시 파일에서 읽고, 레이아웃 파일이 바뀌었으면 다시 풀어 저장합니다."""
+    global _transforms
+    if _transforms is not None:
+        return _transforms
+    mtime = os.path.getmtime(LAYOUTS_FILE)
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("layouts_mtime") == mtime:
+            _transforms = cached["transforms"]
+            return _transforms
+    except (OSError, ValueError, KeyError):
+        pass
+
+    with open(LAYOUTS_FILE, "r", encoding="utf-8") as f:
+        layouts = json.load(f)
+    transforms = {}
+    for layout in layouts:
+        try:
+            transforms[layout["circuit_short_name"]] = solve_affine(layout["points"]["img"],
+                                                                    layout["points"]["telemetry"])
+        except (KeyError, ValueError) as e:
+            print(f"[CALIBRATION] {layout.get('circuit_short_name')}: {e}", file=sys.stderr)
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        tmp = f"{CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"layouts_mtime": mtime, "transforms": transforms}, f)
+        os.replace(tmp, CACHE_FILE)
+    except OSError as e:
+        print(f"[CALIBRATION] 캐시 저장 실패: {e}", file=sys.stderr)
+    _transforms = transforms
+    return transforms
+
+
+def transform_for_circuit(circuit):
+    return _load_transforms().get(circuit_name(circuit))
+
+
+def circuit_for_session(session_key):
+    global _sessions
+    if _sessions is None:
+        try:
+            with open(SCHEDULE_FILE, "r", encoding="utf-8") as f:
+                _sessions = {str(s.get("session_key")): s.get("circuit_short_name") for s in json.load(f)}
+        except (OSError, ValueError):
+            _sessions = {}
+    return circuit_name(_sessions.get(str(session_key)))
+
+
+def transform_for_session(session_key):
+    """세션의 (서킷 이름, 2x3 변환 행렬). 일정이나 레이아웃에 없으면 (서킷 이름 또는 None, None)."""
+    circuit = circuit_for_session(session_key)
+    return circuit, (_load_transforms().get(circuit) if circuit else None)
+
+
+def apply(matrix, x, y):
+    """텔레메트리 좌표 배열을 이미지 좌표 배열 (ix, iy) 로 바꿉니다."""
+    import numpy as np
+
+    (a, b, c), (d, e, f) = matrix
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    return a * x + b * y + c, d * x + e * y + f
+
+
+def apply_small(matrix, x, y):
+    """apply 의 순수 파이썬 버전. 좌표 리스트를 이미지 좌표 리스트 (ix, iy) 로 바꿉니다. (결과 값 동일)"""
+    (a, b, c), (d, e, f) = matrix
+    return [a * u + b * v + c for u, v in zip(x, y)], [d * u + e * v + f for u, v in zip(x, y)]
+
+
+def _round(value, digits):
+    """np.round 와 같은 규칙(value * 10^digits 를 짝수 반올림)으로 반올림합니다."""
+    scale = 10.0 ** digits
+    return round(value * scale) / scale
+
+
+def image_bbox(ix, iy):
+    if isinstance(ix, list):
+        ix, iy = [v for v in ix if v == v], [v for v in iy if v == v]  # NaN 제외
+        return {"minX": float(min(ix)), "maxX": float(max(ix)), "minY": float(min(iy)), "maxY": float(max(iy))}
+    import numpy as np
+
+    return {"minX": float(np.nanmin(ix)), "maxX": float(np.nanmax(ix)),
+            "minY": float(np.nanmin(iy)), "maxY": float(np.nanmax(iy))}
+
+
+def calibration_info(circuit, matrix, ix=None, iy=None):
+    """출력에 붙일 보정 정보. ix/iy 를 주면 이미지 좌표 bbox 도 포함합니다."""
+    info = {"circuit": circuit, "matrix": [[_round(v, 9) for v in row] for row in matrix]}
+    if ix is not None and len(ix):
+        info["img_bbox"] = image_bbox(ix, iy)
+    return info
+
+
+def project_rows(session_key, rows):
+    """location 행마다 이미지 좌표(ix, iy)를 붙인 새 행 목록과 보정 정보를 돌려줍니다.
+
+    보정할 수 없는 세션이면 (rows, None) 을 그대로 돌려줍니다. (입력 행은 수정하지 않음)
+    """
+    circuit, matrix = transform_for_session(session_key)
+    if matrix is None:
+        return rows, None
+    valid = [i for i, r in enumerate(rows) if r.get("x") is not None and r.get("y") is not None]
+    if not valid:
+        return rows, calibration_info(circuit, matrix)
+    if len(valid) <= SMALL_ROWS:
+        ix, iy = apply_small(matrix, [rows[i]["x"] for i in valid], [rows[i]["y"] for i in valid])
+        rounded = [_round(v, 1) for v in ix], [_round(v, 1) for v in iy]
+    else:
+        import numpy as np
+
+        x = np.fromiter((rows[i]["x"] for i in valid), dtype=np.float64, count=len(valid))
+        y = np.fromiter((rows[i]["y"] for i in valid), dtype=np.float64, count=len(valid))
+        ix, iy = apply(matrix, x, y)
+        rounded = np.round(ix, 1).tolist(), np.round(iy, 1).tolist()
+    out = list(rows)
+    for i, a, b in zip(valid, *rounded):
+        out[i] = {**rows[i], "ix": a, "iy": b}
+    return out, calibration_info(circuit, matrix, ix, iy)
+
+
+if __name__ == "__main__":
+    import numpy as np
+
+    with open(LAYOUTS_FILE, "r", encoding="utf-8") as f:
+        layouts = {l["circuit_short_name"]: l for l in json.load(f)}
+    if len(sys.argv) > 1:
+        names = [circuit_for_session(sys.argv[1])]
+    else:
+        names = sorted(layouts)
+    for name in names:
+        matrix = transform_for_circuit(name)
+        if matrix is None:
+            print(f"{name}: 레이아웃 없음")
+            continue
+        pts = layouts[name]["points"]
+        ix, iy = apply(matrix, [p["x"] for p in pts["telemetry"]], [p["y"] for p in pts["telemetry"]])
+        err = max(abs(a - p["x"]) + abs(b - p["y"]) for a, b, p in zip(ix, iy, pts["img"]))
+        print(f"{name:<18} {np.round(matrix, 5).tolist()}  max err {err:.2e}")
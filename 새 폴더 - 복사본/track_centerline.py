@@ -0,0 +1,221 @@
+# track_centerline.py
+# 서킷별 중심선(centerline)과 랩 거리(lap distance) 투영.
+# - 기준 랩(세션에서 가장 빠른 랩)의 location 샘플로 닫힌 중심선을 만들어 호 길이 기준 등간격으로 다시 샘플링하고,
+#   public/data/track_centerlines.json (track_layouts.json 옆) 에 서킷 이름으로 저장
+# - 공간 색인: 트랙 bbox 를 격자로 나눠 칸마다 가장 가까운 중심선 꼭짓점을 미리 계산 (격자 조회 O(1))
+# - 투영: 좌표 배열 전체를 한 번에, 격자로 찾은 꼭짓점 주변 선분들에 수선을 내려 랩 시작점부터의 거리를 구함
+# numpy 는 중심선을 실제로 만들거나 쓸 때만 불러옵니다. (중심선이 없는 서킷의 요청은 json 조회만으로 끝남)
+# 사용법:
+#   python track_centerline.py build <session_key> [...]   # 세션 데이터로 해당 서킷 중심선 생성/갱신
+import json
+import os
+import sys
+
+import track_calibration
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CENTERLINES_FILE = os.path.join(ROOT_DIR, "public", "data", "track_centerlines.json")
+
+# 중심선 꼭짓점 간격 (텔레메트리 좌표 단위)
+SPACING = 20.0
+# 공간 색인 격자 칸 크기와 트랙 bbox 바깥 여유
+GRID_CELL = 25.0
+GRID_MARGIN = 400.0
+# 격자로 찾은 꼭짓점 앞뒤로 살펴볼 선분 수
+NEIGHBOR_SEGMENTS = 3
+
+_loaded = {}
+
+
+class Centerline:
+    """닫힌 중심선과 격자 색인. project(x, y) 로 랩 거리를 구합니다."""
+
+    def __init__(self, points):
+        import numpy as np
+
+        pts = np.asarray(points, dtype=np.float64)
+        self.px, self.py = pts[:, 0], pts[:, 1]
+        self.n = len(pts)
+        nxt = np.roll(np.arange(self.n), -1)
+        self.dx, self.dy = self.px[nxt] - self.px, self.py[nxt] - self.py
+        self.seg_len2 = np.maximum(self.dx ** 2 + self.dy ** 2, 1e-12)
+        seg_len = np.sqrt(self.seg_len2)
+        self.cum = np.r_[0.0, np.cumsum(seg_len)[:-1]]
+        self.length = float(seg_len.sum())
+        self._build_grid()
+
+    def _build_grid(self):
+        import numpy as np
+
+        self.x0 = self.px.min() - GRID_MARGIN
+        self.y0 = self.py.min() - GRID_MARGIN
+        self.w = int(np.ceil((self.px.max() + GRID_MARGIN - self.x0) / GRID_CELL)) + 1
+        self.h = int(np.ceil((self.py.max() + GRID_MARGIN - self.y0) / GRID_CELL)) + 1
+        gx = self.x0 + (np.arange(self.w) + 0.5) * GRID_CELL
+        gy = self.y0 + (np.arange(self.h) + 0.5) * GRID_CELL
+        cx, cy = np.meshgrid(gx, gy)
+        cx, cy = cx.ravel(), cy.ravel()
+        nearest = np.empty(len(cx), dtype=np.int32)
+        chunk = max(1, 4_000_000 // self.n)
+        for lo in range(0, len(cx), chunk):
+            d2 = (cx[lo:lo + chunk, None] - self.px) ** 2 + (cy[lo:lo + chunk, None] - self.py) ** 2
+            nearest[lo:lo + chunk] = np.argmin(d2, axis=1)
+        self.grid = nearest.reshape(self.h, self.w)
+
+    def project(self, x, y):
+        """좌표 배열을 (랩 거리, 중심선까지의 거리) 배열로 투영합니다."""
+        import numpy as np
+
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        col = ((x - self.x0) / GRID_CELL).astype(np.int64).clip(0, self.w - 1)
+        row = ((y - self.y0) / GRID_CELL).astype(np.int64).clip(0, self.h - 1)
+        vertex = self.grid[row, col]
+        cand = (vertex[:, None] + np.arange(-NEIGHBOR_SEGMENTS, NEIGHBOR_SEGMENTS)) % self.n
+        ax, ay = self.px[cand], self.py[cand]
+        dx, dy = self.dx[cand], self.dy[cand]
+        t = (((x[:, None] - ax) * dx + (y[:, None] - ay) * dy) / self.seg_len2[cand]).clip(0.0, 1.0)
+        qx, qy = ax + t * dx, ay + t * dy
+        d2 = (x[:, None] - qx) ** 2 + (y[:, None] - qy) ** 2
+        best = np.argmin(d2, axis=1)
+        rows = np.arange(len(x))
+        seg = cand[rows, best]
+        dist = self.cum[seg] + t[rows, best] * np.sqrt(self.seg_len2[seg])
+        return dist % self.length, np.sqrt(d2[rows, best])
+
+    def to_json(self, **extra):
+        import numpy as np
+
+        return {**extra, "spacing": SPACING, "length": round(self.length, 1),
+                "points": np.round(np.column_stack([self.px, self.py]), 1).tolist()}
+
+
+def centerline_from_lap(x, y, spacing=SPACING):
+    """기준 랩 샘플(시간순)로 닫힌 중심선 꼭짓점을 만듭니다. (호 길이 등간격 + 원형 이동 평균)"""
+    import numpy as np
+
+    pts = np.column_stack([np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)])
+    keep = np.r_[True, np.any(np.diff(pts, axis=0) != 0, axis=1)]
+    pts = pts[keep]
+    if len(pts) < 20:
+        raise ValueError("기준 랩 샘플이 너무 적습니다.")
+    closed = np.vstack([pts, pts[:1]])
+    s = np.r_[0.0, np.cumsum(np.hypot(*np.diff(closed, axis=0).T))]
+    n = max(100, int(s[-1] / spacing))
+    su = np.linspace(0.0, s[-1], n, endpoint=False)
+    cx, cy = np.interp(su, s, closed[:, 0]), np.interp(su, s, closed[:, 1])
+    # 샘플 잡음 완화: 원형으로 이어 붙여 이동 평균
+    k = 5
+    kernel = np.ones(k) / k
+    cx = np.convolve(np.r_[cx[-k:], cx, cx[:k]], kernel, mode="same")[k:-k]
+    cy = np.convolve(np.r_[cy[-k:], cy, cy[:k]], kernel, mode="same")[k:-k]
+    return np.column_stack([cx, cy])
+
+
+def reference_lap(locations, laps):
+    """가장 빠른 완주 랩의 (x, y) 샘플 배열을 돌려줍니다."""
+    import numpy as np
+
+    import telemetry_ingest
+
+    df_laps = telemetry_ingest.to_frame("laps", laps)
+    if df_laps.empty or not {"date_start_ms", "lap_duration"} <= set(df_laps.columns):
+        raise ValueError("laps 데이터가 없습니다.")
+    df_laps = df_laps[(df_laps["date_start_ms"] != telemetry_ingest.MISSING_TIME) & df_laps["lap_duration"].notna()]
+    if "is_pit_out_lap" in df_laps.columns:
+        df_laps = df_laps[df_laps["is_pit_out_lap"].fillna(False) == False]  # noqa: E712
+    if df_laps.empty:
+        raise ValueError("완주한 랩이 없습니다.")
+    lap = df_laps.loc[df_laps["lap_duration"].idxmin()]
+
+    df_loc = telemetry_ingest.to_frame("location", locations)
+    t = df_loc["date_ms"].to_numpy()
+    start = int(lap["date_start_ms"])
+    inside = (df_loc["driver_number"].to_numpy() == lap["driver_number"]) \
+        & (t >= start) & (t < start + float(lap["lap_duration"]) * 1000)
+    order = np.argsort(t[inside], kind="stable")
+    return df_loc["x"].to_numpy()[inside][order], df_loc["y"].to_numpy()[inside][order]
+
+
+# --- 저장 / 조회 ---
+
+def _read_file():
+    try:
+        with open(CENTERLINES_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_centerline(circuit, centerline, **extra):
+    data = _read_file()
+    data[circuit] = centerline.to_json(**extra)
+    tmp = f"{CENTERLINES_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, CENTERLINES_FILE)
+    _loaded.pop(circuit, None)
+
+
+def for_circuit(circuit):
+    """서킷의 Centerline (격자 색인 포함, 프로세스당 한 번 생성). 없으면 None."""
+    if circuit not in _loaded:
+        entry = _read_file().get(circuit)
+        _loaded[circuit] = Centerline(entry["points"]) if entry else None
+    return _loaded[circuit]
+
+
+def for_session(session_key):
+    circuit = track_calibration.circuit_for_session(session_key)
+    return for_circuit(circuit) if circuit else None
+
+
+def annotate_rows(session_key, rows):
+    """location 행마다 랩 거리(lap_dist)를 붙인 새 행 목록을 돌려줍니다. 중심선이 없으면 그대로."""
+    centerline = for_session(session_key)
+    if centerline is None:
+        return rows
+    valid = [i for i, r in enumerate(rows) if r.get("x") is not None and r.get("y") is not None]
+    if not valid:
+        return rows
+    import numpy as np
+
+    x = np.fromiter((rows[i]["x"] for i in valid), dtype=np.float64, count=len(valid))
+    y = np.fromiter((rows[i]["y"] for i in valid), dtype=np.float64, count=len(valid))
+    dist, _ = centerline.project(x, y)
+    out = list(rows)
+    for i, d in zip(valid, np.round(dist, 1).tolist()):
+        out[i] = {**rows[i], "lap_dist": d}
+    return out
+
+
+def build_for_session(session_key):
+    """세션의 가장 빠른 랩으로 서킷 중심선을 만들어 저장하고 (서킷 이름, Centerline) 을 돌려줍니다."""
+    import f1_get_track_data
+
+    circuit = track_calibration.circuit_for_session(session_key)
+    if not circuit:
+        raise ValueError(f"일정에서 세션 {session_key} 의 서킷을 찾을 수 없습니다.")
+    params = {"session_key": session_key}
+    locations = f1_get_track_data.fetch_sliced("location", session_key)
+    laps = f1_get_track_data.fetch_api("laps", params)
+    for data in (locations, laps):
+        if isinstance(data, dict) and "error" in data:
+            raise RuntimeError(data["error"])
+    x, y = reference_lap(locations, laps)
+    centerline = Centerline(centerline_from_lap(x, y))
+    save_centerline(circuit, centerline, session_key=int(session_key))
+    return circuit, centerline
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "build":
+        print("사용법: python track_centerline.py build <session_key> [...]")
+        sys.exit(1)
+    for key in sys.argv[2:]:
+        try:
+            circuit, centerline = build_for_session(key)
+        except (ValueError, RuntimeError) as e:
+            print(f"[실패] {key}: {e}")
+            continue
+        print(f"[완료] {key} -> {circuit}: {centerline.n} points, length {centerline.length:.0f}")
@@ -0,0 +1,158 @@
+# trajectory_lod.py
+# location 궤적 다운샘플링 (LOD).
+# - 시간 버킷: 드라이버별로 resolution_ms 마다 첫 샘플 하나만 남김 (전 드라이버를 한 번에 벡터 연산)
+# - Douglas-Peucker: 드라이버별 (x, y) 경로를 epsilon 허용 오차로 단순화
+# - 피라미드: 종료된 세션은 LOD 단계별 결과를 replay_binary 형식으로 미리 저장해 두고 구간만 잘라 읽음
+#   (public/data/replays/<session_key>.lod<n>.f1rb)
+import os
+
+import numpy as np
+
+import replay_binary
+import telemetry_ingest
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+PYRAMID_DIR = os.path.join(ROOT_DIR, "public", "data", "replays")
+
+# LOD 단계별 시간 버킷 크기(ms). 0 단계는 원본
+LOD_RESOLUTION_MS = [0, 250, 1000, 4000]
+
+
+def bucket_indices(t_ms, drivers, resolution_ms):
+    """(드라이버, 시각) 순으로 정렬된 샘플에서 드라이버별 resolution_ms 버킷의 첫 샘플 인덱스를 돌려줍니다."""
+    t_ms = np.asarray(t_ms, dtype=np.int64)
+    drivers = np.asarray(drivers, dtype=np.int64)
+    if resolution_ms <= 0 or len(t_ms) == 0:
+        return np.arange(len(t_ms))
+    buckets = t_ms // int(resolution_ms)
+    keep = np.ones(len(t_ms), dtype=bool)
+    keep[1:] = (buckets[1:] != buckets[:-1]) | (drivers[1:] != drivers[:-1])
+    return np.flatnonzero(keep)
+
+
+def douglas_peucker(x, y, epsilon):
+    """(x, y) 경로를 Douglas-Peucker 로 단순화해 남길 인덱스(정렬됨)를 돌려줍니다.
+
+    구간마다 점-선분 거리(투영 위치를 선분 안으로 제한)를 벡터로 한 번에 계산하고, 재귀 대신 명시적 스택을 씁니다.
+    직선까지의 거리만 보면 헤어핀처럼 선분 끝을 넘어가는 점이 가깝게 잡혀 잘못 버려집니다.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= 2 or epsilon <= 0:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        px, py = x[a + 1:b], y[a + 1:b]
+        dx, dy = x[b] - x[a], y[b] - y[a]
+        len2 = dx * dx + dy * dy
+        if len2 == 0:
+            t = 0.0
+        else:
+            t = np.clip(((px - x[a]) * dx + (py - y[a]) * dy) / len2, 0.0, 1.0)
+        dist = np.hypot(px - (x[a] + t * dx), py - (y[a] + t * dy))
+        i = int(np.argmax(dist))
+        if dist[i] > epsilon:
+            mid = a + 1 + i
+            keep[mid] = True
+            stack.append((a, mid))
+            stack.append((mid, b))
+    return np.flatnonzero(keep)
+
+
+def simplify_columns(columns, resolution_ms=0, epsilon=0):
+    """{driver_number: (t_ms, x, y)} 를 시간 버킷(resolution_ms) 후 Douglas-Peucker(epsilon) 로 줄입니다."""
+    out = {}
+    for dn, (t, x, y) in columns.items():
+        idx = bucket_indices(t, np.zeros(len(t), dtype=np.int64), resolution_ms)
+        t, x, y = t[idx], x[idx], y[idx]
+        if epsilon:
+            idx = douglas_peucker(x, y, epsilon)
+            t, x, y = t[idx], x[idx], y[idx]
+        out[dn] = (t, x, y)
+    return out
+
+
+def simplify_rows(rows, resolution_ms=0, epsilon=0):
+    """OpenF1 location 행 목록을 줄여 원래 행(dict) 중 남길 것만 시간순으로 돌려줍니다."""
+    if not rows or (resolution_ms <= 0 and not epsilon):
+        return rows
+    valid = [r for r in rows if r.get("driver_number") is not None and r.get("x") is not None
+             and r.get("y") is not None and r.get("date")]
+    if not valid:
+        return []
+    t_ms = telemetry_ingest.parse_iso([r["date"] for r in valid])
+    drivers = np.fromiter((r["driver_number"] for r in valid), dtype=np.int64, count=len(valid))
+    order = np.lexsort((t_ms, drivers))
+    t_ms, drivers = t_ms[order], drivers[order]
+
+    idx = bucket_indices(t_ms, drivers, resolution_ms)
+    if epsilon:
+        xs = np.fromiter((valid[i]["x"] for i in order[idx]), dtype=np.float64, count=len(idx))
+        ys = np.fromiter((valid[i]["y"] for i in order[idx]), dtype=np.float64, count=len(idx))
+        kept_drivers = drivers[idx]
+        bounds = np.flatnonzero(np.diff(kept_drivers)) + 1
+        parts = []
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(idx)]):
+            parts.append(idx[lo + douglas_peucker(xs[lo:hi], ys[lo:hi], epsilon)])
+        idx = np.concatenate(parts) if parts else idx[:0]
+
+    picked = order[idx]
+    # 다시 전체 시간순으로 (같은 시각은 드라이버 순)
+    picked = picked[np.lexsort((drivers[idx], t_ms[idx]))]
+    return [valid[i] for i in picked.tolist()]
+
+
+# --- 피라미드 ---
+
+def pyramid_path(session_key, lod):
+    return os.path.join(PYRAMID_DIR, f"{session_key}.lod{int(lod)}.f1rb")
+
+
+def build_pyramid(session_key, locations):
+    """세션 전체 location 행으로 LOD 1 단계 이상의 바이너리 파일을 만들고 {lod: 바이트 수} 를 돌려줍니다."""
+    columns = replay_binary.columns_from_locations(locations)
+    if not columns:
+        return {}
+    os.makedirs(PYRAMID_DIR, exist_ok=True)
+    t_first = min(int(c[0][0]) for c in columns.values())
+    t_last = max(int(c[0][-1]) for c in columns.values())
+    sizes = {}
+    for lod, resolution_ms in enumerate(LOD_RESOLUTION_MS):
+        if lod == 0:
+            continue
+        path = pyramid_path(session_key, lod)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        sizes[lod] = replay_binary.write_replay(tmp, simplify_columns(columns, resolution_ms),
+                                                session_key=session_key, duration_ms=t_last - t_first)
+        os.replace(tmp, path)
+    return sizes
+
+
+def read_pyramid(session_key, lod, start_ms, end_ms):
+    """미리 만든 피라미드에서 (start_ms, end_ms) 구간을 location 행 형식으로 돌려줍니다. 없으면 None."""
+    path = pyramid_path(session_key, lod)
+    if lod <= 0 or not os.path.exists(path):
+        return None
+    with replay_binary.ReplayReader(path) as reader:
+        sliced = reader.slice(start_ms, end_ms)
+    t_all, dn_all, x_all, y_all = [], [], [], []
+    for dn, (t, x, y) in sliced.items():
+        inside = (t > start_ms) & (t < end_ms)
+        t_all.append(t[inside])
+        dn_all.append(np.full(int(inside.sum()), dn, dtype=np.int64))
+        x_all.append(x[inside])
+        y_all.append(y[inside])
+    if not t_all:
+        return []
+    t, dn, x, y = (np.concatenate(a) for a in (t_all, dn_all, x_all, y_all))
+    order = np.lexsort((dn, t))
+    dates = np.datetime_as_string(t[order].astype("datetime64[ms]"), unit="ms", timezone="UTC")
+    session_key = int(session_key) if str(session_key).isdigit() else session_key
+    return [{"session_key": session_key, "date": d.replace("Z", "+00:00"), "driver_number": n, "x": xx, "y": yy}
+            for d, n, xx, yy in zip(dates.tolist(), dn[order].tolist(), x[order].tolist(), y[order].tolist())]